@@ -4,12 +4,3448 @@
 # Install ipywidgets if needed (uncomment if necessary)
 # %pip install ipywidgets
 
+import time
+
+# Taken before the other imports so the launch can report what they cost
+_IMPORTS_STARTED = time.perf_counter()
+
 import os
+import errno
+import gzip
+import hashlib
+import io
+import heapq
+import json
+import marshal
+import math
+import mmap
+import random
+import shutil
+import stat
+import tempfile
+import threading
+import weakref
 import ipywidgets as widgets
-from IPython.display import display, clear_output, HTML
-from datetime import datetime
+from IPython.display import display
+from datetime import datetime, timezone
 from pathlib import Path
 import fnmatch
+import html
+import re
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from itertools import compress, groupby, islice, repeat
+from operator import contains, itemgetter, not_, sub
+
+# tarfile, zipfile and csv are imported by the archive and table preview
+# code on first use rather than here
+_IMPORT_SECONDS = time.perf_counter() - _IMPORTS_STARTED
+
+
+# === SEARCH ENGINE ===
+
+SEARCH_MODES = [
+    ('Contains', 'substring'),
+    ('Glob', 'glob'),
+    ('Regex', 'regex'),
+    ('Fuzzy', 'fuzzy'),
+    ('Contents', 'content')
+]
+
+
+@lru_cache(maxsize=32)
+def compile_matcher(query, mode='substring'):
+    """Compile a query once into rank(keys, names, candidates=None), returning matching indices best first"""
+    needle = query.lower()
+    # Each mode scores its hits with C-level maps; lower scores rank first
+    if mode == 'glob':
+        # Like the original filter, a glob may match anywhere in the name
+        # ('log' finds app.log); names matching it whole rank first
+        test = re.compile(fnmatch.translate(f"*{needle}*")).match
+        whole = re.compile(fnmatch.translate(needle)).match
+        # Every match must contain the longest literal run of the pattern,
+        # which a plain substring test rejects far faster than the regex
+        literal = max(re.split(r'[*?]', re.sub(r'\[[^\]]*\]', '*', needle)), key=len)
+        score = lambda found, keys: list(zip(map(not_, map(whole, keys)), map(len, keys)))
+    elif mode == 'regex':
+        # Smart case: a pattern without capitals is matched against the
+        # lowercase keys, one with capitals against the original names
+        test = re.compile(query).search
+        literal = ''
+        # Earlier matches first, then those covering more of the name
+        score = lambda found, keys: list(zip(
+            map(re.Match.start, found),
+            map(sub, map(len, keys), map(sub, map(re.Match.end, found), map(re.Match.start, found)))
+        ))
+    elif mode == 'fuzzy' and len(needle) > 1:
+        # [^x]*x steps to the next occurrence without backtracking, so the
+        # match is the greedy leftmost subsequence and its span is a cheap
+        # measure of how tightly the characters cluster
+        pattern = ''.join(
+            re.escape(ch) if i == 0 else f"[^{re.escape(ch)}]*{re.escape(ch)}"
+            for i, ch in enumerate(needle)
+        )
+        test = re.compile(pattern).search
+        literal = ''
+        score = lambda found, keys: list(zip(
+            map(sub, map(re.Match.end, found), map(re.Match.start, found)),
+            map(re.Match.start, found),
+            map(len, keys)
+        ))
+    else:
+        # Substring search; a one-character fuzzy query is the same thing
+        test = None
+        literal = needle
+        # Exact names, then prefixes, then earlier and shorter matches
+        score = lambda found, keys: list(zip(map(str.find, keys, repeat(needle)), map(len, keys)))
+
+    # keys are the lowercase names; the originals are only needed by
+    # case-sensitive regexes. Raises re.error for an invalid regex.
+    def rank(keys, names, candidates=None):
+        if candidates is None:
+            candidates = range(len(keys))
+            hit_keys = keys
+        else:
+            hit_keys = list(map(keys.__getitem__, candidates))
+        if literal:
+            keep = list(map(contains, hit_keys, repeat(literal)))
+            candidates = list(compress(candidates, keep))
+            hit_keys = list(compress(hit_keys, keep))
+        found = None
+        if test is not None:
+            if mode == 'regex' and query != needle:
+                found = list(map(test, map(names.__getitem__, candidates)))
+            else:
+                found = list(map(test, hit_keys))
+            candidates = list(compress(candidates, found))
+            hit_keys = list(compress(hit_keys, found))
+            found = list(compress(found, found))
+        scores = score(found, hit_keys)
+        order = sorted(range(len(scores)), key=scores.__getitem__)
+        return list(map(candidates.__getitem__, order))
+    return rank
+
+
+def rank_items(items, query, mode='substring'):
+    """Return the items matching query, best match first"""
+    rank = compile_matcher(query, mode)
+    keys = list(map(itemgetter('name_lower'), items))
+    names = list(map(itemgetter('name'), items))
+    return list(map(items.__getitem__, rank(keys, names)))
+
+
+def _narrows(mode, previous, query):
+    """Check whether every match of query is also a match of previous"""
+    # Extending a substring or fuzzy query can only drop matches
+    return mode in ('substring', 'fuzzy') and query.lower().startswith(previous.lower())
+
+
+# === SORTING ===
+
+SORT_OPTIONS = [
+    ('Name', 'name'),
+    ('Size', 'size'),
+    ('Modified Date', 'date'),
+    ('Type', 'type')
+]
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def natural_key(name):
+    """Sort key that orders digit runs by value, so part-2 comes before part-10"""
+    parts = _DIGITS.split(name.lower())
+    # Splitting on a capturing group puts the numbers at the odd positions
+    parts[1::2] = map(int, parts[1::2])
+    return parts
+
+
+_SORT_KEYS = {
+    'name': lambda item: natural_key(item['name_lower']),
+    'size': itemgetter('size'),
+    'date': itemgetter('modified'),
+    'type': lambda item: item['type'].lower()
+}
+
+
+def sort_permutation(items, keys):
+    """Ascending order of items by several keys as (indices, directory count, primary key values)"""
+    # One stable sort pass per key, from the least significant key up
+    order = list(range(len(items)))
+    for key in reversed(keys):
+        values = list(map(_SORT_KEYS[key], items))
+        order.sort(key=values.__getitem__)
+    
+    dirs = [j for j in order if items[j]['is_dir']]
+    files = [j for j in order if not items[j]['is_dir']]
+    return dirs + files, len(dirs), values
+
+
+def reverse_primary(order, values):
+    """Turn an ascending order descending on the primary key only; ties keep their ascending order"""
+    runs = [list(run) for _, run in groupby(order, key=values.__getitem__)]
+    return [j for run in reversed(runs) for j in run]
+
+
+# === BULK OPERATIONS ===
+
+BULK_WORKERS = 16
+BULK_RETRIES = 3
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class OperationCancelled(Exception):
+    """Raised inside a worker when the user cancels a bulk operation"""
+
+
+class BulkOperation:
+    """Copy, move or delete a set of files and folders, one task per file on a bounded worker pool"""
+    
+    def __init__(self, action, paths, dest=None, workers=BULK_WORKERS, retries=BULK_RETRIES,
+                 chunk_size=COPY_CHUNK_SIZE, on_progress=None, on_done=None):
+        if action not in ('copy', 'move', 'delete'):
+            raise ValueError(f"Unknown bulk action: {action}")
+        if action != 'delete' and not dest:
+            raise ValueError(f"A destination folder is required to {action}")
+        
+        self.action = action
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.dest = os.path.abspath(dest) if dest and action != 'delete' else None
+        self.workers = workers
+        self.retries = retries
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        # Progress counters, updated by the workers under _lock
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        self.errors = []
+        self.planning = True
+        self.started = None
+        self.finished = None
+        
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._emptied_dirs = []
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        """Stop submitting work and abort running copies at the next chunk"""
+        self._cancel.set()
+    
+    def throughput(self):
+        """Bytes per second since the operation started"""
+        if not self.started:
+            return 0.0
+        elapsed = (self.finished or time.time()) - self.started
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+    
+    def start(self):
+        """Run the operation in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Run the operation, blocking until every task has finished"""
+        self.started = time.time()
+        try:
+            for path in self.paths:
+                if self.dest and (self.dest + os.sep).startswith(path + os.sep):
+                    raise ValueError(f"Cannot {self.action} {path} into itself")
+            
+            # Tasks run through the guard, so a hung mount fails them instead
+            # of holding the operation forever
+            pending = {}
+            last_report = 0.0
+            for kind, src, dst in self._plan():
+                if self.cancelled:
+                    break
+                try:
+                    pending[fs_guard.submit(src, self._run_task, kind, src, dst)] = src
+                except MountUnavailable as e:
+                    self._fail(src, e)
+                self.files_total += 1
+                
+                # Keep a bounded number of tasks queued ahead of the workers
+                while len(pending) >= self.workers * 4:
+                    self._collect(pending)
+                if time.time() - last_report > 0.25:
+                    last_report = time.time()
+                    self._report()
+            
+            self.planning = False
+            while pending:
+                self._collect(pending)
+                self._report()
+            
+            # Folders emptied by a move or delete go once their files are gone
+            if self.action != 'copy' and not self.cancelled:
+                for directory in reversed(self._emptied_dirs):
+                    try:
+                        os.rmdir(directory)
+                    except OSError as e:
+                        self.errors.append((directory, str(e)))
+        except Exception as e:
+            self.errors.append(('', str(e)))
+        finally:
+            self.planning = False
+            self.finished = time.time()
+            self._report()
+            if self.on_done:
+                self.on_done(self)
+    
+    def _report(self):
+        if self.on_progress:
+            self.on_progress(self)
+    
+    def _fail(self, path, error):
+        with self._lock:
+            self.errors.append((path, str(error)))
+    
+    def _collect(self, pending):
+        """Wait for some of the pending tasks (future -> source path) to finish or time out"""
+        done, _, timed_out = fs_guard.wait(pending, 0.25)
+        for future in done:
+            del pending[future]
+        for future in timed_out:
+            src = pending.pop(future)
+            self._fail(src, fs_guard.timeout_error(src))
+    
+    def _plan(self):
+        """Yield (kind, src, dst) file tasks, creating target folders on the way"""
+        for path in self.paths:
+            target = os.path.join(self.dest, os.path.basename(path)) if self.dest else None
+            
+            if self.action == 'move':
+                # A rename on the same filesystem moves a whole tree at once
+                try:
+                    if fs_guard.call(os.path.lexists, target):
+                        raise FileExistsError(f"Destination exists: {target}")
+                    fs_guard.call(os.rename, path, target)
+                    with self._lock:
+                        self.files_done += 1
+                    self.files_total += 1
+                    continue
+                except (FileExistsError, FilesystemTimeout, MountUnavailable) as e:
+                    self._fail(path, e)
+                    continue
+                except OSError:
+                    pass
+            
+            # A symlink is deleted, moved or copied as a link, never followed
+            try:
+                is_dir = stat.S_ISDIR(fs_guard.call(scan_service.filesystem.lstat, path).st_mode)
+            except OSError as e:
+                self._fail(path, e)
+                continue
+            if not is_dir:
+                yield (self.action, path, target)
+                continue
+            
+            # Parents are listed before their children, and links to folders
+            # come back with the files
+            for root, _, files, error in walk_tree(path, self.workers, self._cancel):
+                if error:
+                    self._fail(root, error)
+                    continue
+                if target:
+                    out_dir = os.path.join(target, os.path.relpath(root, path))
+                    try:
+                        fs_guard.call(_makedirs, out_dir)
+                    except OSError as e:
+                        self._fail(out_dir, e)
+                        continue
+                if self.action != 'copy':
+                    self._emptied_dirs.append(root)
+                for src, _, _ in files:
+                    yield (self.action, src, os.path.join(out_dir, os.path.basename(src)) if target else None)
+    
+    def _run_task(self, kind, src, dst):
+        """Run one file task with retries"""
+        for attempt in range(self.retries + 1):
+            if self.cancelled:
+                return
+            try:
+                if kind == 'delete':
+                    os.remove(src)
+                elif os.path.islink(src):
+                    os.symlink(os.readlink(src), dst)
+                    if kind == 'move':
+                        os.remove(src)
+                else:
+                    self._copy_file(src, dst)
+                    if kind == 'move':
+                        os.remove(src)
+                with self._lock:
+                    self.files_done += 1
+                return
+            except OperationCancelled:
+                return
+            except (FileExistsError, FileNotFoundError, IsADirectoryError, PermissionError) as e:
+                # Retrying would fail the same way
+                with self._lock:
+                    self.errors.append((src, str(e)))
+                return
+            except OSError as e:
+                if attempt == self.retries:
+                    with self._lock:
+                        self.errors.append((src, str(e)))
+                    return
+                time.sleep(0.2 * 2 ** attempt)
+    
+    def _copy_file(self, src, dst):
+        """Stream src into a new file dst in chunks, removing dst on failure"""
+        with open(src, 'rb') as fin:
+            size = os.fstat(fin.fileno()).st_size
+            buffer = bytearray(max(1, min(self.chunk_size, size)))
+            view = memoryview(buffer)
+            written = 0
+            with open(dst, 'xb') as fout:
+                try:
+                    while True:
+                        if self.cancelled:
+                            raise OperationCancelled()
+                        n = fin.readinto(buffer)
+                        if not n:
+                            break
+                        fout.write(view[:n])
+                        written += n
+                        fs_guard.touch()
+                        with self._lock:
+                            self.bytes_done += n
+                except BaseException:
+                    # Drop the partial copy so a retry starts clean
+                    fout.close()
+                    with self._lock:
+                        self.bytes_done -= written
+                    try:
+                        os.remove(dst)
+                    except OSError:
+                        pass
+                    raise
+        try:
+            shutil.copystat(src, dst)
+        except OSError:
+            pass
+
+
+# === FILE EXPORT ===
+
+EXPORT_ALIGNMENT = 1024 * 1024
+EXPORT_BUFFER_SIZES = [
+    ('4 MB', 4 * 1024 * 1024),
+    ('16 MB', 16 * 1024 * 1024),
+    ('64 MB', 64 * 1024 * 1024)
+]
+# Each chunk of this size gets its own digest and ends with an fsync'ed checkpoint
+EXPORT_CHECKPOINT_BYTES = 64 * 1024 * 1024
+# Chunks of the source and the partial copy compared before resuming
+EXPORT_VERIFY_CHUNKS = 3
+
+
+class FileExport:
+    """Copy one large file in aligned chunks to "<target>.part", checkpointing so it can resume"""
+    
+    def __init__(self, source, dest, buffer_size=EXPORT_BUFFER_SIZES[1][1], algorithm='sha256',
+                 checkpoint_bytes=EXPORT_CHECKPOINT_BYTES, on_progress=None, on_done=None):
+        self.source = os.path.abspath(source)
+        dest = os.path.abspath(dest)
+        if os.path.isdir(dest):
+            dest = os.path.join(dest, os.path.basename(self.source))
+        self.target = dest
+        self.part_path = dest + '.part'
+        self.checkpoint_path = dest + '.part.ckpt'
+        
+        # Round the buffer up to whole alignment units
+        self.buffer_size = max(EXPORT_ALIGNMENT, -(-buffer_size // EXPORT_ALIGNMENT) * EXPORT_ALIGNMENT)
+        # ...and the checkpoint interval up to whole buffers
+        self.checkpoint_bytes = -(-checkpoint_bytes // self.buffer_size) * self.buffer_size
+        self.algorithm = algorithm
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        self.total = 0
+        self.bytes_done = 0
+        self.resumed_from = 0
+        self.checksum = None
+        self.verified = False
+        self.error = None
+        self.started = None
+        self.finished = None
+        # Digests of the source's chunks copied so far
+        self._digests = []
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        """Stop after the current buffer, keeping the last checkpoint for a resume"""
+        self._cancel.set()
+    
+    def throughput(self):
+        """Bytes per second copied in this run (not counting resumed bytes)"""
+        if not self.started:
+            return 0.0
+        elapsed = (self.finished or time.time()) - self.started
+        return (self.bytes_done - self.resumed_from) / elapsed if elapsed > 0 else 0.0
+    
+    def start(self):
+        """Run the export in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Run the export, blocking until it finishes, fails or is cancelled"""
+        self.started = time.time()
+        try:
+            if os.path.exists(self.target):
+                raise FileExistsError(f"Destination exists: {self.target}")
+            self._copy()
+            if not self.cancelled:
+                self._verify()
+        except OperationCancelled:
+            pass
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished = time.time()
+            self._report()
+            if self.on_done:
+                self.on_done(self)
+    
+    def _report(self):
+        if self.on_progress:
+            self.on_progress(self)
+    
+    def _load_checkpoint(self, stat_info):
+        """Return the checkpoint if it was taken against this unchanged source, else None"""
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            part_size = os.path.getsize(self.part_path)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(checkpoint, dict)
+                or checkpoint.get('source') != self.source
+                or checkpoint.get('size') != stat_info.st_size
+                or checkpoint.get('mtime_ns') != stat_info.st_mtime_ns
+                or checkpoint.get('algorithm') != self.algorithm
+                or checkpoint.get('chunk') != self.checkpoint_bytes
+                or not isinstance(checkpoint.get('digests'), list)
+                or not 0 < len(checkpoint['digests']) * self.checkpoint_bytes <= part_size):
+            return None
+        return checkpoint
+    
+    def _save_checkpoint(self, stat_info, digests):
+        """Record the chunks copied so far; the part file must already be fsync'ed"""
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'source': self.source,
+                'size': stat_info.st_size,
+                'mtime_ns': stat_info.st_mtime_ns,
+                'algorithm': self.algorithm,
+                'chunk': self.checkpoint_bytes,
+                'digests': digests
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def _chunk_digest(self, f, index, view, read):
+        """Digest of chunk index of an open file, read through read(f, buffer)"""
+        digest = hashlib.new(self.algorithm)
+        f.seek(index * self.checkpoint_bytes)
+        remaining = self.checkpoint_bytes
+        while remaining:
+            if self.cancelled:
+                raise OperationCancelled()
+            n = read(f, view[:min(remaining, len(view))])
+            if not n:
+                break
+            digest.update(view[:n])
+            remaining -= n
+        return digest.hexdigest()
+    
+    def _resume_offset(self, checkpoint, fin, fout, view):
+        """Compare a few checkpointed chunks of both files; returns the offset to resume at, else 0"""
+        # Size and mtime can survive an in-place rewrite, so compare bytes too,
+        # but only the last chunk and a couple of others, not the whole prefix
+        digests = checkpoint['digests']
+        last = len(digests) - 1
+        picks = {last, *random.sample(range(last), min(last, EXPORT_VERIFY_CHUNKS - 1))}
+        for index in sorted(picks):
+            if (self._chunk_digest(fout, index, view, lambda f, b: f.readinto(b)) != digests[index]
+                    or self._chunk_digest(fin, index, view,
+                                          lambda f, b: fs_guard.call(_readinto, self.source, f, b)) != digests[index]):
+                return 0
+        self._digests = list(digests)
+        return len(digests) * self.checkpoint_bytes
+    
+    def _copy(self):
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        
+        # Source calls go through the guard, so a hung mount fails the export
+        with fs_guard.call(open, self.source, 'rb') as fin:
+            stat_info = fs_guard.call(_fstat, self.source, fin)
+            self.total = stat_info.st_size
+            checkpoint = self._load_checkpoint(stat_info)
+            
+            with open(self.part_path, 'r+b' if checkpoint else 'wb') as fout:
+                offset = 0
+                self._digests = []
+                if checkpoint:
+                    offset = self._resume_offset(checkpoint, fin, fout, view)
+                    fout.truncate(offset)
+                    fout.seek(offset)
+                    fin.seek(offset)
+                self.resumed_from = self.bytes_done = offset
+                
+                digest = hashlib.new(self.algorithm)
+                last_report = 0.0
+                while True:
+                    if self.cancelled:
+                        raise OperationCancelled()
+                    # Reads stop at chunk boundaries, so each chunk has its own digest
+                    want = min(len(buffer), self.checkpoint_bytes - offset % self.checkpoint_bytes)
+                    n = fs_guard.call(_readinto, self.source, fin, view[:want])
+                    if not n:
+                        break
+                    chunk = view[:n]
+                    fout.write(chunk)
+                    digest.update(chunk)
+                    offset += n
+                    self.bytes_done = offset
+                    if offset % self.checkpoint_bytes == 0:
+                        self._digests.append(digest.hexdigest())
+                        digest = hashlib.new(self.algorithm)
+                        # The checkpoint must never claim bytes that aren't on disk
+                        fout.flush()
+                        os.fsync(fout.fileno())
+                        self._save_checkpoint(stat_info, self._digests)
+                    if time.time() - last_report > 0.25:
+                        last_report = time.time()
+                        self._report()
+                if offset % self.checkpoint_bytes:
+                    self._digests.append(digest.hexdigest())
+    
+    def _verify(self):
+        """Check the finished copy chunk by chunk, take its checksum and move it into place if it matches"""
+        digest = hashlib.new(self.algorithm)
+        view = memoryview(bytearray(self.buffer_size))
+        with open(self.part_path, 'rb') as f:
+            matches = all(self._verify_chunk(f, view, digest) == expected for expected in self._digests)
+            matches = matches and not f.read(1)
+        if not matches:
+            # A corrupt copy can't be resumed, start over next time
+            self._remove_checkpoint()
+            raise IOError(f"Checksum mismatch for {self.target}")
+        
+        self.checksum = digest.hexdigest()
+        os.replace(self.part_path, self.target)
+        self._remove_checkpoint()
+        self.verified = True
+    
+    def _verify_chunk(self, f, view, digest):
+        """Digest of the next chunk of f, also fed into the whole-file digest"""
+        chunk_digest = hashlib.new(self.algorithm)
+        remaining = self.checkpoint_bytes
+        while remaining:
+            n = f.readinto(view[:min(remaining, len(view))])
+            if not n:
+                break
+            digest.update(view[:n])
+            chunk_digest.update(view[:n])
+            remaining -= n
+        return chunk_digest.hexdigest()
+    
+    def _remove_checkpoint(self):
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+
+
+# === ARCHIVES ===
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tgz', '.gz')
+ARCHIVE_CACHE_SIZE = 8
+PREVIEW_BYTES = 64 * 1024
+
+# Member indexes keyed by (path, size, mtime), most recently used last
+_archive_indexes = OrderedDict()
+_archive_lock = threading.Lock()
+
+
+def is_archive(path):
+    """Check whether a path has an archive extension"""
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def split_archive_path(path):
+    """Split a path into an archive into (archive, inner path), or None if it isn't one"""
+    # Most paths can be ruled out without touching the filesystem
+    lowered = path.lower()
+    if not any(ext in lowered for ext in ARCHIVE_EXTENSIONS):
+        return None
+    
+    head, inner = path, ''
+    while not _path_test(os.path.exists, head):
+        parent, name = os.path.split(head)
+        if parent == head:
+            return None
+        head, inner = parent, (name + '/' + inner if inner else name)
+    if is_archive(head) and _path_test(os.path.isfile, head):
+        return head, inner
+    return None
+
+
+def archive_errors():
+    """Exceptions that mean a file is not a readable archive"""
+    import tarfile
+    import zipfile
+    return (OSError, tarfile.TarError, zipfile.BadZipFile)
+
+
+def _build_archive_index(path):
+    """Read an archive's member table into {folder: {name: entry}}"""
+    folders = {'': {}}
+    
+    def add(member, is_dir, size, mtime, offset):
+        parts = [p for p in member.split('/') if p and p != '.']
+        if not parts:
+            return
+        # Archives don't always list parent folders, so create them as needed
+        for depth in range(1, len(parts)):
+            folder = '/'.join(parts[:depth])
+            if folder not in folders:
+                folders[folder] = {}
+                folders['/'.join(parts[:depth - 1])][parts[depth - 1]] = {
+                    'is_dir': True, 'size': 0, 'modified': mtime, 'member': None, 'offset': None
+                }
+        if is_dir:
+            folders.setdefault('/'.join(parts), {})
+        folders['/'.join(parts[:-1])][parts[-1]] = {
+            'is_dir': is_dir, 'size': size, 'modified': mtime, 'member': member, 'offset': offset
+        }
+    
+    import tarfile
+    import zipfile
+    
+    if path.lower().endswith('.zip'):
+        # Opening a zip only reads its central directory
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                add(info.filename, info.is_dir(), info.file_size, time.mktime(info.date_time + (0, 0, -1)), None)
+    else:
+        # One forward pass; members of an uncompressed tar can later be
+        # read straight from their data offset
+        seekable = path.lower().endswith('.tar')
+        with tarfile.open(path, 'r|*') as tf:
+            for info in tf:
+                add(info.name, info.isdir(), info.size if info.isreg() else 0, info.mtime,
+                    info.offset_data if seekable and info.isreg() else None)
+    return folders
+
+
+def cached_archive_index(path):
+    """Return the member index of an archive if it is already cached, else None"""
+    stat_info = os.stat(path)
+    key = (path, stat_info.st_size, stat_info.st_mtime)
+    with _archive_lock:
+        index = _archive_indexes.get(key)
+        if index is not None:
+            _archive_indexes.move_to_end(key)
+        return index
+
+
+def archive_index(path):
+    """Return the cached member index of an archive, building it on first use"""
+    index = cached_archive_index(path)
+    if index is not None:
+        return index
+    
+    stat_info = os.stat(path)
+    key = (path, stat_info.st_size, stat_info.st_mtime)
+    index = _build_archive_index(path)
+    with _archive_lock:
+        _archive_indexes[key] = index
+        while len(_archive_indexes) > ARCHIVE_CACHE_SIZE:
+            _archive_indexes.popitem(last=False)
+    return index
+
+
+def archive_entry(archive, inner):
+    """Look up a member by inner path; the archive root is a folder"""
+    if not inner:
+        archive_index(archive)
+        return {'is_dir': True, 'size': 0, 'modified': os.path.getmtime(archive), 'member': None, 'offset': None}
+    parent, _, name = inner.rpartition('/')
+    return archive_index(archive).get(parent, {}).get(name)
+
+
+def iter_archive_member(archive, inner, chunk_size=COPY_CHUNK_SIZE):
+    """Stream the content of one archive member in chunks without unpacking the rest"""
+    entry = archive_entry(archive, inner)
+    if entry is None:
+        raise FileNotFoundError(f"No such member: {inner}")
+    if entry['is_dir']:
+        raise IsADirectoryError(f"Member is a folder: {inner}")
+    
+    import tarfile
+    import zipfile
+    
+    if archive.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive) as zf, zf.open(entry['member']) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+    elif entry['offset'] is not None:
+        with open(archive, 'rb') as f:
+            f.seek(entry['offset'])
+            remaining = entry['size']
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+    else:
+        # Compressed tars can't seek, so decompress up to the member
+        with tarfile.open(archive, 'r|*') as tf:
+            for info in tf:
+                if info.name == entry['member']:
+                    f = tf.extractfile(info)
+                    while True:
+                        chunk = f.read(chunk_size)
+                        if not chunk:
+                            return
+                        yield chunk
+
+
+def extract_archive_member(archive, inner, dest, chunk_size=COPY_CHUNK_SIZE):
+    """Stream one archive member to dest (a folder or file path); returns the file written"""
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, inner.rpartition('/')[2])
+    with open(dest, 'xb') as f:
+        for chunk in iter_archive_member(archive, inner, chunk_size):
+            f.write(chunk)
+    return dest
+
+
+# === TREE WALK ===
+
+def read_folder(path, exclude=None, follow_symlinks=False):
+    """Read one folder as the tree walks do: (subfolder names, file names, sizes, mtimes, excluded count, entry errors)"""
+    # Raises OSError if the folder itself can't be read; links to folders
+    # count as files unless follow_symlinks, and are never stat'ed through
+    rules = exclude_rules(exclude)
+    dirs, names, sizes, mtimes = [], [], array('q'), array('d')
+    excluded = 0
+    errors = []
+    with scan_service.filesystem.scandir(path) as entries:
+        for entry in entries:
+            if rules.excludes(entry.name):
+                excluded += 1
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    dirs.append(entry.name)
+                else:
+                    stat_info = entry.stat(follow_symlinks=False)
+                    names.append(entry.name)
+                    sizes.append(stat_info.st_size)
+                    mtimes.append(stat_info.st_mtime)
+            except OSError as e:
+                errors.append(e)
+    return dirs, names, sizes, mtimes, excluded, errors
+
+
+def _scan_dir(path, exclude=None):
+    """List one folder: (path, subfolder paths, [(file path, size, mtime)], error)"""
+    try:
+        dirs, names, sizes, mtimes, _, _ = read_folder(path, exclude)
+    except OSError as e:
+        return path, [], [], e
+    return (path, [os.path.join(path, name) for name in dirs],
+            list(zip([os.path.join(path, name) for name in names], sizes, mtimes)), None)
+
+
+def walk_tree(root, workers=BULK_WORKERS, cancel=None, exclude=None):
+    """Walk the folders under root, yielding (folder, subfolders, files, error) in completion order"""
+    # Folders found but not yet listed wait on the stack, which grows with the
+    # width of the tree; at most 2 * workers of them are queued on the guard
+    rules = exclude_rules(exclude)
+    stack = [root]
+    pending = {}
+    while stack or pending:
+        if cancel is not None and cancel.is_set():
+            return
+        while stack and len(pending) < workers * 2:
+            folder = stack.pop()
+            try:
+                pending[fs_guard.submit(folder, _scan_dir, folder, rules)] = folder
+            except MountUnavailable as e:
+                yield folder, [], [], e
+        if not pending:
+            continue
+        done, _, timed_out = fs_guard.wait(pending)
+        for future in timed_out:
+            folder = pending.pop(future)
+            yield folder, [], [], fs_guard.timeout_error(folder)
+        for future in done:
+            del pending[future]
+            folder, dirs, files, error = future.result()
+            stack.extend(dirs)
+            yield folder, dirs, files, error
+
+
+# === STORAGE REPORT ===
+
+REPORT_TOP_K = 100
+
+
+class StorageReport:
+    """Find the largest files and heaviest folders under a path, keeping only the top K of each"""
+    
+    def __init__(self, root, get_type, top_k=REPORT_TOP_K, workers=BULK_WORKERS,
+                 on_progress=None, on_done=None):
+        self.root = os.path.abspath(root)
+        self.get_type = get_type
+        self.top_k = top_k
+        self.workers = workers
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        self.files_scanned = 0
+        self.dirs_scanned = 0
+        self.bytes_total = 0
+        self.errors = 0
+        self.by_type = {}
+        self.started = None
+        self.finished = None
+        
+        self._largest_files = []
+        self._heaviest_dirs = []
+        self._type_of_ext = {}
+        
+        # folder -> [subfolders not yet done, bytes, files] for folders whose
+        # subtree is still being walked
+        self._open = {}
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    def largest_files(self):
+        """(size, path, mtime) of the largest files so far, largest first"""
+        return sorted(self._largest_files, reverse=True)
+    
+    def heaviest_dirs(self):
+        """(bytes, path, file count) of the heaviest finished subtrees so far, heaviest first"""
+        return sorted(self._heaviest_dirs, reverse=True)
+    
+    def start(self):
+        """Run the report in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Walk the tree, blocking until done or cancelled"""
+        self.started = time.time()
+        last_report = 0.0
+        try:
+            for folder, dirs, files, error in walk_tree(self.root, self.workers, self._cancel):
+                self.dirs_scanned += 1
+                if error:
+                    self.errors += 1
+                self._add_folder(folder, dirs, files)
+                if time.time() - last_report > 0.5:
+                    last_report = time.time()
+                    if self.on_progress:
+                        self.on_progress(self)
+        finally:
+            self.finished = time.time()
+            if self.on_done:
+                self.on_done(self)
+    
+    def _push(self, heap, entry):
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    
+    def _add_folder(self, folder, dirs, files):
+        folder_bytes = 0
+        for path, size, mtime in files:
+            folder_bytes += size
+            self._push(self._largest_files, (size, path, mtime))
+            
+            # File types are looked up once per extension
+            ext = os.path.splitext(path)[1].lower()
+            file_type = self._type_of_ext.get(ext)
+            if file_type is None:
+                file_type = self._type_of_ext[ext] = self.get_type(path, False)
+            totals = self.by_type.setdefault(file_type, [0, 0])
+            totals[0] += 1
+            totals[1] += size
+        
+        self.files_scanned += len(files)
+        self.bytes_total += folder_bytes
+        self._open[folder] = [len(dirs), folder_bytes, len(files)]
+        if not dirs:
+            self._close_folder(folder)
+    
+    def _close_folder(self, folder):
+        """Rank a folder whose whole subtree is walked and add it to its parent's totals"""
+        while True:
+            _, folder_bytes, file_count = self._open.pop(folder)
+            if folder == self.root:
+                return
+            if file_count:
+                self._push(self._heaviest_dirs, (folder_bytes, folder, file_count))
+            parent = self._open[os.path.dirname(folder)]
+            parent[0] -= 1
+            parent[1] += folder_bytes
+            parent[2] += file_count
+            if parent[0]:
+                return
+            folder = os.path.dirname(folder)
+
+
+# === SIZE ESTIMATION ===
+
+ESTIMATE_MAX_PROBES = 5000
+ESTIMATE_MAX_DEPTH = 64
+ESTIMATE_CACHE_FOLDERS = 100000
+ESTIMATE_Z = 1.96
+
+
+class SizeEstimate:
+    """Estimate the size and file count under a folder from random descents, then count it exactly"""
+    
+    def __init__(self, root, exclude=None, workers=BULK_WORKERS, seed=None, on_progress=None, on_done=None):
+        self.root = os.path.abspath(root)
+        self.exclude = exclude_rules(exclude)
+        self.workers = workers
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        # Exact totals walked so far
+        self.files_scanned = 0
+        self.dirs_scanned = 0
+        self.bytes_total = 0
+        self.errors = 0
+        self.complete = False
+        self.started = None
+        self.finished = None
+        
+        # Probe count and running sums of the probe estimates and their squares
+        self.probes = 0
+        self._sums = [0.0, 0.0, 0.0, 0.0]
+        
+        # path -> (subfolders, bytes, files) of folders listed so far
+        self._summaries = {}
+        self._rng = random.Random(seed)
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    @property
+    def size(self):
+        """Total bytes: exact once complete, else the estimate (never below what was walked)"""
+        if self.complete or not self.probes:
+            return self.bytes_total
+        return max(self._sums[0] / self.probes, self.bytes_total)
+    
+    @property
+    def files(self):
+        """File count: exact once complete, else the estimate"""
+        if self.complete or not self.probes:
+            return self.files_scanned
+        return max(self._sums[2] / self.probes, self.files_scanned)
+    
+    def margins(self):
+        """Half-widths of the 95% intervals of (size, files); 0 once exact, inf with too few probes"""
+        if self.complete:
+            return 0.0, 0.0
+        if self.probes < 2:
+            return math.inf, math.inf
+        n = self.probes
+        return tuple(
+            ESTIMATE_Z * math.sqrt(max(squares / n - (total / n) ** 2, 0.0) * n / (n - 1) / n)
+            for total, squares in ((self._sums[0], self._sums[1]), (self._sums[2], self._sums[3]))
+        )
+    
+    def start(self):
+        """Run the estimate in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Probe until the exact walk is done, blocking until then or cancelled"""
+        self.started = time.time()
+        walker = threading.Thread(target=self._walk, daemon=True)
+        walker.start()
+        last_report = 0.0
+        try:
+            while walker.is_alive() and not self.cancelled:
+                if self.probes < ESTIMATE_MAX_PROBES:
+                    self._add_probe(*self._probe())
+                else:
+                    walker.join(0.5)
+                if time.time() - last_report > 0.5:
+                    last_report = time.time()
+                    if self.on_progress:
+                        self.on_progress(self)
+            walker.join()
+        finally:
+            self.finished = time.time()
+            # The summaries only speed up probes, so nothing is kept once they stop
+            self._summaries = {}
+            if self.on_done:
+                self.on_done(self)
+    
+    def _walk(self):
+        """Count everything exactly"""
+        for folder, dirs, files, error in walk_tree(self.root, self.workers, self._cancel, self.exclude):
+            self.dirs_scanned += 1
+            if error:
+                self.errors += 1
+            folder_bytes = sum(size for _, size, _ in files)
+            self.files_scanned += len(files)
+            self.bytes_total += folder_bytes
+            self._remember(folder, dirs, folder_bytes, len(files))
+        self.complete = not self.cancelled
+    
+    def _remember(self, folder, dirs, folder_bytes, file_count):
+        summary = (dirs, folder_bytes, file_count)
+        if len(self._summaries) < ESTIMATE_CACHE_FOLDERS:
+            self._summaries[folder] = summary
+        return summary
+    
+    def _summary(self, folder):
+        """(subfolders, bytes, files) directly in a folder, read the way the walk reads it"""
+        summary = self._summaries.get(folder)
+        if summary is not None:
+            return summary
+        try:
+            dirs, names, sizes, _, _, _ = fs_guard.call(read_folder, folder, self.exclude)
+        except OSError:
+            # Counted as an empty leaf, like an unreadable folder in the walk
+            return (), 0, 0
+        return self._remember(folder, [os.path.join(folder, name) for name in dirs], sum(sizes), len(names))
+    
+    def _probe(self):
+        """One random descent from the root: an unbiased estimate of (bytes, files)"""
+        folder, weight, size, files = self.root, 1, 0.0, 0.0
+        for _ in range(ESTIMATE_MAX_DEPTH):
+            dirs, folder_bytes, file_count = self._summary(folder)
+            size += weight * folder_bytes
+            files += weight * file_count
+            if not dirs or self.cancelled:
+                break
+            weight *= len(dirs)
+            folder = self._rng.choice(dirs)
+        return size, files
+    
+    def _add_probe(self, size, files):
+        self.probes += 1
+        self._sums[0] += size
+        self._sums[1] += size * size
+        self._sums[2] += files
+        self._sums[3] += files * files
+
+
+# === CONTENT HASHES ===
+
+HASH_CHUNK_SIZE = 1024 * 1024
+PARTIAL_HASH_BYTES = 4 * 1024
+HASH_CACHE_SIZE = 200000
+
+# Digests keyed by (path, size, mtime, algorithm), most recently used last
+_hash_cache = OrderedDict()
+_hash_lock = threading.Lock()
+
+
+def cached_hash(path, size, mtime, algorithm, compute):
+    """Return a memoized digest, calling compute(path) on a miss"""
+    key = (path, size, mtime, algorithm)
+    with _hash_lock:
+        digest = _hash_cache.get(key)
+        if digest is not None:
+            _hash_cache.move_to_end(key)
+            return digest
+    
+    digest = compute(path)
+    with _hash_lock:
+        _hash_cache[key] = digest
+        while len(_hash_cache) > HASH_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+    return digest
+
+
+def _digest_file(path, digest, chunk_size=HASH_CHUNK_SIZE, on_chunk=None, cancel=None):
+    """Feed a whole file into digest through mmap (or reads where it can't be mapped), chunk by chunk"""
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None
+        
+        if mapped is not None:
+            with mapped:
+                for offset in range(0, len(mapped), chunk_size):
+                    if cancel is not None and cancel.is_set():
+                        raise OperationCancelled()
+                    # Views must be released before the map can close
+                    with memoryview(mapped)[offset:offset + chunk_size] as chunk:
+                        digest.update(chunk)
+                        n = len(chunk)
+                    fs_guard.touch()
+                    if on_chunk:
+                        on_chunk(n)
+            return digest
+        
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise OperationCancelled()
+            n = f.readinto(buffer)
+            if not n:
+                return digest
+            digest.update(view[:n])
+            fs_guard.touch()
+            if on_chunk:
+                on_chunk(n)
+
+
+def _partial_digest(path):
+    """Hash the first and last PARTIAL_HASH_BYTES of a file"""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+        size = os.fstat(f.fileno()).st_size
+        if size > 2 * PARTIAL_HASH_BYTES:
+            f.seek(size - PARTIAL_HASH_BYTES)
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+    return digest.hexdigest()
+
+
+def _full_digest(path):
+    """Hash a whole file in chunks"""
+    return _digest_file(path, hashlib.blake2b()).hexdigest()
+
+
+# === CHECKSUMS ===
+
+CHECKSUM_CHUNK_SIZE = 8 * 1024 * 1024
+
+# CRC32C (Castagnoli) isn't in the standard library, and only a native
+# implementation keeps up with storage (%pip install crc32c)
+try:
+    import google_crc32c
+    _crc32c_extend = google_crc32c.extend
+except ImportError:
+    try:
+        import crc32c as _crc32c_module
+        _crc32c_extend = lambda crc, data: _crc32c_module.crc32c(data, crc)
+    except ImportError:
+        _crc32c_extend = None
+
+# CRC32C is only offered when a native implementation is installed
+CHECKSUM_ALGORITHMS = [
+    ('MD5', 'md5'),
+    ('SHA-256', 'sha256')
+] + ([('CRC32C', 'crc32c')] if _crc32c_extend is not None else [])
+
+
+class _Crc32c:
+    """hashlib-style wrapper around a native CRC32C"""
+    
+    def __init__(self):
+        self.crc = 0
+    
+    def update(self, data):
+        # Both implementations take any buffer, so mapped chunks aren't copied
+        self.crc = _crc32c_extend(self.crc, data)
+    
+    def hexdigest(self):
+        return f"{self.crc:08x}"
+
+
+def file_checksum(path, algorithm='sha256', on_chunk=None, cancel=None):
+    """Checksum a file with md5, sha256 or crc32c, memoized by (path, size, mtime, algorithm)"""
+    if algorithm == 'crc32c' and _crc32c_extend is None:
+        raise ValueError("CRC32C needs a native implementation (%pip install crc32c)")
+    stat_info = os.stat(path)
+    
+    def compute(path):
+        digest = _Crc32c() if algorithm == 'crc32c' else hashlib.new(algorithm)
+        return _digest_file(path, digest, CHECKSUM_CHUNK_SIZE, on_chunk, cancel).hexdigest()
+    
+    return cached_hash(path, stat_info.st_size, stat_info.st_mtime, algorithm, compute)
+
+
+# === DUPLICATE FINDER ===
+
+class DuplicateFinder:
+    """Find files with identical content under a path: by size, then partial hash, then full hash"""
+    
+    def __init__(self, root, min_size=1, workers=BULK_WORKERS, on_progress=None, on_done=None):
+        self.root = os.path.abspath(root)
+        self.min_size = min_size
+        self.workers = workers
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        self.stage = 'scanning'
+        self.files_scanned = 0
+        self.to_hash = 0
+        self.hashed = 0
+        self.errors = 0
+        self.groups = []
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    def reclaimable(self):
+        """Bytes freed by keeping one copy of every duplicate set"""
+        return sum(size * (len(files) - 1) for size, files in self.groups)
+    
+    def start(self):
+        """Run the search in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Run all stages, blocking until done or cancelled"""
+        self.started = time.time()
+        try:
+            by_size = self._scan()
+            candidates = [files for files in by_size.values() if len(files) > 1]
+            del by_size
+            
+            self.stage = 'partial hash'
+            candidates = self._refine(candidates, 'partial', _partial_digest)
+            
+            # Files no bigger than the partial sample were hashed in full already
+            done = [files for files in candidates if files[0][1] <= 2 * PARTIAL_HASH_BYTES]
+            candidates = [files for files in candidates if files[0][1] > 2 * PARTIAL_HASH_BYTES]
+            
+            self.stage = 'full hash'
+            done += self._refine(candidates, 'blake2b', _full_digest)
+            
+            self.groups = sorted(
+                ((files[0][1], sorted((path, mtime) for path, _, mtime in files)) for files in done),
+                key=lambda group: group[0] * (len(group[1]) - 1),
+                reverse=True
+            )
+            self.stage = 'done'
+        finally:
+            self.finished = time.time()
+            if self.on_done:
+                self.on_done(self)
+    
+    def _report(self):
+        if self.on_progress:
+            self.on_progress(self)
+    
+    def _scan(self):
+        """Walk the tree and bucket files by size"""
+        by_size = {}
+        last_report = 0.0
+        for _, _, files, error in walk_tree(self.root, self.workers, self._cancel):
+            if error:
+                self.errors += 1
+            for path, size, mtime in files:
+                if size >= self.min_size:
+                    by_size.setdefault(size, []).append((path, size, mtime))
+            self.files_scanned += len(files)
+            if time.time() - last_report > 0.5:
+                last_report = time.time()
+                self._report()
+        return by_size
+    
+    def _hash(self, entry, algorithm, compute):
+        if self.cancelled:
+            return None
+        path, size, mtime = entry
+        try:
+            return cached_hash(path, size, mtime, algorithm, compute)
+        except OSError:
+            with self._lock:
+                self.errors += 1
+            return None
+        finally:
+            with self._lock:
+                self.hashed += 1
+    
+    def _refine(self, groups, algorithm, compute):
+        """Split groups of (path, size, mtime) by digest, keeping only collisions"""
+        entries = [entry for files in groups for entry in files]
+        self.to_hash, self.hashed = len(entries), 0
+        
+        refined = {}
+        pending = {}
+        queue = iter(entries)
+        while True:
+            # Keep a bounded number of files queued ahead of the workers
+            for entry in islice(queue, max(0, self.workers * 4 - len(pending))):
+                try:
+                    pending[fs_guard.submit(entry[0], self._hash, entry, algorithm, compute)] = entry
+                except MountUnavailable:
+                    with self._lock:
+                        self.errors += 1
+                        self.hashed += 1
+            if not pending:
+                break
+            done, _, timed_out = fs_guard.wait(pending)
+            for future in timed_out:
+                del pending[future]
+                with self._lock:
+                    self.errors += 1
+                    self.hashed += 1
+            for future in done:
+                entry = pending.pop(future)
+                digest = future.result()
+                if digest is not None:
+                    refined.setdefault((entry[1], digest), []).append(entry)
+            self._report()
+        return [files for files in refined.values() if len(files) > 1]
+
+
+# === CONTENT SEARCH ===
+
+GREP_MAX_MATCHES = 100
+GREP_MAX_FILE_SIZE = 256 * 1024 * 1024
+GREP_SNIFF_BYTES = 8 * 1024
+GREP_SNIPPETS_PER_FILE = 3
+GREP_SNIPPET_CHARS = 200
+
+
+class ContentSearch:
+    """Find files under a path whose content contains a string, stopping after max_matches files"""
+    
+    def __init__(self, root, query, max_matches=GREP_MAX_MATCHES, max_file_size=GREP_MAX_FILE_SIZE,
+                 workers=BULK_WORKERS, on_match=None, on_progress=None, on_done=None):
+        self.root = os.path.abspath(root)
+        self.query = query
+        self.max_matches = max_matches
+        self.max_file_size = max_file_size
+        self.workers = workers
+        self.on_match = on_match
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        # Smart case, as for name search
+        flags = re.IGNORECASE if query == query.lower() else 0
+        self._pattern = re.compile(re.escape(query.encode('utf-8')), flags)
+        
+        self.files_scanned = 0
+        self.files_skipped = 0
+        self.errors = 0
+        self.matches = []
+        self.limit_reached = False
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set() and not self.limit_reached
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    def start(self):
+        """Run the search in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Search the tree, blocking until done, cancelled or at the match limit"""
+        self.started = time.time()
+        last_report = 0.0
+        try:
+            pending = set()
+            for _, _, files, error in walk_tree(self.root, self.workers, self._cancel):
+                if error:
+                    self.errors += 1
+                for path, size, mtime in files:
+                    try:
+                        pending.add(fs_guard.submit(path, self._search_file, path, size, mtime))
+                    except MountUnavailable:
+                        self.errors += 1
+                
+                # Keep a bounded number of files queued ahead of the workers
+                while len(pending) >= self.workers * 4:
+                    pending = self._collect(pending)
+                if time.time() - last_report > 0.5:
+                    last_report = time.time()
+                    if self.on_progress:
+                        self.on_progress(self)
+            
+            while pending:
+                pending = self._collect(pending)
+        finally:
+            self.finished = time.time()
+            if self.on_done:
+                self.on_done(self)
+    
+    def _collect(self, pending):
+        """Handle the files searched so far; returns the futures still pending"""
+        done, pending, timed_out = fs_guard.wait(pending)
+        self.errors += len(timed_out)
+        for future in done:
+            match = future.result()
+            if match is None or self.limit_reached:
+                continue
+            self.matches.append(match)
+            if self.on_match:
+                self.on_match(self, match)
+            if len(self.matches) >= self.max_matches:
+                # Stops the walk and makes queued files return immediately
+                self.limit_reached = True
+                self._cancel.set()
+        return pending
+    
+    def _search_file(self, path, size, mtime):
+        if self._cancel.is_set():
+            return None
+        with self._lock:
+            self.files_scanned += 1
+        if size == 0 or size > self.max_file_size:
+            with self._lock:
+                self.files_skipped += 1
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                if b'\0' in f.read(GREP_SNIFF_BYTES):
+                    with self._lock:
+                        self.files_skipped += 1
+                    return None
+                try:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    f.seek(0)
+                    data = f.read()
+                try:
+                    snippets = self._snippets(data)
+                finally:
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+        except OSError:
+            return None
+        return (path, size, mtime, snippets) if snippets else None
+    
+    def _snippets(self, data):
+        """First few matching lines as (line number, text)"""
+        snippets = []
+        line, counted, pos = 1, 0, 0
+        while len(snippets) < GREP_SNIPPETS_PER_FILE:
+            m = self._pattern.search(data, pos)
+            if m is None:
+                break
+            start = data.rfind(b'\n', 0, m.start()) + 1
+            end = data.find(b'\n', m.end())
+            if end < 0:
+                end = len(data)
+            line += data[counted:start].count(b'\n')
+            counted = start
+            text = data[start:min(end, start + GREP_SNIPPET_CHARS * 4)].decode('utf-8', errors='replace')
+            snippets.append((line, text.strip()[:GREP_SNIPPET_CHARS]))
+            pos = end + 1
+        return snippets
+
+
+# === LOG FOLLOWING ===
+
+TAIL_MAX_LINES = 1000
+TAIL_WINDOW_BYTES = 1024 * 1024
+TAIL_POLL_SECONDS = 1.0
+TAIL_MAX_BACKOFF_SECONDS = 30.0
+
+
+class LogFollower:
+    """Follow a growing file like `tail -f`, keeping only the last max_lines lines"""
+    
+    def __init__(self, path, max_lines=TAIL_MAX_LINES, interval=TAIL_POLL_SECONDS, on_update=None):
+        self.path = path
+        self.interval = interval
+        self.on_update = on_update
+        self.lines = deque(maxlen=max_lines)
+        self.offset = 0
+        self.rotations = 0
+        self.truncations = 0
+        self.error = None
+        
+        self._file = None
+        self._identity = None
+        self._partial = b''
+        self._mid_line = False
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Poll in a background thread until stop() is called"""
+        thread = threading.Thread(target=self._loop, daemon=True)
+        thread.start()
+        return thread
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _loop(self):
+        delay = self.interval
+        try:
+            while not self._stop.is_set():
+                try:
+                    if self.poll() and self.on_update:
+                        self.on_update(self)
+                    delay = self.interval
+                except Exception as e:
+                    # Report and retry with backoff; the file is reopened at the same offset
+                    self.error = f"{type(e).__name__}: {e}"
+                    self._close()
+                    delay = min(delay * 2, TAIL_MAX_BACKOFF_SECONDS)
+                    if self.on_update:
+                        try:
+                            self.on_update(self)
+                        except Exception:
+                            pass
+                self._stop.wait(delay)
+        finally:
+            self._close()
+    
+    def _close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+    
+    def poll(self):
+        """Read whatever was appended since the last poll; returns True if anything changed"""
+        try:
+            stat_info = fs_guard.call(scan_service.filesystem.stat, self.path)
+        except OSError as e:
+            # Mid-rotation the path can briefly be missing, or the mount not answer
+            changed = self.error is None
+            self.error = str(e)
+            return changed
+        changed = self.error is not None
+        self.error = None
+        
+        identity = (stat_info.st_dev, stat_info.st_ino)
+        if identity != self._identity:
+            first_open = self._identity is None
+            if self._file:
+                # Lines written to the old file just before it was rotated
+                self._read_to(fs_guard.call(_fstat, self.path, self._file).st_size)
+                if self._partial:
+                    self.lines.append(self._partial.decode('utf-8', errors='replace'))
+                self._close()
+            if not first_open:
+                self.rotations += 1
+                changed = True
+            self._file = fs_guard.call(open, self.path, 'rb')
+            self._identity = identity
+            self._partial = b''
+            # Start near the end on the first open, at the start of a new file
+            self.offset = 0 if not first_open else max(0, stat_info.st_size - TAIL_WINDOW_BYTES)
+            self._mid_line = self.offset > 0
+        elif self._file is None:
+            # Reopened after an error; carry on where reading stopped
+            self._file = fs_guard.call(open, self.path, 'rb')
+        
+        if stat_info.st_size < self.offset:
+            self.truncations += 1
+            self.offset = 0
+            self._partial = b''
+            self._mid_line = False
+        
+        return self._read_to(stat_info.st_size) or changed
+    
+    def _read_to(self, size):
+        """Read the open file from offset up to size into lines; returns True if anything was read"""
+        if size <= self.offset:
+            return False
+        if size - self.offset > TAIL_WINDOW_BYTES:
+            # A burst bigger than the window is skipped down to its tail
+            self.offset = size - TAIL_WINDOW_BYTES
+            self._partial = b''
+            self._mid_line = True
+        
+        self._file.seek(self.offset)
+        data = fs_guard.call(_read, self.path, self._file, size - self.offset)
+        self.offset += len(data)
+        
+        chunks = (self._partial + data).split(b'\n')
+        # The last piece has no newline yet; keep it for the next poll
+        self._partial = chunks.pop()[-TAIL_WINDOW_BYTES:]
+        if self._mid_line and chunks:
+            # Reading started inside a line, so its first piece is a fragment
+            chunks.pop(0)
+            self._mid_line = False
+        self.lines.extend(chunk.decode('utf-8', errors='replace') for chunk in chunks)
+        return bool(data)
+
+
+# === TABLE PREVIEW ===
+
+TABLE_EXTENSIONS = ('.csv', '.tsv', '.json', '.jsonl', '.ndjson')
+TABLE_HEAD_BYTES = 1024 * 1024
+TABLE_SAMPLE_BLOCKS = 32
+TABLE_BLOCK_BYTES = 64 * 1024
+TABLE_SAMPLE_ROWS = 1000
+TABLE_DISPLAY_ROWS = 20
+TABLE_CELL_CHARS = 80
+
+NULL_TOKENS = frozenset(['', 'null', 'none', 'na', 'n/a', 'nan'])
+_INT = re.compile(r'[-+]?\d+$')
+_FLOAT = re.compile(r'[-+]?(\d+\.\d*|\.\d+|\d+)([eE][-+]?\d+)?$|[-+]?(inf|infinity)$', re.IGNORECASE)
+_TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2}(?P<time>[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}:?\d{2})?$')
+
+
+def _text_type(value):
+    """Classify one CSV cell as null, bool, int, float, date, timestamp or string"""
+    text = value.strip()
+    lowered = text.lower()
+    if lowered in NULL_TOKENS:
+        return 'null'
+    if lowered in ('true', 'false'):
+        return 'bool'
+    if _INT.match(text):
+        return 'int'
+    if _FLOAT.match(text):
+        return 'float'
+    match = _TIMESTAMP.match(text)
+    if match:
+        return 'timestamp' if match.group('time') else 'date'
+    return 'string'
+
+
+def _json_type(value):
+    """Classify one decoded JSON value"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, list):
+        return 'array'
+    match = _TIMESTAMP.match(value)
+    if match:
+        return 'timestamp' if match.group('time') else 'date'
+    return 'string'
+
+
+def _merge_types(current, new, fallback):
+    """Widen a column type just enough to also cover a new value type"""
+    if current is None or current == new:
+        return new
+    if {current, new} <= {'int', 'float'}:
+        return 'float'
+    if {current, new} <= {'date', 'timestamp'}:
+        return 'timestamp'
+    return fallback
+
+
+def infer_schema(columns, rows, classify, fallback='string'):
+    """Return (type, null_count) per column from sampled rows; all-null columns stay 'null'"""
+    types = [None] * len(columns)
+    nulls = [0] * len(columns)
+    for row in rows:
+        for i, value in enumerate(row):
+            kind = classify(value)
+            if kind == 'null':
+                nulls[i] += 1
+            else:
+                types[i] = _merge_types(types[i], kind, fallback)
+    return [(kind or 'null', count) for kind, count in zip(types, nulls)]
+
+
+def _read_blocks(f, size, sample, rng, head_bytes=TABLE_HEAD_BYTES,
+                 blocks=TABLE_SAMPLE_BLOCKS, block_bytes=TABLE_BLOCK_BYTES):
+    """Yield (offset, data): the head of the file, or blocks spread evenly across it"""
+    if not sample or size <= blocks * block_bytes:
+        yield 0, f.read(head_bytes if not sample else size)
+        return
+    
+    # One block per stratum at a random position inside it; the first always
+    # starts at 0 so the CSV header is available
+    stride = size // blocks
+    for i in range(blocks):
+        offset = i * stride
+        if i and stride > block_bytes:
+            offset += rng.randrange(stride - block_bytes)
+        f.seek(offset)
+        yield offset, f.read(block_bytes)
+
+
+def _block_text(offset, data, size):
+    """Decode a block, dropping the partial lines cut off at either end"""
+    at_start = offset == 0
+    at_end = offset + len(data) >= size
+    begin = 0 if at_start else data.find(b'\n') + 1
+    end = len(data) if at_end else data.rfind(b'\n') + 1
+    if (not at_start and begin == 0) or begin >= end:
+        return ''
+    return data[begin:end].decode('utf-8-sig' if at_start else 'utf-8', errors='replace')
+
+
+def _reservoir(rows, k, rng):
+    """Uniform sample of k rows from an iterable of unknown length (Algorithm R)"""
+    sample = []
+    for i, row in enumerate(rows):
+        if i < k:
+            sample.append(row)
+        else:
+            j = rng.randrange(i + 1)
+            if j < k:
+                sample[j] = row
+    return sample
+
+
+def _json_array_items(text, limit):
+    """Decode items from the start of a JSON array, stopping where the text is cut off"""
+    decoder = json.JSONDecoder()
+    pos = text.index('[') + 1
+    items = []
+    while len(items) < limit:
+        while pos < len(text) and text[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(text) or text[pos] == ']':
+            break
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            break
+        items.append(item)
+    return items
+
+
+def preview_table(f, size, name, sample=False, max_rows=TABLE_SAMPLE_ROWS, rng=None):
+    """Parse the head (or, with sample=True, blocks spread across) a CSV or JSON file into rows and a schema"""
+    # Returns format, columns, schema [(type, nulls)], rows, skipped and bytes_read
+    import csv
+    
+    rng = rng or random.Random()
+    ext = Path(name).suffix.lower()
+    blocks = list(_read_blocks(f, size, sample, rng))
+    bytes_read = sum(len(data) for _, data in blocks)
+    texts = [_block_text(offset, data, size) for offset, data in blocks]
+    skipped = 0
+    
+    is_csv = ext in ('.csv', '.tsv')
+    if is_csv:
+        head = texts[0]
+        if ext == '.tsv':
+            delimiter = '\t'
+        else:
+            try:
+                delimiter = csv.Sniffer().sniff(head[:16384], delimiters=',\t;|').delimiter
+            except csv.Error:
+                delimiter = ','
+        
+        readers = [csv.reader(io.StringIO(text), delimiter=delimiter) for text in texts]
+        columns = next(readers[0], [])
+        
+        def rows():
+            nonlocal skipped
+            for reader in readers:
+                for row in reader:
+                    # A block can start inside a quoted multi-line field
+                    if len(row) == len(columns):
+                        yield row
+                    elif row:
+                        skipped += 1
+        
+        source = rows()
+        fmt, classify, fallback = 'CSV', _text_type, 'string'
+    else:
+        # The raw head, since a JSON array may have no line breaks at all
+        head = blocks[0][1].decode('utf-8-sig', errors='replace')
+        if head.lstrip().startswith('['):
+            # A JSON array can only be decoded from its start
+            source = _json_array_items(head, max_rows)
+            fmt = 'JSON array'
+        else:
+            def parse_lines():
+                nonlocal skipped
+                for text in texts:
+                    for line in text.splitlines():
+                        if not line.strip():
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            skipped += 1
+            source = parse_lines()
+            fmt = 'JSON lines'
+        classify, fallback = _json_type, 'mixed'
+    
+    picked = _reservoir(source, max_rows, rng) if sample else list(islice(source, max_rows))
+    
+    if not is_csv:
+        # Objects become rows over the union of their keys; other values one 'value' column
+        columns = []
+        seen = set()
+        for item in picked:
+            for key in (item if isinstance(item, dict) else ['value']):
+                if key not in seen:
+                    seen.add(key)
+                    columns.append(key)
+        picked = [
+            [item.get(key) for key in columns] if isinstance(item, dict)
+            else [item if key == 'value' else None for key in columns]
+            for item in picked
+        ]
+    
+    return {
+        'format': fmt,
+        'columns': columns,
+        'schema': infer_schema(columns, picked, classify, fallback),
+        'rows': picked,
+        'skipped': skipped,
+        'bytes_read': bytes_read,
+        'sampled': sample and len(blocks) > 1 and fmt != 'JSON array',
+    }
+
+
+# === GUARDED FILESYSTEM CALLS ===
+
+FS_TIMEOUT_SECONDS = 10.0
+FS_GUARD_WORKERS = 16
+FS_GUARD_BATCH = 64
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 60.0
+FS_GUARD_POLL_SECONDS = 0.5
+MOUNT_TABLE_SECONDS = 60.0
+
+
+class FilesystemTimeout(OSError):
+    """A filesystem call did not return within the guard's timeout"""
+
+
+class MountUnavailable(OSError):
+    """Calls under a mount are refused while its circuit breaker is open"""
+
+
+def _call_batch(guard, fn, paths, results, start):
+    """Apply fn to a run of paths, storing (result, error) as each one returns"""
+    for i, path in enumerate(paths, start):
+        try:
+            results[i] = (fn(path), None)
+        except OSError as e:
+            results[i] = (None, e)
+        guard.touch()
+
+
+def _readinto(path, f, buffer):
+    """f.readinto(buffer) for guard.call, which passes the path of f first"""
+    return f.readinto(buffer)
+
+
+def _fstat(path, f):
+    """os.fstat() of an open file for guard.call, which passes the path of f first"""
+    return os.fstat(f.fileno())
+
+
+def _read(path, f, size):
+    """f.read(size) for guard.call, which passes the path of f first"""
+    return f.read(size)
+
+
+def _makedirs(path):
+    """os.makedirs(path, exist_ok=True) for guard.call"""
+    os.makedirs(path, exist_ok=True)
+
+
+def _path_test(test, path):
+    """test(path), e.g. os.path.isfile, through the guard; False if the mount doesn't answer"""
+    try:
+        return fs_guard.call(test, path)
+    except OSError:
+        return False
+
+
+class _Lane:
+    """Run at most `limit` tasks at a time on a shared pool, queueing the rest in order"""
+    
+    def __init__(self, pool, limit):
+        self.pool = pool
+        self.limit = limit
+        self._queue = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+    
+    def submit(self, fn, *args):
+        future = Future()
+        with self._lock:
+            self._queue.append((future, fn, args))
+        self._dispatch()
+        return future
+    
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if self._running >= self.limit or not self._queue:
+                    return
+                task = self._queue.popleft()
+                self._running += 1
+            self.pool.submit(self._run, *task)
+    
+    def _run(self, future, fn, args):
+        try:
+            # Cancelled while queued, e.g. timed out behind a hung task
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
+
+
+class _GuardedCall:
+    """When a call through the guard was submitted, started and last made progress"""
+    
+    __slots__ = ('mount', 'submitted', 'started', 'progress')
+    
+    def __init__(self, mount):
+        self.mount = mount
+        self.submitted = time.monotonic()
+        self.started = None
+        self.progress = None
+
+
+class FilesystemGuard:
+    """Run filesystem calls on a shared pool, at most `workers` per mount, with a timeout and breaker per mount"""
+    
+    def __init__(self, timeout=FS_TIMEOUT_SECONDS, workers=FS_GUARD_WORKERS,
+                 threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN_SECONDS, pool=None):
+        self.timeout = timeout
+        self.workers = workers
+        self.threshold = threshold
+        self.cooldown = cooldown
+        
+        # A hung mount can hold at most its own lane's share of the pool
+        self.pool = pool or ThreadPoolExecutor(max_workers=workers * 2, thread_name_prefix='fs-guard')
+        self._lanes = {}
+        # mount -> (timeouts in a row, monotonic time the breaker stays open until)
+        self._breakers = {}
+        # mount -> monotonic time it last answered; future -> _GuardedCall
+        self._answered = {}
+        self._calls = {}
+        self._local = threading.local()
+        self._mounts = None
+        self._mounts_read = 0.0
+        self._lock = threading.Lock()
+    
+    def mount_of(self, path):
+        """Return the mount point that path lives on"""
+        # /proc/mounts never touches the mounts, and is re-read as mounts come and go
+        mounts = self._mounts
+        if mounts is None or time.monotonic() - self._mounts_read > MOUNT_TABLE_SECONDS:
+            try:
+                with open('/proc/mounts') as f:
+                    points = [line.split()[1].replace('\\040', ' ') for line in f if line.strip()]
+            except OSError:
+                points = []
+            mounts = self._mounts = sorted(set(points) | {'/'}, key=len, reverse=True)
+            self._mounts_read = time.monotonic()
+        path = os.path.abspath(path)
+        for point in mounts:
+            if path == point or path.startswith(point.rstrip('/') + '/'):
+                return point
+        return '/'
+    
+    def unavailable(self):
+        """Mounts whose breaker is open, with the seconds left until they are probed again"""
+        now = time.monotonic()
+        with self._lock:
+            return {mount: until - now for mount, (_, until) in self._breakers.items() if until > now}
+    
+    def timeout_error(self, path):
+        return FilesystemTimeout(errno.ETIMEDOUT, f"No response within {self.timeout:g}s", path)
+    
+    def call(self, fn, path, *args):
+        """Return fn(path, *args), raising FilesystemTimeout if the mount stops answering"""
+        if getattr(self._local, 'call', None) is not None:
+            # Already on a guard worker, which the caller's own timeout covers
+            return fn(path, *args)
+        future = self.submit(path, fn, path, *args)
+        while True:
+            done, _, timed_out = self.wait([future], self.timeout)
+            if done:
+                return future.result()
+            if timed_out:
+                raise self.timeout_error(path)
+    
+    def submit(self, path, fn, *args):
+        """Start fn(*args) on the workers of path's mount; returns a Future to pass to wait()"""
+        mount = self._admit(path)
+        call = _GuardedCall(mount)
+        
+        def run():
+            call.started = call.progress = time.monotonic()
+            self._local.call = call
+            try:
+                return fn(*args)
+            finally:
+                self._local.call = None
+                self._answered[mount] = time.monotonic()
+        
+        future = self._lane(mount).submit(run)
+        with self._lock:
+            self._calls[future] = call
+        # Forgotten when it finishes, even if nobody waits for it any more
+        # (e.g. a walk that stopped early)
+        future.add_done_callback(self._finished)
+        return future
+    
+    def _finished(self, future):
+        """Count an answer from a call that finished before timing out"""
+        with self._lock:
+            call = self._calls.pop(future, None)
+            if call is not None and not future.cancelled():
+                self._record(call.mount, timed_out=False)
+    
+    def touch(self):
+        """Report progress from inside a long call (e.g. per chunk read), so it isn't timed out"""
+        call = getattr(self._local, 'call', None)
+        if call is not None:
+            call.progress = self._answered[call.mount] = time.monotonic()
+    
+    def wait(self, futures, timeout=FS_GUARD_POLL_SECONDS):
+        """Wait up to timeout for any of the futures from submit(); returns (done, pending, timed_out)"""
+        # A running call times out after making no progress for the guard's
+        # timeout, a queued one once its mount has answered nothing for as long
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        now = time.monotonic()
+        timed_out = set()
+        with self._lock:
+            for future in pending:
+                call = self._calls.get(future)
+                if call is None:
+                    # Finished since wait() returned; picked up next time
+                    continue
+                last = call.progress if call.started else max(call.submitted, self._answered.get(call.mount, 0))
+                if now - last >= self.timeout:
+                    timed_out.add(future)
+                    self._record(self._calls.pop(future).mount, timed_out=True)
+        # Outside the lock, as cancelling runs the done callbacks
+        for future in timed_out:
+            future.cancel()
+        return done, pending - timed_out, timed_out
+    
+    def map(self, fn, paths, parent):
+        """Apply fn to many paths under parent in batches; returns [(result, error)] in input order"""
+        results = [None] * len(paths)
+        if getattr(self._local, 'call', None) is not None:
+            # Already on a guard worker; waiting for others from here could starve the pool
+            _call_batch(self, fn, paths, results, 0)
+            return results
+        # Small folders are spread over all workers, so one hung entry
+        # only holds up the few queued behind it
+        batch = min(FS_GUARD_BATCH, max(1, -(-len(paths) // (self.workers * 4))))
+        pending = {
+            self.submit(parent, _call_batch, self, fn, paths[i:i + batch], results, i)
+            for i in range(0, len(paths), batch)
+        }
+        while pending:
+            _, pending, _ = self.wait(pending, min(self.timeout, FS_GUARD_POLL_SECONDS))
+        
+        # Paths of timed-out batches that never answered
+        return [
+            result if result is not None else (None, self.timeout_error(path))
+            for path, result in zip(paths, results)
+        ]
+    
+    def _admit(self, path):
+        """Return the mount for path, failing fast if its breaker is open"""
+        mount = self.mount_of(path)
+        with self._lock:
+            failures, until = self._breakers.get(mount, (0, 0))
+        remaining = until - time.monotonic()
+        if remaining > 0:
+            raise MountUnavailable(
+                errno.ETIMEDOUT, f"{mount} stopped responding; retrying in {remaining:.0f}s", path
+            )
+        return mount
+    
+    def _lane(self, mount):
+        with self._lock:
+            lane = self._lanes.get(mount)
+            if lane is None:
+                lane = self._lanes[mount] = _Lane(self.pool, self.workers)
+            return lane
+    
+    def _record(self, mount, timed_out):
+        """Count a timeout against the mount's breaker, or reset it on an answer; called under _lock"""
+        if not timed_out:
+            self._breakers.pop(mount, None)
+            return
+        failures = self._breakers.get(mount, (0, 0))[0] + 1
+        until = time.monotonic() + self.cooldown if failures >= self.threshold else 0
+        self._breakers[mount] = (failures, until)
+
+
+
+# === FILESYSTEM BACKENDS ===
+# Listings, walks, navigation and the details panel get their metadata
+# (stat, lstat, listdir, scandir) from scan_service.filesystem, so it can
+# be swapped for a stand-in with scan_service.use_filesystem().
+
+class LocalFilesystem:
+    """Metadata calls straight to the operating system; the default backend"""
+    
+    stat = staticmethod(os.stat)
+    lstat = staticmethod(os.lstat)
+    listdir = staticmethod(os.listdir)
+    scandir = staticmethod(os.scandir)
+
+
+class LatencyFilesystem(LocalFilesystem):
+    """A local folder that answers like a slow, flaky network mount, counting the calls it serves"""
+    
+    def __init__(self, root, latency=0.005, jitter=0.0, timeout_rate=0.0, error_rate=0.0,
+                 hang_seconds=FS_TIMEOUT_SECONDS * 3, seed=None):
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.jitter = jitter
+        self.timeout_rate = timeout_rate
+        self.error_rate = error_rate
+        self.hang_seconds = hang_seconds
+        self.calls = {'stat': 0, 'lstat': 0, 'listdir': 0, 'scandir': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def _delay(self, op, path):
+        """Wait, hang or fail the way the simulated mount would for one call"""
+        path = os.fspath(path)
+        if path != self.root and not path.startswith(self.root.rstrip(os.sep) + os.sep):
+            return
+        with self._lock:
+            self.calls[op] += 1
+            roll = self._rng.random()
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if roll < self.timeout_rate:
+            time.sleep(self.hang_seconds)
+        elif roll < self.timeout_rate + self.error_rate:
+            raise OSError(errno.EIO, "Injected I/O error", path)
+        time.sleep(max(delay, 0.0))
+    
+    def stat(self, path, **kwargs):
+        self._delay('stat', path)
+        return os.stat(path, **kwargs)
+    
+    def lstat(self, path):
+        self._delay('lstat', path)
+        return os.lstat(path)
+    
+    def listdir(self, path):
+        self._delay('listdir', path)
+        return os.listdir(path)
+    
+    def scandir(self, path):
+        self._delay('scandir', path)
+        return _SlowScandir(self, os.scandir(path))
+
+
+class _SlowScandir:
+    """os.scandir() iterator whose entries' stat() goes through a LatencyFilesystem"""
+    
+    def __init__(self, fs, entries):
+        self._fs = fs
+        self._entries = entries
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self._entries.close()
+    
+    def close(self):
+        self._entries.close()
+    
+    def __iter__(self):
+        for entry in self._entries:
+            yield _SlowEntry(self._fs, entry)
+
+
+class _SlowEntry:
+    """A DirEntry whose name and type come free (from the listing) but whose stat() costs a call"""
+    
+    def __init__(self, fs, entry):
+        self._fs = fs
+        self._entry = entry
+        self.name = entry.name
+        self.path = entry.path
+    
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+    
+    def stat(self, follow_symlinks=True):
+        self._fs._delay('stat', self.path)
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+# === EXCLUSION RULES ===
+
+class ExcludeRules:
+    """Names to leave out of listings and walks: fnmatch globs, hidden names and extensions"""
+    
+    def __init__(self, globs=(), hidden=False, extensions=()):
+        self.globs = tuple(globs)
+        self.hidden = bool(hidden)
+        self.extensions = tuple(sorted({
+            ext.lower() if ext.startswith('.') else '.' + ext.lower() for ext in extensions
+        }))
+        self._glob_match = (re.compile('|'.join(map(fnmatch.translate, self.globs))).match
+                            if self.globs else None)
+    
+    @classmethod
+    def parse(cls, text, hidden=False):
+        """Rules from comma-separated patterns; a bare '.ext' is an extension"""
+        globs, extensions = [], []
+        for pattern in filter(None, (p.strip() for p in text.split(','))):
+            if pattern.startswith('.') and not any(c in pattern for c in '*?['):
+                extensions.append(pattern)
+            else:
+                globs.append(pattern)
+        return cls(globs, hidden, extensions)
+    
+    def to_text(self):
+        """The patterns in the form parse() reads"""
+        return ', '.join(self.globs + self.extensions)
+    
+    def to_json(self):
+        return [list(self.globs), self.hidden, list(self.extensions)]
+    
+    @classmethod
+    def from_json(cls, data):
+        return cls(*data)
+    
+    def _key(self):
+        return (self.globs, self.hidden, self.extensions)
+    
+    def __eq__(self, other):
+        return isinstance(other, ExcludeRules) and self._key() == other._key()
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def __bool__(self):
+        return bool(self.globs or self.hidden or self.extensions)
+    
+    def __repr__(self):
+        return f"ExcludeRules(globs={self.globs!r}, hidden={self.hidden!r}, extensions={self.extensions!r})"
+    
+    def excludes(self, name):
+        return ((self.hidden and name.startswith('.'))
+                or (self.extensions and name.lower().endswith(self.extensions))
+                or (self._glob_match is not None and self._glob_match(name) is not None))
+    
+    def split(self, names):
+        """(names kept, number excluded)"""
+        if not self:
+            return names, 0
+        kept = [name for name in names if not self.excludes(name)]
+        return kept, len(names) - len(kept)
+
+
+def exclude_rules(exclude):
+    """ExcludeRules from rules, a list of glob patterns, or None"""
+    if isinstance(exclude, ExcludeRules):
+        return exclude
+    if exclude is None:
+        return ExcludeRules()
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    return ExcludeRules(exclude)
+
+
+# Commit markers and checksum sidecars that fill Spark output folders
+SPARK_EXCLUDES = ExcludeRules(globs=('_committed_*', '_started_*', '_SUCCESS'), extensions=('.crc',))
+
+
+# === SHARED SCAN SERVICE ===
+
+SCAN_SERVICE_WORKERS = 32
+SCAN_CACHE_MAX_AGE = 10.0
+SCAN_CACHE_FOLDERS = 256
+SCAN_CACHE_ENTRIES = 500000
+
+
+class ScanService:
+    """Cached, coalesced folder listings and the one worker pool shared by every explorer, job and scan()"""
+    
+    def __init__(self, workers=SCAN_SERVICE_WORKERS, max_folders=SCAN_CACHE_FOLDERS,
+                 max_entries=SCAN_CACHE_ENTRIES, filesystem=None):
+        # Every job's filesystem work runs on this pool through the guard, so
+        # any number of explorers and scans put a fixed load on the mounts
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scan')
+        self.guard = FilesystemGuard(pool=self.pool)
+        self.filesystem = filesystem or LocalFilesystem()
+        self.max_folders = max_folders
+        self.max_entries = max_entries
+        
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        
+        self._cache = OrderedDict()
+        self._entries = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+    
+    def listing(self, path, max_age=SCAN_CACHE_MAX_AGE, mtime=None, exclude=None):
+        """Folder listing as a dict of path, mtime, names, stats [(stat_result, error)], excluded and listed_at"""
+        # max_age=0 lists afresh (still joining a listing in flight); passing
+        # the folder's mtime rules out a cached listing of an older version
+        rules = exclude_rules(exclude)
+        key = (path, rules)
+        with self._lock:
+            cached = self._cache.get(key)
+            if (cached is not None and time.monotonic() - cached['listed_at'] <= max_age
+                    and mtime in (None, cached['mtime'])):
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            result = self._list(path, rules)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        
+        with self._lock:
+            del self._inflight[key]
+            # Listings with timed-out entries are not worth sharing
+            if not any(isinstance(error, FilesystemTimeout) for _, error in result['stats']):
+                self._store(key, result)
+        future.set_result(result)
+        return result
+    
+    def use_filesystem(self, filesystem):
+        """Serve metadata from another backend from now on; returns the previous one"""
+        with self._lock:
+            previous, self.filesystem = self.filesystem, filesystem
+            # Nothing listed from the old backend may be served from the new one
+            self._cache.clear()
+            self._entries = 0
+        return previous
+    
+    def invalidate(self, path):
+        """Forget the cached listings of a folder, e.g. after changing its contents"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == path]:
+                self._entries -= len(self._cache.pop(key)['names'])
+    
+    def _list(self, path, rules):
+        fs = self.filesystem
+        mtime = self.guard.call(fs.stat, path).st_mtime
+        names = self.guard.call(fs.listdir, path)
+        # Excluded names are dropped before anything is stat'ed
+        names, excluded = rules.split(names)
+        stats = self.guard.map(fs.stat, [os.path.join(path, name) for name in names], path)
+        return {'path': path, 'mtime': mtime, 'names': names, 'stats': stats, 'excluded': excluded,
+                'listed_at': time.monotonic()}
+    
+    def _store(self, key, result):
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._entries -= len(old['names'])
+        self._cache[key] = result
+        self._entries += len(result['names'])
+        while len(self._cache) > 1 and (len(self._cache) > self.max_folders or self._entries > self.max_entries):
+            self._entries -= len(self._cache.popitem(last=False)[1]['names'])
+
+
+# Shared by every explorer and scan() call; tune e.g. fs_guard.timeout = 30
+scan_service = ScanService()
+fs_guard = scan_service.guard
+
+
+# === INCREMENTAL TREE SCAN ===
+
+TREE_RACY_SECONDS = 2.0
+# Folders and names a TreeIndex keeps; folders past it are listed again on every walk
+TREE_INDEX_ENTRIES = 1000000
+
+
+class TreeIndex:
+    """A tree remembered between walks, so a rescan only lists folders whose (mtime, nlink) changed"""
+    # Rewriting a file in place doesn't change its folder's mtime, so sizes in
+    # unchanged folders can lag; folders modified within TREE_RACY_SECONDS of
+    # being listed are always listed again. Only callers that keep an index
+    # and walk it again get this; the jobs and scan() walk afresh by default
+    
+    def __init__(self, root, exclude=None, follow_symlinks=False, max_entries=TREE_INDEX_ENTRIES):
+        self.root = os.path.abspath(root)
+        self.exclude = exclude_rules(exclude)
+        self.follow_symlinks = follow_symlinks
+        self.max_entries = max_entries
+        
+        # path -> (fingerprint, listed_at, subfolder names, file names,
+        # file sizes, file mtimes, excluded count), and the names they hold
+        self.folders = {}
+        self.entries = 0
+        self._lock = threading.Lock()
+        
+        # Counts for the last walk
+        self.listed = 0
+        self.reused = 0
+        self.duplicates = 0
+        self.excluded = 0
+    
+    def walk(self, workers=BULK_WORKERS, cancel=None):
+        """Walk the tree like walk_tree, but listing only changed folders"""
+        for folder, _, entry, error, _ in self.visits(workers, cancel):
+            if entry is None:
+                yield folder, [], [], error
+                continue
+            dirs = [os.path.join(folder, name) for name in entry[2]]
+            files = list(zip([os.path.join(folder, name) for name in entry[3]], entry[4], entry[5]))
+            yield folder, dirs, files, error
+    
+    def visits(self, workers=BULK_WORKERS, cancel=None):
+        """Yield (folder, folder mtime, entry, error, entry errors) for each folder walked"""
+        # A complete walk replaces the index; a cancelled one only adds what it
+        # saw. Folders already seen through another path come with no entry
+        self.listed = self.reused = self.duplicates = self.excluded = 0
+        stack = [self.root]
+        pending = {}
+        seen = set()
+        folders = {}
+        entries = 0
+        complete = False
+        try:
+            while stack or pending:
+                if cancel is not None and cancel.is_set():
+                    return
+                while stack and len(pending) < workers * 2:
+                    folder = stack.pop()
+                    try:
+                        pending[fs_guard.submit(folder, self._visit, folder)] = folder
+                    except MountUnavailable as e:
+                        yield folder, float('nan'), None, e, []
+                if not pending:
+                    continue
+                done, _, timed_out = fs_guard.wait(pending)
+                for future in timed_out:
+                    folder = pending.pop(future)
+                    yield folder, float('nan'), None, fs_guard.timeout_error(folder), []
+                for future in done:
+                    del pending[future]
+                    folder, key, mtime, entry, listed, error, entry_errors = future.result()
+                    if key is not None:
+                        if key in seen:
+                            self.duplicates += 1
+                            yield folder, mtime, None, None, []
+                            continue
+                        seen.add(key)
+                    if entry is None:
+                        yield folder, mtime, None, error, []
+                        continue
+                    
+                    # Folders with unreadable entries are listed again next time
+                    if not entry_errors and entries + _entry_names(entry) <= self.max_entries:
+                        folders[folder] = entry
+                        entries += _entry_names(entry)
+                    if listed:
+                        self.listed += 1
+                    else:
+                        self.reused += 1
+                    self.excluded += entry[6]
+                    stack.extend(os.path.join(folder, name) for name in entry[2])
+                    yield folder, mtime, entry, error, entry_errors
+            complete = True
+        finally:
+            with self._lock:
+                if complete:
+                    self.folders, self.entries = folders, entries
+                else:
+                    for folder, entry in folders.items():
+                        old = self.folders.get(folder)
+                        grow = _entry_names(entry) - (_entry_names(old) if old else 0)
+                        if self.entries + grow <= self.max_entries:
+                            self.folders[folder] = entry
+                            self.entries += grow
+    
+    def _visit(self, path):
+        """(path, (st_dev, st_ino), mtime, entry, whether it was listed, error, entry errors) for one folder"""
+        fs = scan_service.filesystem
+        try:
+            stat_info = fs.stat(path) if self.follow_symlinks else fs.lstat(path)
+        except OSError as e:
+            return path, None, float('nan'), None, False, e, []
+        key = (stat_info.st_dev, stat_info.st_ino)
+        fingerprint = (stat_info.st_mtime_ns, stat_info.st_nlink)
+        
+        old = self.folders.get(path)
+        if old is not None and old[0] == fingerprint and stat_info.st_mtime < old[1] - TREE_RACY_SECONDS:
+            return path, key, stat_info.st_mtime, old, False, None, []
+        
+        listed_at = time.time()
+        try:
+            dirs, names, sizes, mtimes, excluded, entry_errors = read_folder(path, self.exclude, self.follow_symlinks)
+        except OSError as e:
+            # Not stored, so the next walk tries it again
+            return path, key, stat_info.st_mtime, None, True, e, []
+        entry = (fingerprint, listed_at, dirs, names, sizes, mtimes, excluded)
+        return path, key, stat_info.st_mtime, entry, True, None, entry_errors
+
+
+def _entry_names(entry):
+    """Number of entries a TreeIndex entry holds: the folder and the names in it"""
+    return 1 + len(entry[2]) + len(entry[3])
+
+
+# === HEADLESS SCAN API ===
+
+FILE_TYPES = {
+    '.py': 'Python',
+    '.ipynb': 'Notebook',
+    '.sql': 'SQL',
+    '.txt': 'Text',
+    '.md': 'Markdown',
+    '.csv': 'CSV',
+    '.json': 'JSON',
+    '.xml': 'XML',
+    '.yaml': 'YAML',
+    '.yml': 'YAML',
+    '.parquet': 'Parquet',
+    '.delta': 'Delta',
+    '.jar': 'JAR',
+    '.scala': 'Scala',
+    '.r': 'R Script',
+    '.sh': 'Shell',
+    '.html': 'HTML',
+    '.css': 'CSS',
+    '.js': 'JavaScript',
+    '.png': 'Image',
+    '.jpg': 'Image',
+    '.jpeg': 'Image',
+    '.gif': 'Image',
+    '.pdf': 'PDF',
+    '.zip': 'Archive',
+    '.tar': 'Archive',
+    '.gz': 'Archive',
+    '.log': 'Log',
+}
+
+SCAN_COLUMNS = ('path', 'parent', 'name', 'is_dir', 'size', 'modified', 'type')
+SCAN_OUTPUTS = ('pandas', 'arrow', 'dict')
+
+
+def file_type(path, is_dir):
+    """Describe a path the way the explorer's Type column does"""
+    if is_dir:
+        return "Folder"
+    ext = Path(path).suffix.lower()
+    return FILE_TYPES.get(ext, ext[1:].upper() if ext else 'File')
+
+
+def _scan_rows(path, recursive, include_dirs, workers, errors, exclude, index):
+    """Yield (path, is_dir, size, mtime) for everything scan() should return"""
+    rules = exclude_rules(exclude)
+    location = split_archive_path(path)
+    if location:
+        # Archives come from the same cached member index the explorer uses
+        archive, inner = location
+        folders = archive_index(archive)
+        if inner not in folders:
+            raise NotADirectoryError(errno.ENOTDIR, "Not a folder", path)
+        prefix = len(inner)
+        for folder, members in folders.items():
+            if folder != inner and not (recursive and folder.startswith(inner + '/' if inner else '')):
+                continue
+            base = os.path.join(path, folder[prefix:].lstrip('/'))
+            for name, entry in members.items():
+                if (include_dirs or not entry['is_dir']) and not rules.excludes(name):
+                    yield os.path.join(base, name), entry['is_dir'], entry['size'], entry['modified']
+        return
+    
+    if not recursive:
+        # Same shared, guarded listing as the explorer's folder view
+        listing = scan_service.listing(path, exclude=exclude)
+        full_paths = [os.path.join(path, name) for name in listing['names']]
+        for full_path, (stat_info, error) in zip(full_paths, listing['stats']):
+            if error is not None:
+                if errors == 'raise':
+                    raise error
+                continue
+            is_dir = stat.S_ISDIR(stat_info.st_mode)
+            if include_dirs or not is_dir:
+                yield full_path, is_dir, 0 if is_dir else stat_info.st_size, stat_info.st_mtime
+        return
+    
+    # Each folder's row comes from the stat taken when the walk visits it; an
+    # index that keeps nothing makes a fresh walk
+    if index is None:
+        index = TreeIndex(path, rules, max_entries=0)
+    for folder, folder_mtime, entry, error, entry_errors in index.visits(workers):
+        if errors == 'raise':
+            if error is not None:
+                raise error
+            if entry_errors:
+                raise entry_errors[0]
+        if include_dirs and folder != path:
+            yield folder, True, 0, folder_mtime
+        if entry is None:
+            continue
+        for name, size, mtime in zip(entry[3], entry[4], entry[5]):
+            yield os.path.join(folder, name), False, size, mtime
+
+
+def scan(path, recursive=False, columns=SCAN_COLUMNS, output='pandas', include_dirs=True,
+         workers=BULK_WORKERS, errors='ignore', exclude=None, index=None):
+    """
+    List a folder (or a whole subtree) without any UI, as a table.
+    
+    Args:
+        path: Folder to list.
+        recursive: Include everything below path, not just its children.
+        columns: Any of SCAN_COLUMNS; 'modified' is a timestamp (UTC).
+        output: 'pandas' (DataFrame), 'arrow' (pyarrow Table) or 'dict'
+            (plain column lists, no extra dependency).
+        include_dirs: Include rows for folders as well as files.
+        workers: Folders listed at once when recursive.
+        errors: 'ignore' skips unreadable entries, 'raise' raises the first error.
+        exclude: ExcludeRules (e.g. SPARK_EXCLUDES) or glob patterns of
+            names to leave out, e.g. ['.*', '*.crc']; excluded names are
+            never stat'ed and excluded folders are not descended into.
+        index: A TreeIndex of path to walk when recursive, instead of a
+            fresh walk; rescans only list folders changed since its last
+            walk, but sizes of files rewritten in place can lag.
+    
+    Example:
+        df = scan("/dbfs/mnt/raw", recursive=True, columns=["path", "size", "type"])
+        df.groupby("type")["size"].sum().sort_values(ascending=False)
+    """
+    columns = list(columns)
+    unknown = [c for c in columns if c not in SCAN_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown column(s) {unknown}; choose from {list(SCAN_COLUMNS)}")
+    if output not in SCAN_OUTPUTS:
+        raise ValueError(f"output must be one of {list(SCAN_OUTPUTS)}")
+    
+    path = os.path.abspath(path)
+    if index is not None and (index.root != path or index.exclude != exclude_rules(exclude)):
+        raise ValueError("index must be a TreeIndex of path with the same exclude rules")
+    if not split_archive_path(path) and not stat.S_ISDIR(fs_guard.call(scan_service.filesystem.stat, path).st_mode):
+        raise NotADirectoryError(errno.ENOTDIR, "Not a folder", path)
+    
+    paths, is_dirs, sizes, mtimes = [], [], [], []
+    for row_path, is_dir, size, mtime in _scan_rows(path, recursive, include_dirs, workers, errors, exclude, index):
+        paths.append(row_path)
+        is_dirs.append(is_dir)
+        sizes.append(size)
+        mtimes.append(mtime)
+    
+    # Derived columns are only computed when asked for
+    data = {}
+    for column in columns:
+        if column == 'path':
+            data[column] = paths
+        elif column == 'parent':
+            data[column] = [os.path.dirname(p) for p in paths]
+        elif column == 'name':
+            data[column] = [os.path.basename(p) for p in paths]
+        elif column == 'is_dir':
+            data[column] = is_dirs
+        elif column == 'size':
+            data[column] = sizes
+        elif column == 'modified':
+            data[column] = mtimes
+        elif column == 'type':
+            data[column] = list(map(file_type, paths, is_dirs))
+    
+    if output == 'dict':
+        return data
+    
+    if output == 'arrow':
+        import pyarrow as pa
+        arrays = {}
+        for column, values in data.items():
+            if column == 'modified':
+                micros = [int(m * 1_000_000) if m == m else None for m in values]
+                arrays[column] = pa.array(micros, pa.timestamp('us', tz='UTC'))
+            else:
+                arrays[column] = pa.array(values)
+        return pa.table(arrays)
+    
+    import pandas as pd
+    frame = pd.DataFrame(data, columns=columns)
+    if 'modified' in frame:
+        frame['modified'] = pd.to_datetime(frame['modified'], unit='s', utc=True)
+    return frame
+
+
+# === INVENTORY EXPORT ===
+
+INVENTORY_BATCH_ROWS = 100000
+INVENTORY_FORMATS = ('parquet', 'csv')
+INVENTORY_COLUMNS = ('path', 'is_dir', 'size', 'modified', 'type')
+INVENTORY_CHECKPOINT = '_checkpoint.json'
+# Where relative (or empty) inventory destinations are created
+INVENTORY_OUTPUT_DIR = os.path.join('~', 'inventories')
+
+
+def inventory_destination(root, dest='', output_dir=INVENTORY_OUTPUT_DIR):
+    """Folder an inventory of root is written to: dest if absolute, else under output_dir"""
+    # The default name depends only on root, so running again resumes
+    name = dest or 'inventory-' + (re.sub(r'[^\w.-]+', '_', os.path.abspath(root).strip('/')) or 'root')
+    return os.path.abspath(os.path.join(os.path.expanduser(output_dir), os.path.expanduser(name)))
+
+
+class InventoryExport:
+    """Stream (path, is_dir, size, modified, type) rows for a subtree to resumable Parquet/CSV parts in dest"""
+    
+    def __init__(self, root, dest, fmt='parquet', batch_rows=INVENTORY_BATCH_ROWS,
+                 workers=BULK_WORKERS, on_progress=None, on_done=None):
+        if fmt not in INVENTORY_FORMATS:
+            raise ValueError(f"Format must be one of {list(INVENTORY_FORMATS)}")
+        self.root = os.path.abspath(root)
+        self.dest = os.path.abspath(dest)
+        if self.dest == self.root or self.dest.startswith(self.root.rstrip('/') + '/'):
+            raise ValueError(f"{self.dest} is inside the folder being inventoried; choose a destination outside it")
+        self.fmt = fmt
+        self.batch_rows = batch_rows
+        self.workers = workers
+        self.on_progress = on_progress
+        self.on_done = on_done
+        
+        self.rows_written = 0
+        self.dirs_scanned = 0
+        self.parts = 0
+        self.errors = 0
+        self.resumed = False
+        self.error = None
+        self.started = None
+        self.finished = None
+        
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    def throughput(self):
+        """Rows written per second so far"""
+        if not self.started:
+            return 0.0
+        elapsed = (self.finished or time.time()) - self.started
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+    
+    def start(self):
+        """Run the export in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        """Walk the tree and write the parts, blocking until done, failed or cancelled"""
+        self.started = time.time()
+        try:
+            self._export()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = time.time()
+            if self.on_done:
+                self.on_done(self)
+    
+    def _export(self):
+        stack = self._load_checkpoint()
+        batch = []
+        last_report = 0.0
+        
+        pending = {}
+        while stack or pending:
+            if self._cancel.is_set():
+                return
+            while stack and len(pending) < self.workers * 2:
+                folder = stack.pop()
+                try:
+                    pending[fs_guard.submit(folder, _scan_dir, folder)] = folder
+                except MountUnavailable:
+                    # Left out like a folder that timed out
+                    self.dirs_scanned += 1
+                    self.errors += 1
+            if not pending:
+                continue
+            done, _, timed_out = fs_guard.wait(pending)
+            for future in timed_out:
+                # Left out of this inventory; its subtree isn't resumed either
+                del pending[future]
+                self.dirs_scanned += 1
+                self.errors += 1
+            for future in done:
+                del pending[future]
+                folder, dirs, files, error = future.result()
+                self.dirs_scanned += 1
+                if error:
+                    self.errors += 1
+                stack.extend(dirs)
+                # Subfolders are not stat'ed by the walk; their mtime is left empty
+                batch.extend((path, True, 0, None) for path in dirs)
+                batch.extend((path, False, size, mtime) for path, size, mtime in files)
+            
+            if len(batch) >= self.batch_rows:
+                # Every listed folder's rows are in this part, so the
+                # folders still queued or in flight are all a resume needs
+                self._write_part(batch)
+                batch = []
+                self._save_checkpoint(stack + list(pending.values()))
+            
+            if self.on_progress and time.time() - last_report > 0.5:
+                last_report = time.time()
+                self.on_progress(self)
+        
+        if batch:
+            self._write_part(batch)
+        open(os.path.join(self.dest, '_SUCCESS'), 'w').close()
+        os.remove(os.path.join(self.dest, INVENTORY_CHECKPOINT))
+    
+    def _load_checkpoint(self):
+        """Return the folders left to walk, from the checkpoint if there is one"""
+        path = os.path.join(self.dest, INVENTORY_CHECKPOINT)
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            checkpoint = None
+        
+        if checkpoint and checkpoint.get('root') == self.root and checkpoint.get('format') == self.fmt:
+            self.parts = checkpoint['parts']
+            self.rows_written = checkpoint['rows']
+            self.resumed = True
+            return checkpoint['stack']
+        
+        os.makedirs(self.dest, exist_ok=True)
+        if any(name.startswith(('part-', '_SUCCESS')) for name in os.listdir(self.dest)):
+            raise FileExistsError(errno.EEXIST, "Destination already holds an inventory", self.dest)
+        self._save_checkpoint([self.root])
+        return [self.root]
+    
+    def _save_checkpoint(self, stack):
+        path = os.path.join(self.dest, INVENTORY_CHECKPOINT)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({
+                'root': self.root,
+                'format': self.fmt,
+                'parts': self.parts,
+                'rows': self.rows_written,
+                'stack': stack,
+            }, f)
+        os.replace(path + '.tmp', path)
+    
+    def _write_part(self, rows):
+        """Write rows as the next part file; it only appears under its final name once complete"""
+        name = f"part-{self.parts:05d}.{self.fmt}"
+        tmp_path = os.path.join(self.dest, '.' + name + '.tmp')
+        
+        if self.fmt == 'csv':
+            import csv
+            # modified is ISO-8601 in UTC, the same instant the Parquet timestamp holds
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(INVENTORY_COLUMNS)
+                for path, is_dir, size, mtime in rows:
+                    modified = '' if mtime is None else datetime.fromtimestamp(mtime, timezone.utc).isoformat()
+                    writer.writerow((path, is_dir, size, modified, file_type(path, is_dir)))
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = pa.schema([
+                ('path', pa.string()),
+                ('is_dir', pa.bool_()),
+                ('size', pa.int64()),
+                ('modified', pa.timestamp('us', tz='UTC')),
+                ('type', pa.string()),
+            ])
+            with pq.ParquetWriter(tmp_path, schema) as writer:
+                for start in range(0, len(rows), self.batch_rows):
+                    chunk = rows[start:start + self.batch_rows]
+                    writer.write_batch(pa.record_batch([
+                        [r[0] for r in chunk],
+                        [r[1] for r in chunk],
+                        [r[2] for r in chunk],
+                        [None if r[3] is None else int(r[3] * 1_000_000) for r in chunk],
+                        [file_type(r[0], r[1]) for r in chunk],
+                    ], schema=schema))
+        
+        os.replace(tmp_path, os.path.join(self.dest, name))
+        self.parts += 1
+        self.rows_written += len(rows)
+
+
+# === VIEW CACHE ===
+
+VIEW_CACHE_SIZE = 8
+VIEW_CACHE_MAX_ROWS = 20000
+
+
+def close_widget_tree(widget):
+    """Close a widget, every widget inside it and their layout/style models"""
+    for child in getattr(widget, 'children', ()):
+        close_widget_tree(child)
+    for part in (getattr(widget, 'layout', None), getattr(widget, 'style', None)):
+        if isinstance(part, widgets.Widget):
+            part.close()
+    widget.close()
+
+
+class ViewCache:
+    """Rendered file list views ('box' and 'visible' rows) keyed by history index, closed when evicted"""
+    
+    def __init__(self, max_views=VIEW_CACHE_SIZE, max_rows=VIEW_CACHE_MAX_ROWS):
+        self.max_views = max_views
+        self.max_rows = max_rows
+        self.rows = 0
+        self._views = OrderedDict()
+    
+    def get(self, key):
+        view = self._views.get(key)
+        if view is not None:
+            self._views.move_to_end(key)
+        return view
+    
+    def put(self, key, view):
+        """Store a view, replacing (and closing) the one stored under key before"""
+        old = self._views.pop(key, None)
+        if old is not None and old['box'] is not view['box']:
+            self._release(old)
+        elif old is not None:
+            self.rows -= len(old['visible'])
+        self._views[key] = view
+        self.rows += len(view['visible'])
+        # The newest view is always kept, even if it alone is over max_rows
+        while len(self._views) > 1 and (len(self._views) > self.max_views or self.rows > self.max_rows):
+            self._release(self._views.popitem(last=False)[1])
+    
+    def holds(self, box):
+        return any(view['box'] is box for view in self._views.values())
+    
+    def discard_after(self, key):
+        """Drop views for history entries past key (forward history that was cut off)"""
+        for stale in [k for k in self._views if k > key]:
+            self._release(self._views.pop(stale))
+    
+    def _release(self, view):
+        self.rows -= len(view['visible'])
+        close_widget_tree(view['box'])
+
+
+# === SESSION PERSISTENCE ===
+# History, sort order and the most recent listings are saved to a local file
+# so re-running the cell shows the last view at once; saved listings are only
+# reused for folders whose mtime hasn't changed since.
+
+SESSION_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'dbfs-explorer', 'session.json.gz')
+SESSION_VERSION = 3
+SESSION_MAX_FOLDERS = 16
+SESSION_MAX_ENTRIES = 100000
+SESSION_SAVE_DELAY = 1.0
+
+
+def load_session(path=SESSION_FILE):
+    """Read a saved explorer session; None if there is none or it is unreadable"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            session = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return None
+    if not isinstance(session, dict) or session.get('version') != SESSION_VERSION or not _valid_session(session):
+        return None
+    return session
+
+
+def _valid_session(session):
+    """Check that a session has every key the explorer reads, with the right types"""
+    try:
+        sort_by, then_by, reverse = session['sort']
+        globs, hidden, extensions = session['exclude']
+        return (isinstance(session['current_path'], str)
+                and all(isinstance(path, str) for path in session['history'])
+                and isinstance(session['history_index'], int)
+                and isinstance(sort_by, str) and isinstance(then_by, str) and isinstance(reverse, bool)
+                and isinstance(globs, list) and isinstance(hidden, bool) and isinstance(extensions, list)
+                and all(isinstance(path, str) and isinstance(mtime, (int, float)) and isinstance(skipped, int)
+                        and all(isinstance(row, list) and len(row) == 7 for row in rows)
+                        for path, mtime, rows, skipped in session['folders']))
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def save_session(session, path=SESSION_FILE):
+    """Write a session through a temporary file so a crash never leaves a torn one"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=1) as f:
+            json.dump(session, f, separators=(',', ':'))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# === OWNERSHIP ===
+
+try:
+    import grp
+    import pwd
+except ImportError:
+    # Not available on Windows; ids are shown as numbers there
+    grp = pwd = None
+
+
+@lru_cache(maxsize=None)
+def user_name(uid):
+    """Name of a uid, looked up once per kernel; the number if it has none"""
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except (AttributeError, KeyError):
+        return str(uid)
+
+
+@lru_cache(maxsize=None)
+def group_name(gid):
+    """Name of a gid, looked up once per kernel; the number if it has none"""
+    try:
+        return grp.getgrgid(gid).gr_name
+    except (AttributeError, KeyError):
+        return str(gid)
+
+
+# === SPILLED LISTINGS ===
+
+SPILL_MEMORY_BUDGET = 256 * 1024 * 1024
+# Rough memory per entry while a run is sorted, which sizes the runs
+SPILL_ROW_BYTES = 1000
+SPILL_PAGE_ROWS = 500
+SPILL_INDEX_EVERY = 1024
+SPILL_SORTED_FILES = 2
+SPILL_SEARCH_CHUNK = 10000
+
+# Sort keys of spilled rows: [name, is_dir, size, mtime, mode, uid, gid]
+_ROW_SORT_KEYS = {
+    'name': lambda row: natural_key(row[0]),
+    'size': itemgetter(2),
+    'date': itemgetter(3),
+    'type': lambda row: file_type(row[0], row[1]).lower()
+}
+
+
+class _Descending:
+    """Wraps a sort key so that it orders in reverse"""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __lt__(self, other):
+        return other.value < self.value
+    
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _row_sort_key(keys, reverse):
+    """Ascending sort key for spilled rows: directories first, reverse flips only the primary key"""
+    primary = _ROW_SORT_KEYS[keys[0]]
+    rest = [_ROW_SORT_KEYS[key] for key in keys[1:]]
+    if reverse and keys[0] in ('size', 'date'):
+        # Numbers are negated, which is much cheaper than a wrapper
+        primary = lambda row, get=primary: -get(row)
+    elif reverse:
+        primary = lambda row, get=primary: _Descending(get(row))
+    
+    def key(row):
+        return (not row[1], primary(row), *[get(row) for get in rest])
+    return key
+
+
+# Rows are stored with marshal in blocks of SPILL_INDEX_EVERY, much faster
+# to read and write than JSON lines and fine for temporary files read back
+# by the same Python
+
+def _read_rows(path, offsets, first_block=0):
+    """Rows of a spill file, from the start of block first_block on"""
+    with open(path, 'rb') as f:
+        f.seek(offsets[first_block])
+        for start, end in zip(offsets[first_block:], offsets[first_block + 1:]):
+            yield from marshal.loads(f.read(end - start))
+
+
+def _write_rows(path, rows):
+    """Write rows to a spill file; returns the byte offsets of its blocks and of its end"""
+    offsets = [0]
+    rows = iter(rows)
+    with open(path, 'wb') as f:
+        while True:
+            block = list(islice(rows, SPILL_INDEX_EVERY))
+            if not block:
+                return offsets
+            f.write(marshal.dumps(block))
+            offsets.append(f.tell())
+
+
+class SpilledListing:
+    """A folder listing kept on disk in sorted runs, paged and searched without loading it whole"""
+    
+    def __init__(self, path, exclude=None, memory_budget=SPILL_MEMORY_BUDGET, on_progress=None):
+        self.path = path
+        self.exclude = exclude_rules(exclude)
+        self.run_rows = max(1000, memory_budget // SPILL_ROW_BYTES)
+        self.on_progress = on_progress
+        
+        self.count = 0
+        self.dirs = 0
+        self.bytes_total = 0
+        self.excluded = 0
+        self.errors = 0
+        self.mtime = None
+        
+        self._dir = tempfile.mkdtemp(prefix='dbfs-explorer-spill-')
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self._dir, True)
+        self._runs = []
+        self._sorted = OrderedDict()
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        """Stop a build or sort at its next run, raising OperationCancelled there"""
+        self._cancel.set()
+    
+    def close(self):
+        self._cleanup()
+    
+    def build(self):
+        """Read and stat the whole folder into runs on disk"""
+        fs = scan_service.filesystem
+        self.mtime = fs_guard.call(fs.stat, self.path).st_mtime
+        # Opening the folder is guarded; reading it is a stream, guarded per stat batch
+        with fs_guard.call(fs.scandir, self.path) as entries:
+            while True:
+                names = [entry.name for entry in islice(entries, self.run_rows)]
+                if self.cancelled:
+                    raise OperationCancelled()
+                if not names:
+                    break
+                names, excluded = self.exclude.split(names)
+                self.excluded += excluded
+                self._add_run(names)
+                if self.on_progress:
+                    self.on_progress(self)
+    
+    def _add_run(self, names):
+        stats = fs_guard.map(scan_service.filesystem.stat, [os.path.join(self.path, name) for name in names],
+                             self.path)
+        rows = []
+        for name, (stat_info, error) in zip(names, stats):
+            if error is not None:
+                self.errors += 1
+                continue
+            is_dir = stat.S_ISDIR(stat_info.st_mode)
+            size = 0 if is_dir else stat_info.st_size
+            rows.append([name, is_dir, size, stat_info.st_mtime,
+                         stat_info.st_mode, stat_info.st_uid, stat_info.st_gid])
+            self.dirs += is_dir
+            self.bytes_total += size
+        if rows:
+            run = os.path.join(self._dir, f"run-{len(self._runs):05d}.rows")
+            self._runs.append((run, _write_rows(run, rows)))
+            self.count += len(rows)
+    
+    def _sorted_file(self, keys, reverse):
+        """(path, row offsets) of the listing sorted by keys, merging the runs if not done yet"""
+        with self._lock:
+            cached = self._sorted.get((keys, reverse))
+            if cached is not None:
+                self._sorted.move_to_end((keys, reverse))
+                return cached
+            
+            key = _row_sort_key(keys, reverse)
+            sorted_runs = []
+            for run, offsets in self._runs:
+                if self.cancelled:
+                    raise OperationCancelled()
+                rows = list(_read_rows(run, offsets))
+                rows.sort(key=key)
+                sorted_runs.append((run + '.sorted', _write_rows(run + '.sorted', rows)))
+                del rows
+            
+            merged = os.path.join(self._dir, f"sorted-{time.monotonic_ns()}.rows")
+            runs = [_read_rows(run, run_offsets) for run, run_offsets in sorted_runs]
+            offsets = _write_rows(merged, heapq.merge(*runs, key=key))
+            for run, _ in sorted_runs:
+                os.remove(run)
+            
+            self._sorted[(keys, reverse)] = merged, offsets
+            while len(self._sorted) > SPILL_SORTED_FILES:
+                os.remove(self._sorted.popitem(last=False)[1][0])
+            return merged, offsets
+    
+    def page(self, keys, reverse, start, count):
+        """count rows from position start in the given order"""
+        path, offsets = self._sorted_file(keys, reverse)
+        block = start // SPILL_INDEX_EVERY
+        if block >= len(offsets) - 1:
+            return []
+        skip = start - block * SPILL_INDEX_EVERY
+        return list(islice(_read_rows(path, offsets, block), skip, skip + count))
+    
+    def search(self, query, mode, keys, reverse, start, count):
+        """(count rows from match number start in the given order, whether more matches follow)"""
+        rank = compile_matcher(query, mode)
+        path, offsets = self._sorted_file(keys, reverse)
+        hits, skipped = [], 0
+        rows = _read_rows(path, offsets)
+        while True:
+            chunk = list(islice(rows, SPILL_SEARCH_CHUNK))
+            if not chunk:
+                return hits, False
+            names = [row[0] for row in chunk]
+            for j in sorted(rank([name.lower() for name in names], names)):
+                if skipped < start:
+                    skipped += 1
+                elif len(hits) == count:
+                    return hits, True
+                else:
+                    hits.append(chunk[j])
+
+
+# === FOLDER ENTRY COUNTS ===
+
+CHILD_COUNT_CAP = 10000
+CHILD_COUNT_BATCH = 32
+# Only folders among the first rows of a view are counted, not every row rendered
+CHILD_COUNT_ROWS = 100
+
+
+def count_entries(path, cap=CHILD_COUNT_CAP):
+    """Number of entries in a folder, reading no further than cap + 1 of them"""
+    with scan_service.filesystem.scandir(path) as entries:
+        return sum(1 for _ in islice(entries, cap + 1))
+
+
+class ChildCounter:
+    """Count the entries of folder items in the background, storing each in its item as 'children'"""
+    
+    def __init__(self, items, parent, cap=CHILD_COUNT_CAP, on_progress=None, on_done=None):
+        self.items = items
+        self.parent = parent
+        self.cap = cap
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.counted = 0
+        self.error = None
+        self._cancel = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    def start(self):
+        """Count in a background thread"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self):
+        try:
+            for i in range(0, len(self.items), CHILD_COUNT_BATCH):
+                if self.cancelled:
+                    return
+                batch = self.items[i:i + CHILD_COUNT_BATCH]
+                results = fs_guard.map(count_entries, [item['path'] for item in batch], self.parent)
+                for item, (count, error) in zip(batch, results):
+                    if not isinstance(error, FilesystemTimeout):
+                        item['children'] = count
+                self.counted += len(batch)
+                if self.on_progress and not self.cancelled:
+                    self.on_progress(batch)
+        except MountUnavailable as e:
+            self.error = e
+        finally:
+            if self.on_done:
+                self.on_done(self)
+
 
 class DatabricksFileExplorer:
     """
@@ -20,11 +3456,47 @@ class DatabricksFileExplorer:
     - View file metadata (size, modified date, type)
     - Back/Forward navigation with history
     - Breadcrumb navigation
-    - Search functionality
-    - Sort by name, size, or date
+    - Multi-select with parallel bulk copy, move and delete
+    - Resumable, checksum-verified export of large files
+    - Browse into zip and tar archives as folders
+    - Largest-file and storage hotspot report over a subtree
+    - Duplicate file finder with reclaimable space per set
+    - Cached MD5/SHA-256 (and native CRC32C) checksums in the details panel
+    - Search by substring, glob, regex or fuzzy match, ranked by match quality
+    - Parallel search of file contents with matching lines
+    - Follow growing log files (tail -f) from the details panel
+    - Tabular CSV/JSON preview with inferred column types and null counts
+    - Multi-key sort by name, size, date or type with natural name ordering
+    - Displays immediately while the start folder is listed in the background
+    - Timeouts and per-mount circuit breakers so a hung mount can't freeze the notebook
+    - Resumable streaming inventory of a subtree to Parquet or CSV
+    - Instant Back/Forward from cached rendered views of unchanged folders
+    - Listings and walk workers shared by every explorer and scan() in the kernel
+    - Re-running the cell restores history, sort order and the last view at once
+    - Repeated hotspot reports and recursive scans only relist folders that changed
+    - Optional entry counts for the folders shown, counted in the background
+    - Exclusion filters (globs, extensions, dotfiles) applied before anything is stat'ed
+    - Progressive size estimate of huge trees with confidence intervals, then exact totals
+    - Pluggable metadata backend, with a latency-injecting stand-in for offline benchmarks
+    - Optional owner, group and permission columns for debugging access problems
+    - Low-memory mode that spills huge folders to disk and shows them a page at a time
     """
     
-    def __init__(self, start_path="/"):
+    def __init__(self, start_path=None, background_load=True, session_file=SESSION_FILE, exclude=None):
+        """Open start_path (by default the last session's folder, else the cwd); session_file=None disables sessions"""
+        # Seconds from construction to the shell being displayed and to the
+        # first listing being rendered; add 'imports' for the cold-cell time
+        self._created = time.perf_counter()
+        self.timings = {'imports': _IMPORT_SECONDS}
+        self._timings_lock = threading.Lock()
+        self._timings_reported = False
+        
+        # The last session is resumed when the cell is re-run on its folder
+        session = load_session(session_file) if session_file else None
+        if start_path is None:
+            start_path = session['current_path'] if session else os.getcwd()
+        resume = session is not None and os.path.abspath(start_path) == session['current_path']
+        
         # Navigation history
         self.history = []
         self.history_index = -1
@@ -32,16 +3504,244 @@ class DatabricksFileExplorer:
         
         # Sorting state
         self.sort_by = "name"
+        self.then_by = ""
         self.sort_reverse = False
+        sort_keys = {key for _, key in SORT_OPTIONS}
+        if resume and session['sort'][0] in sort_keys and session['sort'][1] in sort_keys | {''}:
+            self.sort_by, self.then_by, self.sort_reverse = session['sort']
+        
+        # Names left out of listings before they are stat'ed, and how many
+        # were left out of the current one
+        if exclude is None and resume:
+            exclude = ExcludeRules.from_json(session['exclude'])
+        self.exclude = exclude_rules(exclude)
+        self._skipped = 0
         
         # Search state
         self.search_query = ""
+        self.search_mode = "substring"
+        
+        # Entry counts in the folder rows, and the job counting them
+        self.show_counts = False
+        self._counter = None
+        
+        # Owner, group and permissions in the rows
+        self.show_owner = False
+        
+        # Low-memory mode: the folder's listing spilled to disk (and the one
+        # being built), the page shown and the sort/search settings it was
+        # paged under, and the page being fetched
+        self.low_memory = False
+        self._spilled = None
+        self._spilling = None
+        self._page_fetch = None
+        self._page = 0
+        self._page_state = None
+        self._page_more = False
+        
+        # Listing of the current directory, reused by search and sort,
+        # with its name keys and the hits of the last search
+        self._items = []
+        self._name_keys = []
+        self._names = []
+        self._last_search = None
+        
+        # Ascending sort permutations of the listing, keyed by
+        # (listing version, sort keys)
+        self._listing_version = 0
+        self._sort_cache = {}
+        
+        # Multi-selection and the running bulk copy/move/delete
+        self.selected_paths = set()
+        self._visible_items = []
+        self._bulk_op = None
+        self._delete_armed = False
+        
+        # Running storage hotspot report, duplicate or content search, and
+        # the matching files and lines found by the last content search
+        self._report = None
+        self._grep_snippets = {}
+        self._grep_items = []
+        
+        # Running subtree inventory export, and where relative destinations go
+        self._inventory = None
+        self.inventory_dir = INVENTORY_OUTPUT_DIR
+        # Archive path whose member index is being built for a navigation
+        self._indexing = None
+        
+        # Rendered views for Back/Forward, the rows currently shown, and the
+        # folder (with its mtime) the listing was read from, if any
+        self._views = ViewCache()
+        # Held while the listing is replaced or rendered; background jobs
+        # render their results too, not only the widget event handlers
+        self._render_lock = threading.RLock()
+        self._rows_box = None
+        self._listing_path = None
+        self._listing_mtime = None
+        
+        # Session file, the listings to save in it (path -> (mtime, rows,
+        # excluded count), oldest first) and the ones saved by the last
+        # session that haven't been revalidated yet, if listed under the
+        # same exclusion rules
+        self.session_file = session_file
+        self._session_folders = OrderedDict()
+        self._saved_folders = {}
+        self._save_timer = None
+        # Guards both folder maps, which the UI and background threads update
+        self._session_lock = threading.Lock()
+        if session is not None and ExcludeRules.from_json(session['exclude']) == self.exclude:
+            self._saved_folders = {folder[0]: tuple(folder[1:]) for folder in session['folders']}
+        
+        # File shown in the details panel, its running export and log follower
+        self._info_path = None
+        self._export = None
+        # Set to stop the running checksum, None when there is none
+        self._checksum_cancel = None
+        self._follower = None
         
         # Build UI components
         self._build_ui()
         
-        # Initial navigation
-        self._navigate_to(start_path, add_to_history=True)
+        # A resumed session shows its last view straight away; it is checked
+        # against the folder's mtime in the background
+        self._restored = resume and self._restore_session(session)
+        
+        # Initial navigation; in the background by default so the shell can
+        # be displayed before a slow mount has been listed
+        self._loaded = threading.Event()
+        if self._restored and background_load:
+            threading.Thread(target=self._load_initial, args=(start_path,), daemon=True).start()
+        elif background_load:
+            self.status_bar.value = f"<i>Loading {html.escape(start_path)}...</i>"
+            self._show_rows(None, "<div style='padding: 20px; text-align: center; color: #666;'><i>Loading...</i></div>")
+            threading.Thread(target=self._load_initial, args=(start_path,), daemon=True).start()
+        else:
+            self._load_initial(start_path)
+    
+    def _load_initial(self, start_path):
+        """List the start folder and record how long the first listing took"""
+        try:
+            if self._restored:
+                self._validate_restored()
+            # Skipped if the user already navigated somewhere else meanwhile
+            else:
+                self._navigate_to(start_path, first=True)
+        finally:
+            self.timings.setdefault('first_listing', time.perf_counter() - self._created)
+            self._loaded.set()
+            self._report_timings()
+    
+    def _report_timings(self):
+        """Add the load times to the status bar once both are known"""
+        with self._timings_lock:
+            if self._timings_reported or not {'first_paint', 'first_listing'} <= self.timings.keys():
+                return
+            self._timings_reported = True
+            self.status_bar.value += (f" | Shown in {self.timings['first_paint']:.2f}s, "
+                                          f"listed in {self.timings['first_listing']:.2f}s")
+    
+    def wait_until_loaded(self, timeout=None):
+        """Block until the start folder has been listed; returns False on timeout"""
+        return self._loaded.wait(timeout)
+    
+    def _restore_session(self, session):
+        """Show the last session's folder from its saved listing; False if it has none"""
+        path = session['current_path']
+        with self._session_lock:
+            saved = self._saved_folders.pop(path, None)
+        if saved is None:
+            return False
+        
+        history, index = session['history'], session['history_index']
+        if not 0 <= index < len(history) or history[index] != path:
+            history, index = [path], 0
+        self.history, self.history_index = history, index
+        self.current_path = path
+        self.path_input.value = path
+        self._update_nav_buttons()
+        self._update_breadcrumb()
+        
+        mtime, rows, self._skipped = saved
+        self._set_listing([self._make_item(path, *row) for row in rows])
+        self._listing_path, self._listing_mtime = path, mtime
+        self._refresh_file_list(reload=False)
+        self.timings['first_listing'] = time.perf_counter() - self._created
+        self.status_bar.value += " | Restored from last session"
+        return True
+    
+    def _validate_restored(self):
+        """Relist the restored folder if it changed since the session was saved"""
+        path = self.current_path
+        try:
+            mtime = fs_guard.call(scan_service.filesystem.stat, path).st_mtime
+        except OSError as e:
+            self.status_bar.value = f"<span style='color: red;'>â Could not check the restored listing: {html.escape(str(e))}</span>"
+            return
+        # Left alone if the user has navigated or refreshed meanwhile
+        with self._render_lock:
+            if mtime != self._listing_mtime and self._listing_path == path == self.current_path:
+                self._refresh_file_list(max_age=0, mtime=mtime)
+    
+    def _remember_folder(self):
+        """Keep the current listing for the session file"""
+        if any(i.get('stale') for i in self._items):
+            return
+        rows = [[i['name'], i['is_dir'], i['size'], i['modified'], i.get('mode'), i.get('uid'), i.get('gid')]
+                for i in self._items]
+        with self._session_lock:
+            self._session_folders.pop(self.current_path, None)
+            self._session_folders[self.current_path] = (self._listing_mtime, rows, self._skipped)
+            while len(self._session_folders) > SESSION_MAX_FOLDERS:
+                self._session_folders.popitem(last=False)
+    
+    def _schedule_session_save(self):
+        """Save the session shortly after the last of a burst of changes"""
+        if self.session_file is None:
+            return
+        # The state is captured now, on the calling thread; the timer only writes it
+        session = self._session_snapshot()
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(SESSION_SAVE_DELAY, self._save_session, args=(session,))
+        self._save_timer.daemon = True
+        self._save_timer.start()
+    
+    def _session_snapshot(self):
+        """History, sort order and the most recent listings, as saved in the session file"""
+        # Listings not revisited since the last session are kept, but the
+        # newest ones win when trimming to the limits; saved rows are never
+        # modified, so the snapshot can share them
+        with self._render_lock, self._session_lock:
+            recent = list(self._saved_folders.items()) + list(self._session_folders.items())
+            state = (self.current_path, list(self.history), self.history_index,
+                     [self.sort_by, self.then_by, self.sort_reverse], self.exclude.to_json())
+        folders, seen, entries = [], set(), 0
+        for path, (mtime, rows, skipped) in reversed(recent):
+            if path in seen or len(folders) >= SESSION_MAX_FOLDERS or entries + len(rows) > SESSION_MAX_ENTRIES:
+                continue
+            seen.add(path)
+            entries += len(rows)
+            folders.append([path, mtime, rows, skipped])
+        folders.reverse()
+        
+        current_path, history, history_index, sort, exclude = state
+        return {
+            'version': SESSION_VERSION,
+            'current_path': current_path,
+            'history': history,
+            'history_index': history_index,
+            'sort': sort,
+            'exclude': exclude,
+            'folders': folders,
+        }
+    
+    def _save_session(self, session):
+        """Write a session snapshot to the session file"""
+        try:
+            save_session(session, self.session_file)
+        except Exception:
+            # Browsing works the same without it; the next save tries again
+            pass
     
     def _build_ui(self):
         """Build the user interface components"""
@@ -90,13 +3790,46 @@ class DatabricksFileExplorer:
         )
         self.refresh_btn.on_click(self._refresh)
         
+        self.report_btn = widgets.Button(
+            description="Hotspots",
+            tooltip="Largest files and heaviest folders under this path",
+            layout=widgets.Layout(width='110px')
+        )
+        self.report_btn.on_click(self._toggle_report)
+        
+        self.size_btn = widgets.Button(
+            description="Size",
+            tooltip="Estimate the total size under this path while counting it exactly",
+            layout=widgets.Layout(width='90px')
+        )
+        self.size_btn.on_click(self._toggle_estimate)
+        
+        self.dupes_btn = widgets.Button(
+            description="Duplicates",
+            tooltip="Find files with identical content under this path",
+            layout=widgets.Layout(width='110px')
+        )
+        self.dupes_btn.on_click(self._toggle_duplicates)
+        
+        self.inventory_btn = widgets.Button(
+            description="Inventory",
+            tooltip="Write every path under this folder to Parquet/CSV files in the destination folder "
+                    "(relative to explorer.inventory_dir, or a folder named after this one there if empty)",
+            layout=widgets.Layout(width='110px')
+        )
+        self.inventory_btn.on_click(self._toggle_inventory)
+        
         # Navigation button row
         self.nav_buttons = widgets.HBox([
             self.back_btn, 
             self.forward_btn, 
             self.up_btn, 
             self.home_btn, 
-            self.refresh_btn
+            self.refresh_btn,
+            self.report_btn,
+            self.size_btn,
+            self.dupes_btn,
+            self.inventory_btn
         ], layout=widgets.Layout(margin='5px 0'))
         
         # === PATH BAR ===
@@ -129,6 +3862,14 @@ class DatabricksFileExplorer:
             layout=widgets.Layout(width='300px')
         )
         self.search_input.observe(self._on_search_change, names='value')
+        self.search_input.on_submit(self._on_search_submit)
+        
+        self.search_mode_dropdown = widgets.Dropdown(
+            options=SEARCH_MODES,
+            value='substring',
+            layout=widgets.Layout(width='100px')
+        )
+        self.search_mode_dropdown.observe(self._on_search_mode_change, names='value')
         
         self.clear_search_btn = widgets.Button(
             description="Clear",
@@ -138,34 +3879,157 @@ class DatabricksFileExplorer:
         
         self.search_bar = widgets.HBox([
             self.search_input,
+            self.search_mode_dropdown,
             self.clear_search_btn
         ], layout=widgets.Layout(margin='5px 0'))
         
+        # === EXCLUSION FILTERS ===
+        self.exclude_input = widgets.Text(
+            value=self.exclude.to_text(),
+            placeholder='e.g. _committed_*, _started_*, .crc',
+            description='Exclude:',
+            continuous_update=False,
+            layout=widgets.Layout(width='400px')
+        )
+        self.exclude_input.observe(self._on_exclude_change, names='value')
+        
+        self.hide_dotfiles_box = widgets.Checkbox(
+            value=self.exclude.hidden,
+            description='Hide dotfiles',
+            indent=False,
+            layout=widgets.Layout(width='120px')
+        )
+        self.hide_dotfiles_box.observe(self._on_exclude_change, names='value')
+        
+        self.low_memory_box = widgets.Checkbox(
+            value=False,
+            description='Low memory',
+            tooltip='Spill folder listings to disk and show them a page at a time',
+            indent=False,
+            layout=widgets.Layout(width='110px')
+        )
+        self.low_memory_box.observe(self._on_low_memory_change, names='value')
+        
+        self.filter_bar = widgets.HBox([
+            self.exclude_input,
+            self.hide_dotfiles_box,
+            self.low_memory_box
+        ], layout=widgets.Layout(margin='0 0 5px 0'))
+        
+        # === PAGING (low-memory mode) ===
+        self.prev_page_btn = widgets.Button(description="< Prev", layout=widgets.Layout(width='80px'))
+        self.prev_page_btn.on_click(self._prev_page)
+        self.next_page_btn = widgets.Button(description="Next >", layout=widgets.Layout(width='80px'))
+        self.next_page_btn.on_click(self._next_page)
+        self.page_label = widgets.HTML()
+        self.spill_cancel_btn = widgets.Button(
+            description="Cancel",
+            button_style='warning',
+            tooltip='Stop listing this folder to disk',
+            layout=widgets.Layout(width='80px', display='none')
+        )
+        self.spill_cancel_btn.on_click(self._cancel_spill)
+        self.page_bar = widgets.HBox(
+            [self.prev_page_btn, self.page_label, self.next_page_btn, self.spill_cancel_btn],
+            layout=widgets.Layout(margin='5px 0', display='none')
+        )
+        
         # === SORT OPTIONS ===
         self.sort_dropdown = widgets.Dropdown(
-            options=[
-                ('Name', 'name'),
-                ('Size', 'size'),
-                ('Modified Date', 'date'),
-                ('Type', 'type')
-            ],
-            value='name',
+            options=SORT_OPTIONS,
+            value=self.sort_by,
             description='Sort by:',
             layout=widgets.Layout(width='200px')
         )
         self.sort_dropdown.observe(self._on_sort_change, names='value')
         
+        self.then_by_dropdown = widgets.Dropdown(
+            options=[('--', '')] + SORT_OPTIONS,
+            value=self.then_by,
+            description='then:',
+            layout=widgets.Layout(width='160px')
+        )
+        self.then_by_dropdown.observe(self._on_then_by_change, names='value')
+        
         self.sort_order_btn = widgets.ToggleButton(
-            value=False,
-            description='â Ascending',
+            value=self.sort_reverse,
+            description='â Descending' if self.sort_reverse else 'â Ascending',
             button_style='',
             layout=widgets.Layout(width='110px')
         )
         self.sort_order_btn.observe(self._on_sort_order_change, names='value')
         
+        self.counts_btn = widgets.ToggleButton(
+            value=False,
+            description='Item counts',
+            tooltip='Show how many entries each folder holds',
+            layout=widgets.Layout(width='110px')
+        )
+        self.counts_btn.observe(self._on_counts_change, names='value')
+        
+        self.owner_btn = widgets.ToggleButton(
+            value=False,
+            description='Owners',
+            tooltip='Show permissions, owner and group of each entry',
+            layout=widgets.Layout(width='90px')
+        )
+        self.owner_btn.observe(self._on_owner_change, names='value')
+        
         self.sort_bar = widgets.HBox([
             self.sort_dropdown,
-            self.sort_order_btn
+            self.then_by_dropdown,
+            self.sort_order_btn,
+            self.counts_btn,
+            self.owner_btn
+        ], layout=widgets.Layout(margin='5px 0'))
+        
+        # === BULK ACTIONS ===
+        self.select_all_btn = widgets.Button(
+            description="Select All",
+            layout=widgets.Layout(width='90px')
+        )
+        self.select_all_btn.on_click(self._toggle_select_all)
+        
+        self.dest_input = widgets.Text(
+            placeholder='Destination folder for copy/move/inventory...',
+            layout=widgets.Layout(width='300px')
+        )
+        
+        self.copy_btn = widgets.Button(
+            description="Copy",
+            button_style='primary',
+            layout=widgets.Layout(width='70px')
+        )
+        self.copy_btn.on_click(lambda btn: self._start_bulk('copy'))
+        
+        self.move_btn = widgets.Button(
+            description="Move",
+            button_style='warning',
+            layout=widgets.Layout(width='70px')
+        )
+        self.move_btn.on_click(lambda btn: self._start_bulk('move'))
+        
+        self.delete_btn = widgets.Button(
+            description="Delete",
+            button_style='danger',
+            layout=widgets.Layout(width='110px')
+        )
+        self.delete_btn.on_click(lambda btn: self._start_bulk('delete'))
+        
+        self.cancel_btn = widgets.Button(
+            description="Cancel",
+            disabled=True,
+            layout=widgets.Layout(width='70px')
+        )
+        self.cancel_btn.on_click(self._cancel_bulk)
+        
+        self.bulk_bar = widgets.HBox([
+            self.select_all_btn,
+            self.dest_input,
+            self.copy_btn,
+            self.move_btn,
+            self.delete_btn,
+            self.cancel_btn
         ], layout=widgets.Layout(margin='5px 0'))
         
         # === FILE LIST HEADER ===
@@ -174,7 +4038,10 @@ class DatabricksFileExplorer:
         )
         
         # === FILE LIST ===
-        self.file_list_output = widgets.Output(
+        # A plain box rather than an Output widget, whose context manager
+        # doesn't work from the background threads that also render here
+        self.list_message = widgets.HTML()
+        self.file_list_box = widgets.VBox(
             layout=widgets.Layout(
                 border='1px solid #ddd',
                 min_height='300px',
@@ -194,6 +4061,10 @@ class DatabricksFileExplorer:
             value="<div style='padding: 10px; background: #f5f5f5; border-radius: 5px;'><i>Select a file to view details</i></div>"
         )
         
+        # Export/preview/checksum/follow widgets are built on first use
+        self.file_actions = None
+        self.tail_view = None
+        
         # === MAIN LAYOUT ===
         self.main_container = widgets.VBox([
             self.title,
@@ -203,9 +4074,12 @@ class DatabricksFileExplorer:
             self.breadcrumb,
             widgets.HTML("<hr style='margin: 5px 0;'>"),
             widgets.HBox([self.search_bar, widgets.HTML("&nbsp;&nbsp;&nbsp;"), self.sort_bar]),
+            self.filter_bar,
+            self.bulk_bar,
             widgets.HTML("<hr style='margin: 5px 0;'>"),
             self.list_header,
-            self.file_list_output,
+            self.file_list_box,
+            self.page_bar,
             self.status_bar,
             widgets.HTML("<hr style='margin: 5px 0;'>"),
             widgets.HTML("<b>File Details:</b>"),
@@ -218,6 +4092,98 @@ class DatabricksFileExplorer:
             max_width='900px'
         ))
     
+    def _build_file_actions(self):
+        """Build the file action row below the details panel the first time a file is selected"""
+        self.export_dest_input = widgets.Text(
+            placeholder='Export to folder or file path...',
+            layout=widgets.Layout(width='300px')
+        )
+        
+        self.export_buffer_dropdown = widgets.Dropdown(
+            options=EXPORT_BUFFER_SIZES,
+            value=EXPORT_BUFFER_SIZES[1][1],
+            description='Buffer:',
+            layout=widgets.Layout(width='160px')
+        )
+        
+        self.export_btn = widgets.Button(
+            description="Export",
+            button_style='primary',
+            layout=widgets.Layout(width='80px')
+        )
+        self.export_btn.on_click(self._start_export)
+        
+        self.export_cancel_btn = widgets.Button(
+            description="Cancel",
+            disabled=True,
+            layout=widgets.Layout(width='70px')
+        )
+        self.export_cancel_btn.on_click(self._cancel_export)
+        
+        self.preview_btn = widgets.Button(
+            description="Preview",
+            layout=widgets.Layout(width='80px')
+        )
+        self.preview_btn.on_click(self._preview)
+        
+        self.preview_sample_box = widgets.Checkbox(
+            value=False,
+            description='Sample',
+            indent=False,
+            tooltip='Preview CSV/JSON rows sampled from across the whole file',
+            layout=widgets.Layout(width='80px')
+        )
+        
+        self.checksum_dropdown = widgets.Dropdown(
+            options=CHECKSUM_ALGORITHMS,
+            value='sha256',
+            layout=widgets.Layout(width='100px')
+        )
+        
+        self.checksum_btn = widgets.Button(
+            description="Checksum",
+            tooltip='Checksum the selected file; click again to stop',
+            layout=widgets.Layout(width='90px')
+        )
+        self.checksum_btn.on_click(self._start_checksum)
+        
+        self.follow_btn = widgets.ToggleButton(
+            value=False,
+            description='Follow',
+            tooltip='Show lines as they are appended (tail -f)',
+            layout=widgets.Layout(width='80px')
+        )
+        self.follow_btn.observe(self._on_follow_change, names='value')
+        
+        # Only shown while a file is selected
+        self.file_actions = widgets.HBox([
+            self.export_dest_input,
+            self.export_buffer_dropdown,
+            self.export_btn,
+            self.export_cancel_btn,
+            self.preview_btn,
+            self.preview_sample_box,
+            self.checksum_dropdown,
+            self.checksum_btn,
+            self.follow_btn
+        ], layout=widgets.Layout(margin='5px 0', display='none', flex_flow='row wrap'))
+        
+        # Last lines of a followed log, only shown while following
+        self.tail_view = widgets.HTML(
+            value="",
+            layout=widgets.Layout(display='none')
+        )
+        
+        self.main_container.children += (self.file_actions, self.tail_view)
+    
+    def _show_file_actions(self, visible):
+        """Show or hide the file action row"""
+        if self.file_actions is None:
+            if not visible:
+                return
+            self._build_file_actions()
+        self.file_actions.layout.display = '' if visible else 'none'
+    
     def _get_list_header_html(self):
         """Generate the header row for the file list"""
         return """
@@ -296,115 +4262,131 @@ class DatabricksFileExplorer:
     
     def _get_file_type(self, path, is_dir):
         """Get file type description"""
-        if is_dir:
-            return "Folder"
+        return file_type(path, is_dir)
+    
+    def _get_items(self, path, max_age=SCAN_CACHE_MAX_AGE, mtime=None):
+        """Get the items of a directory, the directory mtime (None in archives) and the number excluded"""
+        location = split_archive_path(path)
+        if location:
+            items = self._get_archive_items(path, *location)
+            kept = [item for item in items if not self.exclude.excludes(item['name'])]
+            return kept, None, len(items) - len(kept)
         
-        ext = Path(path).suffix.lower()
+        # A folder listed by the last session is reused once if it hasn't changed
+        with self._session_lock:
+            saved = self._saved_folders.pop(path, None)
+        if saved is not None and mtime is not None and saved[0] == mtime:
+            return [self._make_item(path, *row) for row in saved[1]], mtime, saved[2]
         
-        types = {
-            '.py': 'Python',
-            '.ipynb': 'Notebook',
-            '.sql': 'SQL',
-            '.txt': 'Text',
-            '.md': 'Markdown',
-            '.csv': 'CSV',
-            '.json': 'JSON',
-            '.xml': 'XML',
-            '.yaml': 'YAML',
-            '.yml': 'YAML',
-            '.parquet': 'Parquet',
-            '.delta': 'Delta',
-            '.jar': 'JAR',
-            '.scala': 'Scala',
-            '.r': 'R Script',
-            '.sh': 'Shell',
-            '.html': 'HTML',
-            '.css': 'CSS',
-            '.js': 'JavaScript',
-            '.png': 'Image',
-            '.jpg': 'Image',
-            '.jpeg': 'Image',
-            '.gif': 'Image',
-            '.pdf': 'PDF',
-            '.zip': 'Archive',
-            '.tar': 'Archive',
-            '.gz': 'Archive',
-            '.log': 'Log',
-        }
+        # The listing comes from the shared scan service, so explorers open on
+        # the same folder share it, and a hung mount raises
+        # FilesystemTimeout/MountUnavailable instead of blocking the notebook;
+        # excluded names are dropped there before any stat
+        listing = scan_service.listing(path, max_age, mtime, self.exclude)
         
-        return types.get(ext, ext[1:].upper() if ext else 'File')
-    
-    def _get_items(self, path):
-        """Get list of items in directory with metadata"""
         items = []
+        for name, (stat_info, error) in zip(listing['names'], listing['stats']):
+            if error is None:
+                is_dir = stat.S_ISDIR(stat_info.st_mode)
+                items.append(self._make_item(path, name, is_dir, stat_info.st_size, stat_info.st_mtime,
+                                             stat_info.st_mode, stat_info.st_uid, stat_info.st_gid))
+            else:
+                full_path = os.path.join(path, name)
+                # Timed-out entries are kept but marked stale
+                stale = isinstance(error, FilesystemTimeout)
+                items.append({
+                    'name': name,
+                    'name_lower': name.lower(),
+                    'path': full_path,
+                    'is_dir': False,
+                    'size': 0,
+                    'modified': 0,
+                    'icon': 'â ï¸',
+                    'type': 'Stale' if stale else 'Unknown',
+                    'stale': stale,
+                    'detail': str(error.strerror or error)
+                })
         
+        return items, listing['mtime'], listing['excluded']
+    
+    def _make_item(self, path, name, is_dir, size, modified, mode=None, uid=None, gid=None):
+        """Item dict for an entry of the folder at path"""
+        full_path = os.path.join(path, name)
+        return {
+            'name': name,
+            'name_lower': name.lower(),
+            'path': full_path,
+            'is_dir': is_dir,
+            'size': size if not is_dir else 0,
+            'modified': modified,
+            'mode': mode,
+            'uid': uid,
+            'gid': gid,
+            'icon': self._get_file_icon(full_path, is_dir),
+            'type': self._get_file_type(full_path, is_dir)
+        }
+    
+    def _get_archive_items(self, path, archive, inner):
+        """Get the members of a folder inside an archive from its cached index"""
         try:
-            for name in os.listdir(path):
-                full_path = os.path.join(path, name)
-                
-                try:
-                    stat_info = os.stat(full_path)
-                    is_dir = os.path.isdir(full_path)
-                    
-                    items.append({
-                        'name': name,
-                        'path': full_path,
-                        'is_dir': is_dir,
-                        'size': stat_info.st_size if not is_dir else 0,
-                        'modified': stat_info.st_mtime,
-                        'icon': self._get_file_icon(full_path, is_dir),
-                        'type': self._get_file_type(full_path, is_dir)
-                    })
-                except (PermissionError, OSError):
-                    items.append({
-                        'name': name,
-                        'path': full_path,
-                        'is_dir': False,
-                        'size': 0,
-                        'modified': 0,
-                        'icon': 'â ï¸',
-                        'type': 'Unknown'
-                    })
-        except PermissionError:
-            pass
-        except Exception as e:
-            pass
+            members = archive_index(archive).get(inner, {})
+        except archive_errors():
+            return []
         
-        return items
+        return [{
+            'name': name,
+            'name_lower': name.lower(),
+            'path': os.path.join(path, name),
+            'is_dir': entry['is_dir'],
+            'size': entry['size'],
+            'modified': entry['modified'],
+            'icon': self._get_file_icon(name, entry['is_dir']),
+            'type': self._get_file_type(name, entry['is_dir'])
+        } for name, entry in members.items()]
     
     def _filter_items(self, items):
-        """Filter items based on search query"""
+        """Filter the listing by search query, best matches first"""
         if not self.search_query:
             return items
         
-        query = self.search_query.lower()
-        filtered = []
+        rank = compile_matcher(self.search_query, self.search_mode)
         
-        for item in items:
-            if query in item['name'].lower():
-                filtered.append(item)
-            elif fnmatch.fnmatch(item['name'].lower(), f"*{query}*"):
-                filtered.append(item)
+        # While typing, only the previous hits can still match
+        candidates = None
+        if self._last_search:
+            mode, query, hits = self._last_search
+            if mode == self.search_mode and _narrows(mode, query, self.search_query):
+                # Listing order, so ties rank the same as a full search
+                candidates = sorted(hits)
         
-        return filtered
+        hits = rank(self._name_keys, self._names, candidates)
+        self._last_search = (self.search_mode, self.search_query, hits)
+        
+        ranked = [items[j] for j in hits]
+        return [i for i in ranked if i['is_dir']] + [i for i in ranked if not i['is_dir']]
+    
+    def _sort_keys(self):
+        """Current sort keys, most significant first, ending with name"""
+        keys = [self.sort_by]
+        for key in (self.then_by, 'name'):
+            if key and key not in keys:
+                keys.append(key)
+        return tuple(keys)
     
     def _sort_items(self, items):
-        """Sort items based on current sort settings"""
-        # Always show directories first
-        dirs = [i for i in items if i['is_dir']]
-        files = [i for i in items if not i['is_dir']]
+        """Sort the listing based on current sort settings"""
+        cache_key = (self._listing_version, self._sort_keys())
+        cached = self._sort_cache.get(cache_key)
+        if cached is None:
+            cached = self._sort_cache[cache_key] = sort_permutation(items, cache_key[1])
+        order, dir_count, primary = cached
         
-        sort_key = {
-            'name': lambda x: x['name'].lower(),
-            'size': lambda x: x['size'],
-            'date': lambda x: x['modified'],
-            'type': lambda x: x['type'].lower()
-        }.get(self.sort_by, lambda x: x['name'].lower())
+        # Descending flips only the primary key, in one pass over the
+        # ascending order; ties stay in ascending then-by/name order
+        if self.sort_reverse:
+            order = reverse_primary(order[:dir_count], primary) + reverse_primary(order[dir_count:], primary)
         
-        dirs.sort(key=sort_key, reverse=self.sort_reverse)
-        files.sort(key=sort_key, reverse=self.sort_reverse)
-        
-        return dirs + files
+        return list(map(items.__getitem__, order))
     
     def _update_breadcrumb(self):
         """Update breadcrumb navigation"""
@@ -432,107 +4414,457 @@ class DatabricksFileExplorer:
         self.back_btn.disabled = self.history_index <= 0
         self.forward_btn.disabled = self.history_index >= len(self.history) - 1
     
-    def _navigate_to(self, path, add_to_history=True):
-        """Navigate to a directory"""
-        path = os.path.abspath(path)
+    def _navigate_to(self, path, add_to_history=True, first=False):
+        """Navigate to a directory; with first=True only if nothing has been navigated to yet"""
+        path = os.path.abspath(path)
+        self._indexing = None
+        location = split_archive_path(path)
+        
+        if location:
+            # Archives and the folders inside them browse like directories
+            try:
+                if cached_archive_index(location[0]) is None:
+                    # Reading a tar.gz member table decompresses all of it
+                    self._index_archive(path, location[0], add_to_history)
+                    return
+                entry = archive_entry(*location)
+            except archive_errors():
+                # Not a readable archive after all (e.g. a plain .gz file)
+                self._show_file_info(location[0])
+                return
+            if entry is None:
+                self.status_bar.value = f"<span style='color: red;'>â Path does not exist: {path}</span>"
+                return
+            if not entry['is_dir']:
+                self._show_file_info(path)
+                return
+            mtime = None
+        
+        else:
+            try:
+                stat_info = fs_guard.call(scan_service.filesystem.stat, path)
+            except (FilesystemTimeout, MountUnavailable) as e:
+                self.status_bar.value = f"<span style='color: red;'>â {html.escape(str(e))}</span>"
+                return
+            except OSError:
+                self.status_bar.value = f"<span style='color: red;'>â Path does not exist: {path}</span>"
+                return
+            
+            if not stat.S_ISDIR(stat_info.st_mode):
+                # It's a file - show info but don't navigate
+                self._show_file_info(path)
+                return
+            mtime = stat_info.st_mtime
+        
+        with self._render_lock:
+            # The initial load runs in the background and loses to the user
+            if first and self.history:
+                return
+            if path != self.current_path:
+                self.selected_paths.clear()
+                self._disarm_delete()
+            self._stop_report()
+            
+            self.current_path = path
+            self.path_input.value = path
+            
+            # Update history
+            if add_to_history:
+                # Remove forward history
+                self.history = self.history[:self.history_index + 1]
+                self._views.discard_after(self.history_index)
+                self.history.append(path)
+                self.history_index = len(self.history) - 1
+            
+            self._update_nav_buttons()
+            self._update_breadcrumb()
+        
+        # Back/Forward onto an unchanged folder swaps the earlier view back in
+        if add_to_history or not self._restore_view(mtime):
+            self._refresh_file_list(mtime=mtime)
+    
+    def _index_archive(self, path, archive, add_to_history):
+        """Build an archive's member index in the background, then navigate into it"""
+        self._indexing = path
+        self.status_bar.value = f"Indexing archive {html.escape(os.path.basename(archive))}..."
+        
+        def build():
+            try:
+                archive_index(archive)
+                readable = True
+            except archive_errors():
+                # Not a readable archive after all (e.g. a plain .gz file)
+                readable = False
+            # Navigation elsewhere in the meantime wins
+            with self._render_lock:
+                if self._indexing != path:
+                    return
+                self._indexing = None
+                if readable:
+                    self._navigate_to(path, add_to_history)
+                else:
+                    self._show_file_info(archive)
+        
+        threading.Thread(target=build, daemon=True).start()
+    
+    def _view_state(self):
+        """Sort and search settings a cached view was rendered with"""
+        return (self.sort_by, self.then_by, self.sort_reverse, self.search_query, self.search_mode,
+                self.show_counts, self.show_owner)
+    
+    def _restore_view(self, mtime):
+        """Show the cached view for the current history entry if it is still valid"""
+        view = self._views.get(self.history_index)
+        if view is None or mtime is None or view['path'] != self.current_path or view['mtime'] != mtime:
+            return False
+        if view['exclude'] != self.exclude:
+            return False
         
-        if not os.path.exists(path):
-            self.status_bar.value = f"<span style='color: red;'>â Path does not exist: {path}</span>"
+        with self._render_lock:
+            self._skipped = view['skipped']
+            if view['state'] != self._view_state():
+                # Sorted or filtered differently since; re-render without relisting
+                self._set_listing(view['items'])
+                self._listing_path, self._listing_mtime = view['path'], mtime
+                self._refresh_file_list(reload=False)
+                return True
+            
+            self._show_rows(view['box'])
+            self._set_listing(view['items'])
+            self._listing_path, self._listing_mtime = view['path'], mtime
+            self._visible_items = view['visible']
+            
+            # The selection was cleared when leaving the folder
+            for row in view['box'].children:
+                if row.select_box.value:
+                    row.select_box.value = False
+            self.status_bar.value = self._listing_status(view['visible'])
+        self._schedule_session_save()
+        return True
+    
+    def _show_rows(self, box, message=""):
+        """Show a VBox of rows (or message if box is None), closing the previous rows unless a cached view holds them"""
+        old = self._rows_box
+        if old is not None and old is not box and not self._views.holds(old):
+            close_widget_tree(old)
+        self._rows_box = box
+        if box is not None:
+            self.file_list_box.children = (box,)
+        else:
+            self.list_message.value = message
+            self.file_list_box.children = (self.list_message,)
+        self._count_children()
+    
+    def _count_children(self):
+        """Start counting the entries of the folders at the top of the view that have no count yet"""
+        if self._counter is not None:
+            self._counter.cancel()
+            self._counter = None
+        if not self.show_counts or self._rows_box is None or split_archive_path(self.current_path):
             return
-        
-        if not os.path.isdir(path):
-            # It's a file - show info but don't navigate
-            self._show_file_info(path)
+        rows = {row.item['path']: row for row in islice(self._rows_box.children, CHILD_COUNT_ROWS)
+                if row.item['is_dir'] and 'children' not in row.item}
+        if not rows:
             return
         
-        self.current_path = path
-        self.path_input.value = path
-        
-        # Update history
-        if add_to_history:
-            # Remove forward history
-            self.history = self.history[:self.history_index + 1]
-            self.history.append(path)
-            self.history_index = len(self.history) - 1
+        def on_progress(batch):
+            for item in batch:
+                if 'children' in item:
+                    rows[item['path']].info_label.value = self._row_info(item)
         
-        self._update_nav_buttons()
-        self._update_breadcrumb()
-        self._refresh_file_list()
+        self._counter = ChildCounter([row.item for row in rows.values()], self.current_path,
+                                     on_progress=on_progress)
+        self._counter.start()
+    
+    def _set_listing(self, items):
+        """Replace the listing shown in the file list, dropping derived caches"""
+        if self._spilled is not None:
+            self._spilled.cancel()
+            self._spilled.close()
+            self._spilled = None
+        self._items = items
+        self._listing_path = None
+        self._name_keys = [i['name_lower'] for i in items]
+        self._names = [i['name'] for i in items]
+        self._last_search = None
+        self._listing_version += 1
+        self._sort_cache.clear()
     
-    def _refresh_file_list(self):
-        """Refresh the file list display"""
-        with self.file_list_output:
-            clear_output(wait=True)
+    def _refresh_file_list(self, reload=True, max_age=SCAN_CACHE_MAX_AGE, mtime=None):
+        """Refresh the file list display; max_age=0 forces a fresh listing"""
+        path = self.current_path
+        spill = reload and self.low_memory and not split_archive_path(path)
+        listing = error = None
+        if reload and not spill:
+            # Listed outside the render lock, so a slow mount doesn't hold up
+            # rendering from the other threads
+            try:
+                listing = self._get_items(path, max_age, mtime)
+            except OSError as e:
+                error = e
+        
+        with self._render_lock:
+            if path != self.current_path:
+                # Navigated elsewhere while this folder was being listed
+                return
+            if reload:
+                self._stop_spill()
+                if spill:
+                    self._spill(path)
+                    return
+                if error is not None:
+                    self._set_listing([])
+                    self._show_list_error(error)
+                    return
+                items, mtime, skipped = listing
+                self._set_listing(items)
+                self._listing_path, self._listing_mtime = path, mtime
+                self._skipped = skipped
+            elif self._spilling is not None:
+                # Shown once the folder is on disk, in the settings current then
+                return
             
-            items = self._get_items(self.current_path)
-            items = self._filter_items(items)
-            items = self._sort_items(items)
+            if self._spilled is not None:
+                self._fetch_page()
+                return
             
-            if not items:
-                if self.search_query:
-                    display(HTML("<div style='padding: 20px; text-align: center; color: #666;'><i>No items match your search</i></div>"))
+            # Search results are ranked by match quality, otherwise sorted
+            try:
+                if self.search_query and self.search_mode != 'content':
+                    items = self._filter_items(self._items)
                 else:
-                    display(HTML("<div style='padding: 20px; text-align: center; color: #666;'><i>This folder is empty</i></div>"))
-                self.status_bar.value = "0 items"
+                    items = self._sort_items(self._items)
+            except re.error as e:
+                self.status_bar.value = f"<span style='color: red;'>â Invalid regex: {e}</span>"
                 return
-            
-            # Create clickable buttons for each item
-            for item in items:
-                self._create_item_row(item)
-            
-            # Update status
+            self._render_items(items)
+    
+    def _show_list_error(self, error):
+        """Show that the current folder couldn't be listed"""
+        self._skipped = 0
+        self._visible_items = []
+        self._update_page_bar()
+        self._show_rows(None, f"<div style='padding: 20px; text-align: center; color: #c00;'><i>Could not list this folder: {html.escape(str(error))}</i></div>")
+        self.status_bar.value = f"<span style='color: red;'>â {html.escape(str(error))}</span>"
+    
+    def _render_items(self, items):
+        """Show items as the rows of the file list, caching the view for Back/Forward"""
+        self._update_page_bar()
+        
+        if not items:
+            message = "No items match your search" if self.search_query else "This folder is empty"
+            self._show_rows(None, f"<div style='padding: 20px; text-align: center; color: #666;'><i>{message}</i></div>")
+            self.status_bar.value = "0 items"
+            return
+        
+        self._visible_items = items
+        
+        # Create clickable rows for each item, shown in one box so the
+        # whole view can later be swapped back in for Back/Forward
+        box = widgets.VBox([self._create_item_row(item) for item in items])
+        self._show_rows(box)
+        self.status_bar.value = self._listing_status(items)
+        
+        if self._listing_path == self.current_path and self._listing_mtime is not None:
+            self._views.put(self.history_index, {
+                'path': self.current_path,
+                'mtime': self._listing_mtime,
+                'state': self._view_state(),
+                'items': self._items,
+                'visible': items,
+                'box': box,
+                'exclude': self.exclude,
+                'skipped': self._skipped,
+            })
+            self._remember_folder()
+        self._schedule_session_save()
+    
+    def _listing_status(self, items):
+        """Status bar summary of the items shown"""
+        if self._spilled is not None:
+            # The whole folder, not just the page
+            dir_count = self._spilled.dirs
+            file_count = self._spilled.count - dir_count
+            total_size = self._spilled.bytes_total
+        else:
             dir_count = sum(1 for i in items if i['is_dir'])
             file_count = len(items) - dir_count
             total_size = sum(i['size'] for i in items if not i['is_dir'])
-            
-            status_text = f"{dir_count} folder(s), {file_count} file(s)"
-            if total_size > 0:
-                status_text += f" | Total: {self._format_size(total_size)}"
-            if self.search_query:
-                status_text += f" | Search: '{self.search_query}'"
-            
-            self.status_bar.value = status_text
+        
+        status_text = f"{dir_count:,} folder(s), {file_count:,} file(s)"
+        if total_size > 0:
+            status_text += f" | Total: {self._format_size(total_size)}"
+        if self._spilled is not None:
+            status_text += f" | Page {self._page + 1}, listing spilled to disk"
+            if self._spilled.errors:
+                status_text += f" | <span style='color: #c60;'>{self._spilled.errors:,} could not be read</span>"
+        if self.search_query and self.search_mode != 'content':
+            status_text += f" | Search: '{self.search_query}' (best matches first)"
+        if self.selected_paths:
+            status_text += f" | {len(self.selected_paths)} selected"
+        if self._skipped:
+            status_text += f" | {self._skipped} excluded by filters"
+        stale = sum(1 for i in items if i.get('stale'))
+        if stale:
+            status_text += f" | <span style='color: #c60;'>{stale} stale (timed out)</span>"
+        return status_text
     
-    def _create_item_row(self, item):
-        """Create a clickable row for an item"""
-        # Item button
-        btn = widgets.Button(
-            description="",
-            layout=widgets.Layout(width='100%', height='auto'),
-            button_style=''
-        )
+    def _spill(self, path):
+        """List a folder to disk in the background for low-memory mode, then show its first page"""
+        spilled = SpilledListing(path, self.exclude, on_progress=self._on_spill_progress)
+        keys, reverse = self._sort_keys(), self.sort_reverse
+        self._set_listing([])
+        self._skipped = 0
+        self._visible_items = []
+        self._spilling = spilled
+        self._update_page_bar()
+        self._show_rows(None, "<div style='padding: 20px; text-align: center; color: #666;'><i>Listing this folder to disk...</i></div>")
+        self.status_bar.value = "Listing to disk..."
         
-        # Format the row content
-        size_str = self._format_size(item['size']) if not item['is_dir'] else "--"
-        date_str = self._format_date(item['modified'])
+        def build():
+            error = None
+            try:
+                spilled.build()
+                # Sorted here too, so the first page doesn't wait on a merge
+                spilled.page(keys, reverse, 0, 0)
+            except (OSError, OperationCancelled) as e:
+                error = e
+            # Navigation, a relist or Cancel in the meantime wins
+            with self._render_lock:
+                if self._spilling is not spilled:
+                    spilled.close()
+                    return
+                self._spilling = None
+                if error is not None:
+                    spilled.close()
+                    self._show_list_error(error)
+                    return
+                # Pages are neither cached as views nor saved with the session
+                self._spilled = spilled
+                self._skipped = spilled.excluded
+                self._page, self._page_state = 0, self._view_state()
+                self._fetch_page()
         
-        row_html = f"""
-        <div style='display: grid; grid-template-columns: 40px 1fr 100px 150px 100px; 
-                    align-items: center; padding: 5px; width: 100%;'>
-            <span style='font-size: 1.2em;'>{item['icon']}</span>
-            <span style='overflow: hidden; text-overflow: ellipsis; white-space: nowrap;'
-                  title='{item['name']}'>{item['name']}</span>
-            <span style='color: #666;'>{size_str}</span>
-            <span style='color: #666;'>{date_str}</span>
-            <span style='color: #888;'>{item['type']}</span>
-        </div>
-        """
+        threading.Thread(target=build, daemon=True).start()
+    
+    def _on_spill_progress(self, spilled):
+        with self._render_lock:
+            if spilled is self._spilling:
+                self.status_bar.value = f"Listing to disk: {spilled.count:,} entries read..."
+    
+    def _stop_spill(self):
+        """Cancel the listing being built for low-memory mode, if any"""
+        if self._spilling is not None:
+            self._spilling.cancel()
+            self._spilling = None
+    
+    def _cancel_spill(self, btn):
+        with self._render_lock:
+            if self._spilling is None:
+                return
+            self._stop_spill()
+            self._update_page_bar()
+            self._show_rows(None, "<div style='padding: 20px; text-align: center; color: #666;'><i>Listing cancelled; refresh to list this folder again</i></div>")
+            self.status_bar.value = "Listing cancelled"
+    
+    def _fetch_page(self):
+        """Read the current page of the spilled listing in the background, searched and sorted on disk"""
+        state = self._view_state()
+        if state != self._page_state:
+            self._page, self._page_state = 0, state
+        spilled, start = self._spilled, self._page * SPILL_PAGE_ROWS
+        keys, reverse = self._sort_keys(), self.sort_reverse
+        query = self.search_query if self.search_mode != 'content' else ''
+        mode = self.search_mode
+        token = self._page_fetch = object()
+        self.prev_page_btn.disabled = self.next_page_btn.disabled = True
+        self.status_bar.value = f"Loading page {self._page + 1}..."
         
-        btn_with_html = widgets.HTML(value=f"""
-        <div style='display: grid; grid-template-columns: 40px 1fr 100px 150px 100px; 
-                    align-items: center; padding: 8px; width: 100%; cursor: pointer;
-                    border-radius: 5px; transition: background 0.2s;'
-             onmouseover="this.style.background='#e3f2fd'"
-             onmouseout="this.style.background='transparent'">
-            <span style='font-size: 1.2em;'>{item['icon']}</span>
-            <span style='overflow: hidden; text-overflow: ellipsis; white-space: nowrap;'
-                  title='{item['name']}'><b>{item['name']}</b></span>
-            <span style='color: #666;'>{size_str}</span>
-            <span style='color: #666;'>{date_str}</span>
-            <span style='color: #888;'>{item['type']}</span>
-        </div>
-        """)
+        def fetch():
+            error = None
+            try:
+                if query:
+                    rows, more = spilled.search(query, mode, keys, reverse, start, SPILL_PAGE_ROWS)
+                else:
+                    rows = spilled.page(keys, reverse, start, SPILL_PAGE_ROWS)
+                    more = start + len(rows) < spilled.count
+            except (OSError, re.error, OperationCancelled) as e:
+                error = e
+            with self._render_lock:
+                if self._page_fetch is not token or self._spilled is not spilled:
+                    return
+                self._page_fetch = None
+                if isinstance(error, re.error):
+                    self.status_bar.value = f"<span style='color: red;'>â Invalid regex: {error}</span>"
+                elif error is not None:
+                    self.status_bar.value = f"<span style='color: red;'>â {html.escape(str(error))}</span>"
+                else:
+                    self._page_more = more
+                    self._render_items([self._make_item(spilled.path, *row) for row in rows])
         
+        threading.Thread(target=fetch, daemon=True).start()
+    
+    def _update_page_bar(self):
+        """Show the paging buttons while a spilled listing is shown, or Cancel while one is built"""
+        if self._spilled is None and self._spilling is None:
+            self.page_bar.layout.display = 'none'
+            return
+        self.page_bar.layout.display = None
+        building = self._spilling is not None
+        self.spill_cancel_btn.layout.display = None if building else 'none'
+        self.prev_page_btn.disabled = building or self._page == 0
+        self.next_page_btn.disabled = building or not self._page_more
+        if building:
+            self.page_label.value = "&nbsp;Listing to disk...&nbsp;"
+        elif self.search_query and self.search_mode != 'content':
+            self.page_label.value = f"&nbsp;Page {self._page + 1} of the matches&nbsp;"
+        else:
+            pages = max(1, -(-self._spilled.count // SPILL_PAGE_ROWS))
+            self.page_label.value = f"&nbsp;Page {self._page + 1} of {pages:,}&nbsp;"
+    
+    def _prev_page(self, btn):
+        self._page = max(self._page - 1, 0)
+        self._refresh_file_list(reload=False)
+    
+    def _next_page(self, btn):
+        if self._page_more:
+            self._page += 1
+            self._refresh_file_list(reload=False)
+    
+    def _on_low_memory_change(self, change):
+        """Relist the folder in or out of low-memory mode"""
+        self.low_memory = change['new']
+        self._refresh_file_list()
+    
+    def _row_info(self, item):
+        """HTML for the size, date and type line under an item's name"""
+        if not item['is_dir']:
+            size_str = self._format_size(item['size'])
+        elif self.show_counts and item.get('children') is not None:
+            size_str = self._format_count(item['children'])
+        else:
+            size_str = "--"
+        date_str = self._format_date(item['modified'])
+        
+        info_text = f"  ð {size_str}  |  ð {date_str}  |  ð {item['type']}"
+        if self.show_owner and item.get('mode') is not None:
+            # Names are memoized, so a listing costs one lookup per distinct user and group
+            owner = html.escape(f"{user_name(item['uid'])}:{group_name(item['gid'])}")
+            info_text += f"  |  <code>{stat.filemode(item['mode'])}</code> {owner}"
+        if item.get('detail'):
+            info_text += f"  |  {html.escape(item['detail'])}"
+        return f"<span style='color: #666; font-size: 0.85em; margin-left: 35px;'>{info_text}</span>"
+    
+    def _format_count(self, count):
+        """Describe a folder's entry count, capped at CHILD_COUNT_CAP"""
+        if count > CHILD_COUNT_CAP:
+            return f"{CHILD_COUNT_CAP // 1000}k+ items"
+        if count == 0:
+            return "empty"
+        return f"{count:,} item{'s' if count != 1 else ''}"
+    
+    def _create_item_row(self, item):
+        """Create a clickable row for an item"""
         # Create a clickable button overlay
         item_btn = widgets.Button(
             description=f"{item['icon']} {item['name']}",
@@ -544,15 +4876,21 @@ class DatabricksFileExplorer:
         item_btn.item_data = item
         item_btn.on_click(self._on_item_click)
         
-        # Create info row
-        info_text = f"  ð {size_str}  |  ð {date_str}  |  ð {item['type']}"
-        info_label = widgets.HTML(
-            value=f"<span style='color: #666; font-size: 0.85em; margin-left: 35px;'>{info_text}</span>"
+        # Checkbox for multi-select
+        select_box = widgets.Checkbox(
+            value=item['path'] in self.selected_paths,
+            indent=False,
+            layout=widgets.Layout(width='30px')
         )
+        select_box.item_path = item['path']
+        select_box.observe(self._on_select_change, names='value')
+        
+        # Create info row
+        info_label = widgets.HTML(value=self._row_info(item))
         
-        # Display as VBox
+        # Returned as a VBox for the caller to display
         item_container = widgets.VBox([
-            item_btn,
+            widgets.HBox([select_box, item_btn]),
             info_label
         ], layout=widgets.Layout(
             margin='2px 0',
@@ -560,24 +4898,35 @@ class DatabricksFileExplorer:
             border='1px solid #eee',
             border_radius='5px'
         ))
+        item_container.select_box = select_box
+        item_container.info_label = info_label
+        item_container.item = item
         
-        display(item_container)
+        return item_container
     
     def _on_item_click(self, btn):
         """Handle item click"""
         item = btn.item_data
         
-        if item['is_dir']:
+        if item['is_dir'] or (is_archive(item['path']) and _path_test(os.path.isfile, item['path'])):
             self._navigate_to(item['path'], add_to_history=True)
         else:
             self._show_file_info(item['path'])
     
     def _show_file_info(self, path):
         """Show detailed file information"""
+        if self._follower and self._follower.path != path:
+            self.follow_btn.value = False
+        
+        location = split_archive_path(path)
+        if location and location[1]:
+            self._show_member_info(path, *location)
+            return
+        
         try:
-            stat_info = os.stat(path)
+            stat_info = fs_guard.call(scan_service.filesystem.stat, path)
             name = os.path.basename(path)
-            is_dir = os.path.isdir(path)
+            is_dir = stat.S_ISDIR(stat_info.st_mode)
             
             info_html = f"""
             <div style='padding: 15px; background: #f5f5f5; border-radius: 8px; border-left: 4px solid #1a73e8;'>
@@ -589,16 +4938,131 @@ class DatabricksFileExplorer:
                     <tr><td><b>Modified:</b></td><td>{self._format_date(stat_info.st_mtime)}</td></tr>
                     <tr><td><b>Created:</b></td><td>{self._format_date(stat_info.st_ctime)}</td></tr>
                     <tr><td><b>Accessed:</b></td><td>{self._format_date(stat_info.st_atime)}</td></tr>
-                    <tr><td><b>Permissions:</b></td><td>{oct(stat_info.st_mode)[-3:]}</td></tr>
+                    <tr><td><b>Permissions:</b></td><td>{stat.filemode(stat_info.st_mode)} ({oct(stat_info.st_mode)[-3:]})</td></tr>
+                    <tr><td><b>Owner:</b></td><td>{html.escape(user_name(stat_info.st_uid))}:{html.escape(group_name(stat_info.st_gid))}</td></tr>
                 </table>
             </div>
             """
             
+            snippets = self._grep_snippets.get(path)
+            if snippets:
+                lines = "".join(
+                    f"<div><b>{line}:</b> {html.escape(text)}</div>" for line, text in snippets
+                )
+                info_html += f"""
+                <div style='padding: 5px 15px; font-family: monospace; font-size: 0.85em;'>{lines}</div>
+                """
+            
             self.info_panel.value = info_html
             
+            self._info_path = path
+            self._show_file_actions(not is_dir)
+            
+        except Exception as e:
+            self.info_panel.value = f"<div style='color: red; padding: 10px;'>â Error reading file info: {str(e)}</div>"
+    
+    def _show_member_info(self, path, archive, inner):
+        """Show information about a file inside an archive"""
+        try:
+            entry = archive_entry(archive, inner)
+            if entry is None:
+                raise FileNotFoundError(f"No such member: {inner}")
+            name = os.path.basename(path)
+            
+            self.info_panel.value = f"""
+            <div style='padding: 15px; background: #f5f5f5; border-radius: 8px; border-left: 4px solid #1a73e8;'>
+                <h3 style='margin: 0 0 10px 0;'>{self._get_file_icon(name, entry['is_dir'])} {name}</h3>
+                <table style='width: 100%;'>
+                    <tr><td><b>Archive:</b></td><td style='word-break: break-all;'>{archive}</td></tr>
+                    <tr><td><b>Member:</b></td><td style='word-break: break-all;'>{inner}</td></tr>
+                    <tr><td><b>Type:</b></td><td>{self._get_file_type(name, entry['is_dir'])}</td></tr>
+                    <tr><td><b>Size:</b></td><td>{self._format_size(entry['size'])} ({entry['size']:,} bytes)</td></tr>
+                    <tr><td><b>Modified:</b></td><td>{self._format_date(entry['modified'])}</td></tr>
+                </table>
+            </div>
+            """
+            
+            self._info_path = path
+            self._show_file_actions(not entry['is_dir'])
+            
         except Exception as e:
             self.info_panel.value = f"<div style='color: red; padding: 10px;'>â Error reading file info: {str(e)}</div>"
     
+    def _preview(self, btn):
+        """Show the start of the selected file as text below its details"""
+        if not self._info_path:
+            return
+        try:
+            location = split_archive_path(self._info_path)
+            if self._info_path.lower().endswith(TABLE_EXTENSIONS):
+                self._preview_table(location)
+                return
+            if location and location[1]:
+                head = next(iter_archive_member(*location, chunk_size=PREVIEW_BYTES), b'')
+            else:
+                with open(self._info_path, 'rb') as f:
+                    head = f.read(PREVIEW_BYTES)
+        except Exception as e:
+            self.status_bar.value = f"<span style='color: red;'>Preview failed: {e}</span>"
+            return
+        
+        text = html.escape(head[:PREVIEW_BYTES].decode('utf-8', errors='replace'))
+        self.info_panel.value += f"""
+        <pre style='max-height: 300px; overflow: auto; background: #fff; border: 1px solid #ddd;
+                    padding: 8px; font-size: 0.85em; white-space: pre-wrap;'>{text}</pre>
+        """
+    
+    def _preview_table(self, location):
+        """Show sampled rows of a CSV/JSON file with the inferred column types"""
+        name = os.path.basename(self._info_path)
+        if location and location[1]:
+            # Archive members are not seekable; preview the head of the stream
+            size = archive_entry(*location)['size']
+            head = next(iter_archive_member(*location, chunk_size=TABLE_HEAD_BYTES), b'')
+            result = preview_table(io.BytesIO(head), size, name)
+        else:
+            with open(self._info_path, 'rb') as f:
+                result = preview_table(f, os.fstat(f.fileno()).st_size, name,
+                                       sample=self.preview_sample_box.value)
+        
+        if not result['columns']:
+            self.status_bar.value = f"<i>No rows could be parsed from the first {self._format_size(result['bytes_read'])}</i>"
+            return
+        
+        def cell(value):
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            if len(value) > TABLE_CELL_CHARS:
+                value = value[:TABLE_CELL_CHARS] + '...'
+            return html.escape(value)
+        
+        style = "padding: 2px 6px; border: 1px solid #ddd; white-space: nowrap;"
+        header = "".join(
+            f"<th style='{style} background: #f0f0f0;'>{html.escape(str(column))}"
+            f"<div style='font-weight: normal; color: #666;'>{kind}{f', {nulls:,} null' if nulls else ''}</div></th>"
+            for column, (kind, nulls) in zip(result['columns'], result['schema'])
+        )
+        body = "".join(
+            "<tr>" + "".join(f"<td style='{style}'>{cell(value)}</td>" for value in row) + "</tr>"
+            for row in result['rows'][:TABLE_DISPLAY_ROWS]
+        )
+        
+        source = "sampled across the file" if result['sampled'] else "from the start"
+        summary = (f"{result['format']}: {len(result['columns'])} column(s), types from "
+                   f"{len(result['rows']):,} row(s) {source}, {self._format_size(result['bytes_read'])} read")
+        if result['skipped']:
+            summary += f", {result['skipped']:,} unparsed line(s) skipped"
+        
+        self.info_panel.value += f"""
+        <div style='font-size: 0.85em; color: #666; margin-top: 8px;'>{summary}</div>
+        <div style='max-height: 400px; overflow: auto; border: 1px solid #ddd;'>
+            <table style='border-collapse: collapse; font-size: 0.85em; font-family: monospace;'>
+                <tr>{header}</tr>
+                {body}
+            </table>
+        </div>
+        """
+    
     # === EVENT HANDLERS ===
     
     def _go_back(self, btn):
@@ -626,7 +5090,7 @@ class DatabricksFileExplorer:
     
     def _refresh(self, btn):
         """Refresh current directory"""
-        self._refresh_file_list()
+        self._refresh_file_list(max_age=0)
         self.status_bar.value = "ð Refreshed"
     
     def _on_path_submit(self, text):
@@ -640,28 +5104,700 @@ class DatabricksFileExplorer:
     def _on_search_change(self, change):
         """Handle search input change"""
         self.search_query = change['new']
-        self._refresh_file_list()
+        # Content search runs on Enter, not on every keystroke
+        if self.search_mode != 'content':
+            self._refresh_file_list(reload=False)
+    
+    def _on_search_submit(self, text):
+        """Start a content search when Enter is pressed in Contents mode"""
+        if self.search_mode == 'content' and self.search_query:
+            self._start_content_search()
+    
+    def _on_search_mode_change(self, change):
+        """Handle search mode dropdown change"""
+        self.search_mode = change['new']
+        if self.search_query:
+            self._refresh_file_list(reload=False)
     
     def _clear_search(self, btn):
         """Clear search"""
+        # Leaving content search results goes back to the folder listing
+        reload = isinstance(self._report, ContentSearch)
+        if reload:
+            self._stop_report()
         self.search_input.value = ""
         self.search_query = ""
-        self._refresh_file_list()
+        self._refresh_file_list(reload=reload)
     
     def _on_sort_change(self, change):
         """Handle sort dropdown change"""
         self.sort_by = change['new']
-        self._refresh_file_list()
+        self._refresh_file_list(reload=False)
+    
+    def _on_then_by_change(self, change):
+        """Handle secondary sort dropdown change"""
+        self.then_by = change['new']
+        self._refresh_file_list(reload=False)
     
     def _on_sort_order_change(self, change):
         """Handle sort order toggle"""
         self.sort_reverse = change['new']
         self.sort_order_btn.description = 'â Descending' if self.sort_reverse else 'â Ascending'
+        self._refresh_file_list(reload=False)
+    
+    def _on_exclude_change(self, change):
+        """Relist the folder under the new exclusion rules"""
+        self.exclude = ExcludeRules.parse(self.exclude_input.value, self.hide_dotfiles_box.value)
+        # Listings saved under the old rules no longer match what would be shown
+        with self._session_lock:
+            self._saved_folders.clear()
+            self._session_folders.clear()
         self._refresh_file_list()
     
+    def _on_owner_change(self, change):
+        """Show or hide permissions, owner and group"""
+        self.show_owner = change['new']
+        self._refresh_file_list(reload=False)
+    
+    def _on_counts_change(self, change):
+        """Show or hide the entry counts of folders"""
+        self.show_counts = change['new']
+        self._refresh_file_list(reload=False)
+    
+    def _on_select_change(self, change):
+        """Handle item checkbox toggle"""
+        path = change['owner'].item_path
+        if change['new']:
+            self.selected_paths.add(path)
+        else:
+            self.selected_paths.discard(path)
+        self._disarm_delete()
+        self.status_bar.value = f"{len(self.selected_paths)} selected"
+    
+    def _toggle_select_all(self, btn):
+        """Select every visible item, or clear the selection if all are selected"""
+        visible = {i['path'] for i in self._visible_items}
+        if visible and visible <= self.selected_paths:
+            self.selected_paths -= visible
+        else:
+            self.selected_paths |= visible
+        self._disarm_delete()
+        self._refresh_file_list(reload=False)
+    
+    def _disarm_delete(self):
+        """Reset the delete button after a pending confirmation"""
+        self._delete_armed = False
+        self.delete_btn.description = "Delete"
+    
+    def _start_bulk(self, action):
+        """Copy, move or delete the selected items in the background"""
+        if self._bulk_op and not self._bulk_op.finished:
+            self.status_bar.value = "<span style='color: red;'>A bulk operation is already running</span>"
+            return
+        if not self.selected_paths:
+            self.status_bar.value = "<i>Select items with the checkboxes first</i>"
+            return
+        if split_archive_path(self.current_path):
+            self.status_bar.value = "<span style='color: red;'>Archives are read-only; extract members from the details panel</span>"
+            return
+        
+        # Deleting takes a second click to confirm
+        if action == 'delete' and not self._delete_armed:
+            self._delete_armed = True
+            self.delete_btn.description = f"Confirm ({len(self.selected_paths)})"
+            self.status_bar.value = f"<span style='color: red;'>Click again to delete {len(self.selected_paths)} item(s)</span>"
+            return
+        self._disarm_delete()
+        
+        dest = self.dest_input.value.strip() if action != 'delete' else ''
+        if dest:
+            dest = os.path.join(self.current_path, dest)
+        
+        try:
+            op = BulkOperation(
+                action,
+                sorted(self.selected_paths),
+                dest=dest or None,
+                on_progress=self._on_bulk_progress,
+                on_done=self._on_bulk_done
+            )
+        except ValueError as e:
+            self.status_bar.value = f"<span style='color: red;'>{e}</span>"
+            return
+        
+        self._bulk_op = op
+        self.cancel_btn.disabled = False
+        op.start()
+    
+    def _bulk_status(self, op):
+        """Format progress and throughput of a bulk operation"""
+        verb = {'copy': 'Copy', 'move': 'Move', 'delete': 'Delete'}[op.action]
+        if op.finished:
+            verb += " cancelled" if op.cancelled else " finished"
+        total = f"{op.files_total}+" if op.planning else f"{op.files_total}"
+        
+        text = f"{verb}: {op.files_done}/{total} file(s)"
+        if op.action != 'delete':
+            text += f" | {self._format_size(op.bytes_done)} at {self._format_size(op.throughput())}/s"
+        if op.errors:
+            text += f" | <span style='color: red;'>{len(op.errors)} failed</span>"
+        return text
+    
+    def _on_bulk_progress(self, op):
+        """Show bulk operation progress in the status bar"""
+        self.status_bar.value = self._bulk_status(op)
+    
+    def _on_bulk_done(self, op):
+        """Refresh the listing and report failures once a bulk operation ends"""
+        self.cancel_btn.disabled = True
+        # Called on the operation's thread, so the refresh takes the render lock
+        with self._render_lock:
+            self.selected_paths.clear()
+            self._refresh_file_list(max_age=0)
+            self.status_bar.value = self._bulk_status(op)
+        
+        if op.errors:
+            rows = "".join(
+                f"<tr><td style='word-break: break-all;'>{path}</td><td>{error}</td></tr>"
+                for path, error in op.errors[:20]
+            )
+            more = f"<i>... and {len(op.errors) - 20} more</i>" if len(op.errors) > 20 else ""
+            self.info_panel.value = f"""
+            <div style='padding: 15px; background: #fff3f3; border-radius: 8px; border-left: 4px solid red;'>
+                <h3 style='margin: 0 0 10px 0;'>{len(op.errors)} item(s) failed</h3>
+                <table style='width: 100%;'>{rows}</table>{more}
+            </div>
+            """
+    
+    def _cancel_bulk(self, btn):
+        """Cancel the running bulk operation"""
+        if self._bulk_op:
+            self._bulk_op.cancel()
+            self.status_bar.value = "<i>Cancelling...</i>"
+    
+    def _start_export(self, btn):
+        """Export the file shown in the details panel in the background"""
+        if self._export and not self._export.finished:
+            self.status_bar.value = "<span style='color: red;'>An export is already running</span>"
+            return
+        dest = self.export_dest_input.value.strip()
+        if not self._info_path or not dest:
+            self.status_bar.value = "<i>Enter a destination to export to</i>"
+            return
+        
+        location = split_archive_path(self._info_path)
+        if location and location[1]:
+            threading.Thread(
+                target=self._extract_member,
+                args=(location, os.path.join(self.current_path, dest)),
+                daemon=True
+            ).start()
+            return
+        
+        self._export = FileExport(
+            self._info_path,
+            os.path.join(self.current_path, dest),
+            buffer_size=self.export_buffer_dropdown.value,
+            on_progress=self._on_export_progress,
+            on_done=self._on_export_done
+        )
+        self.export_cancel_btn.disabled = False
+        self._export.start()
+    
+    def _extract_member(self, location, dest):
+        """Stream an archive member out to dest"""
+        self.status_bar.value = f"Extracting {location[1]}..."
+        try:
+            target = extract_archive_member(*location, dest)
+            self.status_bar.value = f"Extracted to {target}"
+        except Exception as e:
+            self.status_bar.value = f"<span style='color: red;'>Extract failed: {e}</span>"
+    
+    def _on_export_progress(self, export):
+        """Show export progress and throughput in the status bar"""
+        name = os.path.basename(export.source)
+        percent = export.bytes_done * 100 // export.total if export.total else 100
+        text = (f"Exporting {name}: {self._format_size(export.bytes_done)} of {self._format_size(export.total)} "
+                f"({percent}%) at {self._format_size(export.throughput())}/s")
+        if export.resumed_from:
+            text += f" | resumed at {self._format_size(export.resumed_from)}"
+        self.status_bar.value = text
+    
+    def _on_export_done(self, export):
+        """Report how an export ended"""
+        self.export_cancel_btn.disabled = True
+        if export.error:
+            self.status_bar.value = f"<span style='color: red;'>Export failed: {export.error}</span>"
+        elif export.cancelled:
+            self.status_bar.value = (f"Export paused at {self._format_size(export.bytes_done)}"
+                                     f" - export again to resume")
+        else:
+            self.status_bar.value = (f"Exported to {export.target} at {self._format_size(export.throughput())}/s"
+                                     f" | {export.algorithm} {export.checksum} verified")
+    
+    def _cancel_export(self, btn):
+        """Cancel the running export"""
+        if self._export:
+            self._export.cancel()
+    
+    def _toggle_report(self, btn):
+        """Start a hotspot report for the current path, or stop the running one"""
+        if isinstance(self._report, StorageReport) and not self._report.finished:
+            self._report.cancel()
+            return
+        
+        self._stop_report()
+        self._report = StorageReport(
+            self.current_path,
+            self._get_file_type,
+            on_progress=self._on_report_progress,
+            on_done=self._on_report_done
+        )
+        self.report_btn.description = "Stop Report"
+        
+        # Largest first; these refresh the current listing once
+        self.sort_dropdown.value = 'size'
+        self.sort_order_btn.value = True
+        self._report.start()
+    
+    def _stop_report(self):
+        """Cancel a running report so it stops replacing the listing"""
+        if self._report:
+            self._report.cancel()
+            self._report.on_progress = self._report.on_done = None
+            with self._render_lock:
+                self._report = None
+        self.report_btn.description = "Hotspots"
+        self.size_btn.description = "Size"
+        self.dupes_btn.description = "Duplicates"
+    
+    def _report_items(self, report):
+        """List the largest files found so far as file list items"""
+        items = []
+        for size, path, mtime in report.largest_files():
+            name = os.path.relpath(path, report.root)
+            items.append({
+                'name': name,
+                'name_lower': name.lower(),
+                'path': path,
+                'is_dir': False,
+                'size': size,
+                'modified': mtime,
+                'icon': self._get_file_icon(path, False),
+                'type': self._get_file_type(path, False)
+            })
+        return items
+    
+    def _report_html(self, report):
+        """Breakdown by file type and the heaviest folders"""
+        total = report.bytes_total or 1
+        type_rows = "".join(
+            f"<tr><td>{file_type}</td><td>{count:,}</td><td>{self._format_size(size)}</td>"
+            f"<td>{size * 100 / total:.1f}%</td></tr>"
+            for file_type, (count, size) in sorted(report.by_type.items(), key=lambda kv: -kv[1][1])[:20]
+        )
+        dir_rows = "".join(
+            f"<tr><td style='word-break: break-all;'>{os.path.relpath(path, report.root)}</td>"
+            f"<td>{count:,}</td><td>{self._format_size(size)}</td></tr>"
+            for size, path, count in report.heaviest_dirs()[:20]
+        )
+        state = "Scanning" if not report.finished else ("Stopped" if report.cancelled else "Finished")
+        return f"""
+        <div style='padding: 15px; background: #f5f5f5; border-radius: 8px; border-left: 4px solid #1a73e8;'>
+            <h3 style='margin: 0 0 10px 0;'>Storage hotspots: {report.root}</h3>
+            <p>{state}: {report.files_scanned:,} files in {report.dirs_scanned:,} folders,
+               {self._format_size(report.bytes_total)}</p>
+            <b>By type</b>
+            <table style='width: 100%;'><tr><th>Type</th><th>Files</th><th>Size</th><th>Share</th></tr>{type_rows}</table>
+            <b>Heaviest folders (everything below them)</b>
+            <table style='width: 100%;'><tr><th>Folder</th><th>Files</th><th>Size</th></tr>{dir_rows}</table>
+        </div>
+        """
+    
+    def _on_report_progress(self, report):
+        """Stream the partial report into the file list and details panel"""
+        items = self._report_items(report)
+        # Called on the report's thread; a report stopped meanwhile must not render
+        with self._render_lock:
+            if report is not self._report:
+                return
+            self._set_listing(items)
+            self._refresh_file_list(reload=False)
+        self.info_panel.value = self._report_html(report)
+        self._show_file_actions(False)
+        self.status_bar.value = (f"Scanning... {report.files_scanned:,} files, "
+                                 f"{self._format_size(report.bytes_total)} | top {report.top_k} largest shown")
+    
+    def _on_report_done(self, report):
+        """Show the final report"""
+        self._on_report_progress(report)
+        self.report_btn.description = "Hotspots"
+        self.status_bar.value = (f"{report.files_scanned:,} files, {self._format_size(report.bytes_total)} "
+                                 f"in {report.finished - report.started:.1f}s | top {report.top_k} largest shown"
+                                 + (f" | {report.errors} unreadable folder(s)" if report.errors else ""))
+    
+    def _toggle_estimate(self, btn):
+        """Start sizing the current path, or stop the running estimate"""
+        if isinstance(self._report, SizeEstimate) and not self._report.finished:
+            self._report.cancel()
+            return
+        
+        self._stop_report()
+        self._report = SizeEstimate(
+            self.current_path,
+            self.exclude,
+            on_progress=self._on_estimate_progress,
+            on_done=self._on_estimate_progress
+        )
+        self.size_btn.description = "Stop Size"
+        self._report.start()
+    
+    def _estimate_text(self, estimate):
+        """Size and file count of an estimate, with their 95% intervals until exact"""
+        if estimate.complete:
+            return f"{self._format_size(estimate.bytes_total)} in {estimate.files_scanned:,} files"
+        size_margin, files_margin = estimate.margins()
+        if math.isinf(size_margin):
+            return "estimating..."
+        return (f"&asymp; {self._format_size(int(estimate.size))} &plusmn; {self._format_size(int(size_margin))}"
+                f" in &asymp; {int(estimate.files):,} &plusmn; {int(files_margin):,} files (95%)")
+    
+    def _on_estimate_progress(self, estimate):
+        """Show the estimate as it refines, and the exact totals once the walk is done"""
+        if estimate.finished:
+            self.size_btn.description = "Size"
+        if estimate.complete:
+            state = f"Exact after {estimate.finished - estimate.started:.1f}s"
+        elif estimate.finished:
+            state = "Stopped"
+        else:
+            state = "Estimating"
+        self.info_panel.value = f"""
+        <div style='padding: 15px; background: #f5f5f5; border-radius: 8px; border-left: 4px solid #1a73e8;'>
+            <h3 style='margin: 0 0 10px 0;'>Size of {html.escape(estimate.root)}</h3>
+            <p><b>{self._estimate_text(estimate)}</b></p>
+            <p>{state}: {estimate.probes:,} random probes, {estimate.dirs_scanned:,} folders walked
+               ({estimate.files_scanned:,} files, {self._format_size(estimate.bytes_total)} so far)
+               {f" | {estimate.errors} unreadable folder(s)" if estimate.errors else ""}</p>
+        </div>
+        """
+        self._show_file_actions(False)
+        self.status_bar.value = f"Size: {self._estimate_text(estimate)}"
+    
+    def _toggle_duplicates(self, btn):
+        """Start a duplicate search under the current path, or stop the running one"""
+        if isinstance(self._report, DuplicateFinder) and not self._report.finished:
+            self._report.cancel()
+            return
+        
+        self._stop_report()
+        self._report = DuplicateFinder(
+            self.current_path,
+            on_progress=self._on_duplicates_progress,
+            on_done=self._on_duplicates_done
+        )
+        self.dupes_btn.description = "Stop Search"
+        self._report.start()
+    
+    def _on_duplicates_progress(self, finder):
+        """Show which stage the duplicate search is in"""
+        if finder.stage == 'scanning':
+            self.status_bar.value = f"Finding duplicates: scanned {finder.files_scanned:,} files"
+        else:
+            self.status_bar.value = (f"Finding duplicates: {finder.stage} {finder.hashed:,}/{finder.to_hash:,} "
+                                     f"of {finder.files_scanned:,} files")
+    
+    def _on_duplicates_done(self, finder):
+        """List duplicate sets in the file list, one set per type label"""
+        self.dupes_btn.description = "Duplicates"
+        if finder.cancelled:
+            self.status_bar.value = "Duplicate search stopped"
+            return
+        
+        # "Set 01", "Set 02"... keeps sets together when sorted by type
+        width = len(str(len(finder.groups)))
+        items = []
+        for number, (size, files) in enumerate(finder.groups, 1):
+            for path, mtime in files:
+                name = os.path.relpath(path, finder.root)
+                items.append({
+                    'name': name,
+                    'name_lower': name.lower(),
+                    'path': path,
+                    'is_dir': False,
+                    'size': size,
+                    'modified': mtime,
+                    'icon': self._get_file_icon(path, False),
+                    'type': f"Set {number:0{width}d}"
+                })
+        
+        # Called on the finder's thread; the sort widgets' handlers re-render too
+        with self._render_lock:
+            if finder is not self._report:
+                return
+            self._set_listing(items)
+            self.sort_order_btn.value = False
+            self.then_by_dropdown.value = ''
+            if self.sort_dropdown.value == 'type':
+                self._refresh_file_list(reload=False)
+            else:
+                self.sort_dropdown.value = 'type'
+        
+        rows = "".join(
+            f"<tr><td>Set {number:0{width}d}</td><td>{len(files)}</td><td>{self._format_size(size)}</td>"
+            f"<td>{self._format_size(size * (len(files) - 1))}</td></tr>"
+            for number, (size, files) in enumerate(finder.groups[:20], 1)
+        )
+        self.info_panel.value = f"""
+        <div style='padding: 15px; background: #f5f5f5; border-radius: 8px; border-left: 4px solid #1a73e8;'>
+            <h3 style='margin: 0 0 10px 0;'>Duplicates under {finder.root}</h3>
+            <p>{len(finder.groups):,} duplicate set(s) | Reclaimable: <b>{self._format_size(finder.reclaimable())}</b></p>
+            <table style='width: 100%;'><tr><th>Set</th><th>Copies</th><th>Size each</th><th>Reclaimable</th></tr>{rows}</table>
+        </div>
+        """
+        self._show_file_actions(False)
+        self.status_bar.value = (f"{len(finder.groups):,} duplicate set(s) in {finder.files_scanned:,} files | "
+                                 f"Reclaimable: {self._format_size(finder.reclaimable())} | "
+                                 f"{finder.finished - finder.started:.1f}s")
+    
+    def _start_checksum(self, btn):
+        """Checksum the file shown in the details panel in the background, or stop the running one"""
+        if self._checksum_cancel is not None:
+            self._checksum_cancel.set()
+            return
+        path = self._info_path
+        if not path:
+            return
+        location = split_archive_path(path)
+        if location and location[1]:
+            self.status_bar.value = "<i>Checksums need a regular file; extract the member first</i>"
+            return
+        self._checksum_cancel = threading.Event()
+        self.checksum_btn.description = "Stop"
+        threading.Thread(
+            target=self._compute_checksum,
+            args=(path, self.checksum_dropdown.value, self._checksum_cancel),
+            daemon=True
+        ).start()
+    
+    def _compute_checksum(self, path, algorithm, cancel):
+        """Compute a checksum, reporting progress, and add it to the details panel"""
+        try:
+            self._run_checksum(path, algorithm, cancel)
+        finally:
+            if self._checksum_cancel is cancel:
+                self._checksum_cancel = None
+                self.checksum_btn.description = "Checksum"
+    
+    def _run_checksum(self, path, algorithm, cancel):
+        """Checksum one file, showing the result in the status bar and details panel"""
+        label = dict((value, label) for label, value in CHECKSUM_ALGORITHMS)[algorithm]
+        name = os.path.basename(path)
+        started = time.time()
+        progress = {'done': 0, 'shown': 0.0}
+        
+        try:
+            total = fs_guard.call(scan_service.filesystem.stat, path).st_size
+            
+            def on_chunk(n):
+                progress['done'] += n
+                if time.time() - progress['shown'] > 0.25:
+                    progress['shown'] = time.time()
+                    percent = progress['done'] * 100 // total if total else 100
+                    self.status_bar.value = f"{label} of {name}: {percent}% ({self._format_size(progress['done'])})"
+            
+            # Hashing reports each chunk to the guard, so only a stalled read times out
+            digest = fs_guard.call(file_checksum, path, algorithm, on_chunk, cancel)
+        except OperationCancelled:
+            self.status_bar.value = f"{label} of {name} stopped"
+            return
+        except Exception as e:
+            self.status_bar.value = f"<span style='color: red;'>Checksum failed: {e}</span>"
+            return
+        
+        elapsed = time.time() - started
+        if progress['done']:
+            self.status_bar.value = (f"{label} of {name} in {elapsed:.1f}s "
+                                     f"({self._format_size(progress['done'] / max(elapsed, 1e-6))}/s)")
+        else:
+            self.status_bar.value = f"{label} of {name} (cached)"
+        
+        if self._info_path == path:
+            self.info_panel.value += f"""
+            <div style='padding: 5px 15px;'><b>{label}:</b> <code style='word-break: break-all;'>{digest}</code></div>
+            """
+    
+    def _start_content_search(self):
+        """Search file contents under the current path for the search text"""
+        self._stop_report()
+        self._grep_snippets = {}
+        self._grep_items = []
+        self._set_listing([])
+        self._report = ContentSearch(
+            self.current_path,
+            self.search_query,
+            on_match=self._on_content_match,
+            on_progress=self._on_content_progress,
+            on_done=self._on_content_done
+        )
+        self._grep_last_render = 0.0
+        self._report.start()
+    
+    def _on_content_match(self, search, match):
+        """Add a matching file to the list, re-rendering at most twice a second"""
+        path, size, mtime, snippets = match
+        name = os.path.relpath(path, search.root)
+        line, text = snippets[0]
+        item = {
+            'name': name,
+            'name_lower': name.lower(),
+            'path': path,
+            'is_dir': False,
+            'size': size,
+            'modified': mtime,
+            'icon': self._get_file_icon(path, False),
+            'type': self._get_file_type(path, False),
+            'detail': f"L{line}: {text}"
+        }
+        # Called on the search's worker threads; a stopped search must not render
+        with self._render_lock:
+            if search is not self._report:
+                return
+            self._grep_snippets[path] = snippets
+            self._grep_items.append(item)
+            if time.time() - self._grep_last_render > 0.5:
+                self._grep_last_render = time.time()
+                self._set_listing(list(self._grep_items))
+                self._refresh_file_list(reload=False)
+    
+    def _on_content_progress(self, search):
+        """Show how far the content search has got"""
+        self.status_bar.value = (f"Searching contents for '{html.escape(search.query)}': "
+                                 f"{len(search.matches):,} match(es) in {search.files_scanned:,} files")
+    
+    def _on_content_done(self, search):
+        """Show the final content search results"""
+        with self._render_lock:
+            if search is not self._report:
+                return
+            self._set_listing(list(self._grep_items))
+            self._refresh_file_list(reload=False)
+        
+        if search.limit_reached:
+            state = f"stopped at the first {search.max_matches} matches"
+        elif search.cancelled:
+            state = "stopped"
+        else:
+            state = f"{search.finished - search.started:.1f}s"
+        self.status_bar.value = (f"{len(search.matches):,} file(s) containing '{html.escape(search.query)}' | "
+                                 f"{search.files_scanned:,} searched, {search.files_skipped:,} binary or too large "
+                                 f"skipped | {state}"
+                                 + (f" | {search.errors:,} unreadable" if search.errors else ""))
+    
+    def _toggle_inventory(self, btn):
+        """Export an inventory of the current folder's subtree, or stop the running one"""
+        if self._inventory and not self._inventory.finished:
+            self._inventory.cancel()
+            return
+        
+        if split_archive_path(self.current_path):
+            self.status_bar.value = "<span style='color: red;'>Inventories can't be taken inside archives</span>"
+            return
+        
+        # Parquet when pyarrow is available, otherwise CSV
+        try:
+            import pyarrow.parquet
+            fmt = 'parquet'
+        except ImportError:
+            fmt = 'csv'
+        
+        try:
+            self._inventory = InventoryExport(
+                self.current_path,
+                inventory_destination(self.current_path, self.dest_input.value.strip(), self.inventory_dir),
+                fmt=fmt,
+                on_progress=self._on_inventory_progress,
+                on_done=self._on_inventory_done
+            )
+        except ValueError as e:
+            self.status_bar.value = f"<span style='color: red;'>{e}</span>"
+            return
+        
+        self.inventory_btn.description = "Stop Inventory"
+        self._inventory.start()
+    
+    def _inventory_status(self, export):
+        """Format progress of an inventory export"""
+        verb = "Inventory resumed" if export.resumed else "Inventory"
+        text = (f"{verb}: {export.rows_written:,} rows in {export.parts} {export.fmt} part(s), "
+                f"{export.dirs_scanned:,} folders scanned at {export.throughput():,.0f} rows/s")
+        if export.errors:
+            text += f" | <span style='color: red;'>{export.errors} unreadable folder(s)</span>"
+        return text
+    
+    def _on_inventory_progress(self, export):
+        self.status_bar.value = self._inventory_status(export)
+    
+    def _on_inventory_done(self, export):
+        self.inventory_btn.description = "Inventory"
+        if export.error:
+            self.status_bar.value = f"<span style='color: red;'>Inventory failed: {html.escape(str(export.error))}</span>"
+        elif export.cancelled:
+            self.status_bar.value = self._inventory_status(export) + " | stopped, run again to resume"
+        else:
+            self.status_bar.value = self._inventory_status(export) + f" | written to {html.escape(export.dest)}"
+    
+    def _on_follow_change(self, change):
+        """Start or stop following the file shown in the details panel"""
+        if self._follower:
+            self._follower.stop()
+            self._follower = None
+        
+        if not change['new']:
+            self.tail_view.layout.display = 'none'
+            return
+        
+        path = self._info_path
+        location = split_archive_path(path) if path else None
+        if not path or (location and location[1]):
+            self.status_bar.value = "<i>Only regular files can be followed</i>"
+            self.follow_btn.value = False
+            return
+        
+        self._follower = LogFollower(path, on_update=self._on_follow_update)
+        self.tail_view.value = "<i>Waiting for data...</i>"
+        self.tail_view.layout.display = ''
+        self._follower.start()
+    
+    def _on_follow_update(self, follower):
+        """Render the followed lines, newest at the bottom"""
+        if follower is not self._follower:
+            return
+        text = html.escape("\n".join(follower.lines))
+        notes = []
+        if follower.rotations:
+            notes.append(f"rotated {follower.rotations}x")
+        if follower.truncations:
+            notes.append(f"truncated {follower.truncations}x")
+        if follower.error:
+            notes.append(f"<span style='color: red;'>{html.escape(follower.error)}</span>")
+        
+        # column-reverse keeps the scroll position pinned to the newest line
+        self.tail_view.value = f"""
+        <div style='font-size: 0.85em; color: #666;'>Following {html.escape(os.path.basename(follower.path))}:
+            {len(follower.lines):,} line(s), offset {follower.offset:,}{' | ' + ', '.join(notes) if notes else ''}</div>
+        <div style='display: flex; flex-direction: column-reverse; max-height: 300px; overflow: auto;
+                    background: #1e1e1e; color: #ddd; border-radius: 5px; padding: 8px;'>
+            <pre style='margin: 0; font-size: 0.85em; white-space: pre-wrap;'>{text}</pre>
+        </div>
+        """
+    
     def display(self):
         """Display the file explorer"""
         display(self.main_container)
+        if 'first_paint' not in self.timings:
+            self.timings['first_paint'] = time.perf_counter() - self._created
+            self._report_timings()
 
 
 # === LAUNCH THE FILE EXPLORER ===
@@ -677,12 +5813,14 @@ def launch_explorer(start_path=None):
     """
     Launch the file explorer.
     
+    Returns as soon as the explorer is displayed; the start folder is listed
+    in the background (see explorer.wait_until_loaded() and explorer.timings).
+    Re-running the cell resumes the last session from its saved listings.
+    
     Args:
-        start_path: Starting directory path. Defaults to current working directory.
+        start_path: Starting directory path. Defaults to the folder of the
+            last session, or the current working directory.
     """
-    if start_path is None:
-        start_path = os.getcwd()
-    
     explorer = DatabricksFileExplorer(start_path=start_path)
     explorer.display()
     return explorer
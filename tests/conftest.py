@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+import pytest
+
+# detailed.py is a notebook cell rather than a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import detailed
+
+
+def make_tree(root, folders=3, files=4, size=100):
+    """Create folders of files under root; returns (file count, total bytes)"""
+    count = total = 0
+    for i in range(folders):
+        folder = os.path.join(root, f"dir{i}")
+        os.makedirs(os.path.join(folder, "sub"))
+        for j in range(files):
+            for parent in (folder, os.path.join(folder, "sub")):
+                with open(os.path.join(parent, f"part-{j}.bin"), "wb") as f:
+                    f.write(b"x" * (size + j))
+                count += 1
+                total += size + j
+    return count, total
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll condition until it holds or timeout seconds pass; returns its last value"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def age_tree(root, seconds=3600):
+    """Backdate every folder under root so the tree index trusts its mtimes"""
+    past = os.stat(root).st_mtime - seconds
+    for folder, _, _ in os.walk(root):
+        os.utime(folder, (past, past))
+
+
+@pytest.fixture
+def slow_fs(tmp_path):
+    """A LatencyFilesystem over tmp_path serving all metadata calls for the test"""
+    fs = detailed.LatencyFilesystem(str(tmp_path), latency=0.001, seed=1)
+    previous = detailed.scan_service.use_filesystem(fs)
+    yield fs
+    detailed.scan_service.use_filesystem(previous)
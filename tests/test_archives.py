@@ -0,0 +1,46 @@
+import io
+import tarfile
+import time
+
+import detailed
+from conftest import wait_for
+
+
+def make_targz(path, names):
+    with tarfile.open(path, "w:gz") as tf:
+        for name in names:
+            data = name.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+
+def test_opening_an_archive_indexes_it_in_the_background(tmp_path, monkeypatch):
+    archive = tmp_path / "data.tar.gz"
+    make_targz(archive, ["a.txt", "logs/b.log"])
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=None)
+
+    started = []
+    build = detailed._build_archive_index
+    monkeypatch.setattr(detailed, "_build_archive_index", lambda p: started.append(p) or build(p))
+
+    explorer._navigate_to(str(archive))
+    # The handler returns before the index exists; the view follows once it does
+    assert wait_for(lambda: explorer.current_path == str(archive))
+    assert started == [str(archive)]
+    assert sorted(item['name'] for item in explorer._items) == ["a.txt", "logs"]
+
+
+def test_navigating_away_while_indexing_wins(tmp_path, monkeypatch):
+    archive = tmp_path / "slow.tar.gz"
+    make_targz(archive, ["a.txt"])
+    (tmp_path / "other").mkdir()
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=None)
+
+    build = detailed._build_archive_index
+    monkeypatch.setattr(detailed, "_build_archive_index", lambda p: time.sleep(0.3) or build(p))
+
+    explorer._navigate_to(str(archive))
+    explorer._navigate_to(str(tmp_path / "other"))
+    time.sleep(0.6)
+    assert explorer.current_path == str(tmp_path / "other")
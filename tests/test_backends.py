@@ -0,0 +1,186 @@
+import os
+import threading
+
+import pytest
+
+import detailed
+from conftest import age_tree, make_tree
+
+
+def test_listing_goes_through_the_backend(tmp_path, slow_fs):
+    for i in range(20):
+        (tmp_path / f"f{i}.txt").write_text("data")
+
+    listing = detailed.scan_service.listing(str(tmp_path), max_age=0)
+    assert sorted(listing['names']) == sorted(f"f{i}.txt" for i in range(20))
+    assert slow_fs.calls['listdir'] == 1
+    assert slow_fs.calls['stat'] == 21
+
+    # A fresh enough listing is served from the cache
+    detailed.scan_service.listing(str(tmp_path))
+    assert slow_fs.calls['listdir'] == 1
+
+
+def test_concurrent_listings_of_a_folder_are_coalesced(tmp_path, slow_fs):
+    (tmp_path / "a.txt").write_text("data")
+    slow_fs.latency = 0.2
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(detailed.scan_service.listing(str(tmp_path), 0)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 3
+    assert slow_fs.calls['listdir'] == 1
+
+
+def test_injected_errors_surface_as_os_errors(tmp_path, slow_fs):
+    slow_fs.error_rate = 1.0
+    with pytest.raises(OSError):
+        detailed.scan_service.listing(str(tmp_path), max_age=0)
+
+
+def test_guard_times_out_hung_calls_and_opens_the_breaker(tmp_path):
+    fs = detailed.LatencyFilesystem(str(tmp_path), timeout_rate=1.0, hang_seconds=0.3)
+    guard = detailed.FilesystemGuard(timeout=0.05, threshold=2)
+    for _ in range(2):
+        with pytest.raises(detailed.FilesystemTimeout):
+            guard.call(fs.stat, str(tmp_path))
+    with pytest.raises(detailed.MountUnavailable):
+        guard.call(fs.stat, str(tmp_path))
+    assert guard.unavailable()
+
+
+def test_tree_index_rescan_only_lists_changed_folders(tmp_path, slow_fs):
+    count, total = make_tree(str(tmp_path))
+    age_tree(str(tmp_path))
+    index = detailed.TreeIndex(str(tmp_path))
+
+    files = [f for _, _, folder_files, _ in index.walk(workers=4) for f in folder_files]
+    assert len(files) == count
+    assert sum(size for _, size, _ in files) == total
+    assert index.listed == 7 and index.reused == 0
+
+    scans = slow_fs.calls['scandir']
+    list(index.walk(workers=4))
+    assert index.listed == 0 and index.reused == 7
+    assert slow_fs.calls['scandir'] == scans
+
+    (tmp_path / "dir1" / "new.bin").write_bytes(b"y" * 10)
+    past = os.stat(tmp_path / "dir1").st_mtime - 1800
+    os.utime(tmp_path / "dir1", (past, past))
+    files = [f for _, _, folder_files, _ in index.walk(workers=4) for f in folder_files]
+    assert index.listed == 1
+    assert len(files) == count + 1
+
+
+def test_tree_index_keeps_at_most_max_entries_names(tmp_path, slow_fs):
+    count, _ = make_tree(str(tmp_path))
+    age_tree(str(tmp_path))
+    index = detailed.TreeIndex(str(tmp_path), max_entries=10)
+    files = [f for _, _, folder_files, _ in index.walk(workers=4) for f in folder_files]
+    assert len(files) == count
+    assert 0 < index.entries <= 10
+    assert sum(1 + len(entry[2]) + len(entry[3]) for entry in index.folders.values()) == index.entries
+
+    # Folders that didn't fit are listed again
+    list(index.walk(workers=4))
+    assert index.listed == 7 - len(index.folders)
+
+
+def test_recursive_scans_see_files_rewritten_in_place(tmp_path, slow_fs):
+    make_tree(str(tmp_path))
+    age_tree(str(tmp_path))
+    grown = tmp_path / "dir1" / "part-0.bin"
+    detailed.scan(str(tmp_path), recursive=True)
+
+    # Rewriting a file leaves its folder's mtime alone
+    past = os.stat(tmp_path / "dir1").st_mtime
+    grown.write_bytes(b"x" * 5000)
+    os.utime(tmp_path / "dir1", (past, past))
+    frame = detailed.scan(str(tmp_path), recursive=True)
+    assert frame.set_index('path').loc[str(grown), 'size'] == 5000
+
+
+def test_recursive_scans_give_folders_their_mtime(tmp_path, slow_fs):
+    make_tree(str(tmp_path))
+    frame = detailed.scan(str(tmp_path), recursive=True).set_index('path')
+    folder = str(tmp_path / "dir1" / "sub")
+    assert frame.loc[folder, 'is_dir']
+    assert frame.loc[folder, 'modified'].timestamp() == pytest.approx(os.stat(folder).st_mtime)
+    assert not frame[frame['is_dir']]['modified'].isna().any()
+    assert len(frame) == 3 * 2 * 4 + 3 * 2
+
+
+def test_recursive_scans_raise_on_unreadable_entries(tmp_path, slow_fs, monkeypatch):
+    make_tree(str(tmp_path))
+    (tmp_path / "dir2" / "bad.bin").write_bytes(b"x")
+    delay = slow_fs._delay
+
+    def failing_delay(op, path):
+        if op == 'stat' and path.endswith("bad.bin"):
+            raise PermissionError(13, "Permission denied", path)
+        delay(op, path)
+
+    monkeypatch.setattr(slow_fs, '_delay', failing_delay)
+    frame = detailed.scan(str(tmp_path), recursive=True)
+    assert str(tmp_path / "dir2" / "bad.bin") not in set(frame['path'])
+    with pytest.raises(PermissionError):
+        detailed.scan(str(tmp_path), recursive=True, errors='raise')
+
+
+def test_size_estimate_ends_with_the_exact_totals(tmp_path, slow_fs):
+    count, total = make_tree(str(tmp_path), folders=4)
+    estimate = detailed.SizeEstimate(str(tmp_path), seed=7)
+    estimate.run()
+    assert estimate.complete
+    assert estimate.size == total
+    assert estimate.files == count
+    assert estimate.margins() == (0.0, 0.0)
+    assert slow_fs.calls['scandir'] > 0
+
+
+def test_size_estimate_probes_are_unbiased_on_a_regular_tree(tmp_path, slow_fs):
+    count, total = make_tree(str(tmp_path), folders=4)
+    estimate = detailed.SizeEstimate(str(tmp_path), seed=7)
+    for _ in range(50):
+        estimate._add_probe(*estimate._probe())
+    # Every folder at a level holds the same files, so each probe is exact
+    assert estimate._sums[0] / estimate.probes == pytest.approx(total, rel=0.05)
+    assert estimate._sums[2] / estimate.probes == pytest.approx(count)
+
+
+def test_size_estimate_probes_do_not_follow_links_the_walk_skips(tmp_path, slow_fs):
+    root, outside = tmp_path / "root", tmp_path / "outside"
+    root.mkdir()
+    outside.mkdir()
+    (outside / "big.bin").write_bytes(b"z" * 100000)
+    count, total = make_tree(str(root), folders=4)
+    os.symlink(outside, root / "link")
+
+    estimate = detailed.SizeEstimate(str(root), seed=7)
+    for _ in range(50):
+        estimate._add_probe(*estimate._probe())
+    # The walk counts the link itself, never what it points to
+    exact = detailed.SizeEstimate(str(root))
+    exact.run()
+    assert exact.files == count + 1
+    assert estimate._sums[0] / estimate.probes == pytest.approx(exact.size)
+    assert estimate._sums[2] / estimate.probes == pytest.approx(exact.files)
+
+
+def test_read_folder_matches_the_walk(tmp_path, slow_fs):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    root = tmp_path / "root"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.bin").write_bytes(b"x" * 10)
+    (root / "a.bin.crc").write_bytes(b"c")
+    os.symlink(outside, root / "link")
+
+    dirs, names, sizes, _, excluded, errors = detailed.read_folder(str(root), detailed.SPARK_EXCLUDES)
+    assert dirs == ["sub"]
+    assert sorted(zip(names, sizes)) == [("a.bin", 10), ("link", os.lstat(root / "link").st_size)]
+    assert excluded == 1 and errors == []
+    assert slow_fs.calls['scandir'] == 1
@@ -0,0 +1,62 @@
+import os
+
+import detailed
+
+
+def make_target(tmp_path):
+    target = tmp_path / "target"
+    (target / "nested").mkdir(parents=True)
+    (target / "keep.txt").write_text("keep")
+    (target / "nested" / "deep.txt").write_text("deep")
+    return target
+
+
+def test_deleting_a_symlink_to_a_folder_leaves_the_folder_alone(tmp_path):
+    target = make_target(tmp_path)
+    link = tmp_path / "link"
+    link.symlink_to(target, target_is_directory=True)
+
+    op = detailed.BulkOperation('delete', [str(link)])
+    op.run()
+
+    assert op.errors == []
+    assert not os.path.lexists(link)
+    assert (target / "keep.txt").read_text() == "keep"
+    assert (target / "nested" / "deep.txt").read_text() == "deep"
+
+
+def test_deleting_a_folder_removes_symlinked_subfolders_as_links(tmp_path):
+    target = make_target(tmp_path)
+    folder = tmp_path / "folder"
+    folder.mkdir()
+    (folder / "file.txt").write_text("x")
+    (folder / "linked").symlink_to(target, target_is_directory=True)
+
+    op = detailed.BulkOperation('delete', [str(folder)])
+    op.run()
+
+    assert op.errors == []
+    assert not folder.exists()
+    assert (target / "nested" / "deep.txt").exists()
+
+
+def test_copy_and_move_keep_symlinks_as_links(tmp_path):
+    target = make_target(tmp_path)
+    folder = tmp_path / "folder"
+    folder.mkdir()
+    (folder / "linked").symlink_to(target, target_is_directory=True)
+    copies = tmp_path / "copies"
+    copies.mkdir()
+
+    op = detailed.BulkOperation('copy', [str(folder)], dest=str(copies))
+    op.run()
+    assert op.errors == []
+    assert os.readlink(copies / "folder" / "linked") == str(target)
+
+    moved = tmp_path / "moved"
+    moved.mkdir()
+    op = detailed.BulkOperation('move', [str(folder / "linked")], dest=str(moved))
+    op.run()
+    assert op.errors == []
+    assert os.readlink(moved / "linked") == str(target)
+    assert (target / "keep.txt").exists()
@@ -0,0 +1,33 @@
+import hashlib
+import threading
+
+import pytest
+
+import detailed
+
+
+def test_checksums_match_hashlib_and_are_memoized(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"abc" * 100000)
+    chunks = []
+    digest = detailed.file_checksum(str(path), 'sha256', on_chunk=chunks.append)
+    assert digest == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert sum(chunks) == path.stat().st_size
+
+    chunks.clear()
+    assert detailed.file_checksum(str(path), 'sha256', on_chunk=chunks.append) == digest
+    assert chunks == []
+
+
+def test_crc32c_is_only_offered_with_a_native_implementation():
+    offered = 'crc32c' in [value for _, value in detailed.CHECKSUM_ALGORITHMS]
+    assert offered == (detailed._crc32c_extend is not None)
+
+
+def test_a_cancelled_checksum_stops(tmp_path):
+    path = tmp_path / "stop.bin"
+    path.write_bytes(b"x" * 1024)
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(detailed.OperationCancelled):
+        detailed.file_checksum(str(path), 'md5', cancel=cancel)
@@ -0,0 +1,42 @@
+import time
+
+import detailed
+
+
+def test_content_search_finds_matching_text_files(tmp_path):
+    (tmp_path / "a.log").write_text("ok\nERROR disk full\n")
+    (tmp_path / "b.log").write_text("all fine\n")
+    (tmp_path / "c.bin").write_bytes(b"\0ERROR")
+    search = detailed.ContentSearch(str(tmp_path), "ERROR")
+    search.run()
+    assert [(path, snippets) for path, _, _, snippets in search.matches] == [
+        (str(tmp_path / "a.log"), [(2, "ERROR disk full")])
+    ]
+    assert search.files_skipped == 1
+
+
+def test_content_matches_render_from_worker_threads(tmp_path):
+    for i in range(5):
+        (tmp_path / f"f{i}.txt").write_text(f"line\nneedle {i}\n")
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=None)
+    explorer.search_query = "needle"
+    explorer._start_content_search()
+    search = explorer._report
+    deadline = time.time() + 5
+    while not search.finished and time.time() < deadline:
+        time.sleep(0.01)
+    assert sorted(item['name'] for item in explorer._items) == [f"f{i}.txt" for i in range(5)]
+
+
+def test_a_stopped_content_search_no_longer_replaces_the_listing(tmp_path):
+    (tmp_path / "a.txt").write_text("needle")
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=None)
+    listing = list(explorer._items)
+    search = detailed.ContentSearch(str(tmp_path), "needle")
+    search.run()
+
+    explorer._report = search
+    explorer._stop_report()
+    explorer._on_content_match(search, search.matches[0])
+    explorer._on_content_done(search)
+    assert explorer._items == listing
@@ -0,0 +1,33 @@
+import os
+
+import detailed
+
+
+def test_duplicate_finder_groups_identical_files(tmp_path):
+    big = os.urandom(64 * 1024)
+    for name in ("a.bin", "b.bin", "c/d.bin"):
+        os.makedirs(tmp_path / os.path.dirname(name), exist_ok=True)
+        (tmp_path / name).write_bytes(big)
+    # Same size and same head and tail, different middle
+    (tmp_path / "e.bin").write_bytes(big[:30000] + b"!" + big[30001:])
+
+    finder = detailed.DuplicateFinder(str(tmp_path))
+    finder.run()
+    assert [(size, sorted(os.path.basename(p) for p, _ in files)) for size, files in finder.groups] == [
+        (len(big), ["a.bin", "b.bin", "d.bin"])
+    ]
+    assert finder.reclaimable() == 2 * len(big)
+
+
+def test_a_stopped_duplicate_search_no_longer_replaces_the_listing(tmp_path):
+    (tmp_path / "a.txt").write_text("same")
+    (tmp_path / "b.txt").write_text("same")
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=None)
+    listing = list(explorer._items)
+    finder = detailed.DuplicateFinder(str(tmp_path))
+    finder.run()
+
+    explorer._report = finder
+    explorer._stop_report()
+    explorer._on_duplicates_done(finder)
+    assert explorer._items == listing
@@ -0,0 +1,47 @@
+import time
+
+import detailed
+
+
+def test_background_load_lists_the_start_folder(tmp_path, slow_fs):
+    (tmp_path / "a.txt").write_text("a")
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), session_file=None)
+    assert explorer.wait_until_loaded(5)
+    assert [item['name'] for item in explorer._items] == ["a.txt"]
+    assert explorer.history == [str(tmp_path)]
+
+
+def test_navigating_during_the_initial_load_wins(tmp_path, slow_fs):
+    start, other = tmp_path / "start", tmp_path / "other"
+    start.mkdir()
+    other.mkdir()
+    (other / "b.txt").write_text("b")
+    stat = slow_fs.stat
+
+    def slow_start(path, **kwargs):
+        if path == str(start):
+            time.sleep(0.3)
+        return stat(path, **kwargs)
+
+    slow_fs.stat = slow_start
+    explorer = detailed.DatabricksFileExplorer(str(start), session_file=None)
+    explorer._navigate_to(str(other))
+    assert explorer.wait_until_loaded(5)
+    assert explorer.current_path == str(other)
+    assert explorer.history == [str(other)]
+    assert [item['name'] for item in explorer._items] == ["b.txt"]
+
+
+def test_only_the_folders_at_the_top_of_the_view_are_counted(tmp_path):
+    for i in range(detailed.CHILD_COUNT_ROWS + 20):
+        (tmp_path / f"dir{i:03}").mkdir()
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=None)
+    explorer.counts_btn.value = True
+    shown = [row.item for row in explorer._rows_box.children]
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and 'children' not in shown[detailed.CHILD_COUNT_ROWS - 1]:
+        time.sleep(0.05)
+    time.sleep(0.1)
+    assert len(shown) > detailed.CHILD_COUNT_ROWS
+    assert all('children' in item for item in shown[:detailed.CHILD_COUNT_ROWS])
+    assert not any('children' in item for item in shown[detailed.CHILD_COUNT_ROWS:])
@@ -0,0 +1,91 @@
+import hashlib
+import os
+
+import detailed
+
+MB = 1024 * 1024
+
+
+def interrupted_export(tmp_path, data, copied):
+    """An export of data that stopped after copying its first `copied` bytes"""
+    source = tmp_path / "source.bin"
+    source.write_bytes(data)
+    export = detailed.FileExport(str(source), str(tmp_path / "copy.bin"), buffer_size=MB, checkpoint_bytes=MB)
+    with open(export.part_path, "wb") as f:
+        f.write(data[:copied])
+    digests = [hashlib.sha256(data[i:i + MB]).hexdigest() for i in range(0, copied, MB)]
+    export._save_checkpoint(os.stat(source), digests)
+    return export
+
+
+def test_export_resumes_from_a_matching_prefix(tmp_path):
+    data = os.urandom(3 * MB)
+    export = interrupted_export(tmp_path, data, MB)
+    export.run()
+    assert export.error is None and export.verified
+    assert export.resumed_from == MB
+    assert (tmp_path / "copy.bin").read_bytes() == data
+
+
+def test_export_restarts_when_the_source_prefix_changed(tmp_path):
+    data = os.urandom(3 * MB)
+    export = interrupted_export(tmp_path, data, MB)
+    source = tmp_path / "source.bin"
+    stat_info = os.stat(source)
+
+    # Rewrite the copied prefix in place, keeping size and mtime
+    changed = b"\0" * 100 + data[100:]
+    source.write_bytes(changed)
+    os.utime(source, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
+
+    export.run()
+    assert export.error is None and export.verified
+    assert export.resumed_from == 0
+    assert (tmp_path / "copy.bin").read_bytes() == changed
+
+
+def test_export_restarts_when_the_partial_copy_is_corrupt(tmp_path):
+    data = os.urandom(2 * MB)
+    export = interrupted_export(tmp_path, data, MB)
+    with open(export.part_path, "r+b") as f:
+        f.write(b"\0" * 10)
+
+    export.run()
+    assert export.verified and export.resumed_from == 0
+    assert (tmp_path / "copy.bin").read_bytes() == data
+
+
+def test_resuming_reads_only_a_few_chunks_of_the_copied_prefix(tmp_path, monkeypatch):
+    data = os.urandom(10 * MB)
+    export = interrupted_export(tmp_path, data, 8 * MB)
+    read = []
+    readinto = detailed._readinto
+
+    def counting_readinto(path, f, buffer):
+        n = readinto(path, f, buffer)
+        read.append(n)
+        return n
+
+    monkeypatch.setattr(detailed, "_readinto", counting_readinto)
+    export.run()
+    assert export.verified and export.resumed_from == 8 * MB
+    assert export.checksum == hashlib.sha256(data).hexdigest()
+    # The last chunk and two sampled ones, then the 2 MB left to copy
+    assert sum(read) == 5 * MB
+
+
+def test_checkpoints_follow_an_fsync_of_the_copy(tmp_path, monkeypatch):
+    source = tmp_path / "source.bin"
+    source.write_bytes(os.urandom(4 * MB + 10))
+    export = detailed.FileExport(str(source), str(tmp_path / "copy.bin"), buffer_size=MB,
+                                 checkpoint_bytes=2 * MB)
+    events = []
+    fsync = os.fsync
+    monkeypatch.setattr(detailed.os, "fsync", lambda fd: (events.append("fsync"), fsync(fd)))
+    save = export._save_checkpoint
+    monkeypatch.setattr(export, "_save_checkpoint",
+                        lambda *args: (events.append("checkpoint"), save(*args)))
+    export.run()
+    assert export.verified
+    # One checkpoint per 2 MB chunk, each written once the copy is on disk
+    assert events == ["fsync", "checkpoint", "fsync"] * 2
@@ -0,0 +1,72 @@
+import os
+import time
+
+import detailed
+
+
+def test_follower_reads_appended_lines(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\n")
+    follower = detailed.LogFollower(str(log))
+    assert follower.poll()
+    with open(log, "a") as f:
+        f.write("two\nthr")
+    assert follower.poll()
+    assert list(follower.lines) == ["one", "two"]
+    with open(log, "a") as f:
+        f.write("ee\n")
+    follower.poll()
+    assert list(follower.lines) == ["one", "two", "three"]
+
+
+def test_rotation_drains_the_old_file_first(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\n")
+    follower = detailed.LogFollower(str(log))
+    follower.poll()
+
+    # Written after the last poll, just before the rename
+    with open(log, "a") as f:
+        f.write("late\nlast")
+    os.rename(log, tmp_path / "app.log.1")
+    log.write_text("new\n")
+
+    assert follower.poll()
+    assert follower.rotations == 1
+    assert list(follower.lines) == ["one", "late", "last", "new"]
+
+
+def test_follower_thread_survives_errors(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\n")
+    updates = []
+    follower = detailed.LogFollower(str(log), interval=0.01, on_update=lambda f: updates.append(f.error))
+    failures = [RuntimeError("boom")]
+    poll = follower.poll
+
+    def flaky_poll():
+        if failures:
+            raise failures.pop()
+        return poll()
+
+    follower.poll = flaky_poll
+    thread = follower.start()
+    deadline = time.time() + 5
+    while "one" not in follower.lines and time.time() < deadline:
+        time.sleep(0.01)
+    follower.stop()
+    thread.join(2)
+    assert updates[0] == "RuntimeError: boom"
+    assert list(follower.lines) == ["one"] and follower.error is None
+
+
+def test_reopening_after_an_error_keeps_the_offset(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\n")
+    follower = detailed.LogFollower(str(log))
+    follower.poll()
+    follower._close()
+    with open(log, "a") as f:
+        f.write("two\n")
+    follower.poll()
+    assert list(follower.lines) == ["one", "two"]
@@ -0,0 +1,115 @@
+import os
+import time
+
+import pytest
+
+import detailed
+from conftest import make_tree
+
+
+class HangingFilesystem(detailed.LocalFilesystem):
+    """Answers at once except for folders named 'hung' and files named 'hung.log', which never answer in time"""
+
+    def __init__(self, hang_seconds=1.0):
+        self.hang_seconds = hang_seconds
+
+    def scandir(self, path):
+        if os.path.basename(path) == "hung":
+            time.sleep(self.hang_seconds)
+        return os.scandir(path)
+
+    def stat(self, path, **kwargs):
+        if os.path.basename(path) == "hung.log":
+            time.sleep(self.hang_seconds)
+        return os.stat(path, **kwargs)
+
+
+@pytest.fixture
+def guard(monkeypatch):
+    guard = detailed.FilesystemGuard(timeout=0.2, threshold=10)
+    monkeypatch.setattr(detailed, "fs_guard", guard)
+    return guard
+
+
+@pytest.fixture
+def hanging_fs():
+    fs = HangingFilesystem()
+    previous = detailed.scan_service.use_filesystem(fs)
+    yield fs
+    detailed.scan_service.use_filesystem(previous)
+
+
+def test_walk_times_out_a_hung_folder_and_finishes_the_rest(tmp_path, guard, hanging_fs):
+    count, _ = make_tree(str(tmp_path))
+    (tmp_path / "hung").mkdir()
+    started = time.monotonic()
+    results = {folder: (files, error) for folder, _, files, error in detailed.walk_tree(str(tmp_path))}
+    assert time.monotonic() - started < hanging_fs.hang_seconds
+    assert isinstance(results[str(tmp_path / "hung")][1], detailed.FilesystemTimeout)
+    assert sum(len(files) for files, _ in results.values()) == count
+
+
+def test_bulk_delete_reports_a_hung_folder(tmp_path, guard, hanging_fs):
+    make_tree(str(tmp_path / "data"))
+    (tmp_path / "data" / "hung").mkdir()
+    op = detailed.BulkOperation('delete', [str(tmp_path / "data")])
+    op.run()
+    assert [path for path, _ in op.errors][0] == str(tmp_path / "data" / "hung")
+    assert os.listdir(tmp_path / "data") == ["hung"]
+
+
+def test_calls_of_a_walk_stopped_early_are_forgotten(tmp_path, guard, slow_fs):
+    make_tree(str(tmp_path), folders=20)
+    slow_fs.latency, slow_fs.jitter = 0.05, 0.04
+    walk = detailed.walk_tree(str(tmp_path))
+    next(walk)
+    next(walk)
+    assert guard._calls
+    walk.close()
+    deadline = time.monotonic() + 2
+    while guard._calls and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not guard._calls
+
+
+def test_following_a_log_on_a_hung_mount_reports_it(tmp_path, guard, hanging_fs):
+    log = tmp_path / "hung.log"
+    log.write_text("line\n")
+    follower = detailed.LogFollower(str(log))
+    started = time.monotonic()
+    assert follower.poll()
+    assert time.monotonic() - started < hanging_fs.hang_seconds
+    assert "No response" in follower.error
+
+
+def test_calls_that_keep_reporting_progress_are_not_timed_out(guard):
+    def slow(path):
+        for _ in range(5):
+            time.sleep(0.1)
+            guard.touch()
+        return path
+
+    assert guard.call(slow, "/") == "/"
+    with pytest.raises(detailed.FilesystemTimeout):
+        guard.call(lambda path: time.sleep(0.5), "/")
+
+
+def test_mount_table_expires(guard):
+    guard.mount_of("/")
+    guard._mounts = ["/fake/mount", "/"]
+    assert guard.mount_of("/fake/mount/x") == "/fake/mount"
+    guard._mounts_read -= detailed.MOUNT_TABLE_SECONDS + 1
+    assert guard.mount_of("/fake/mount/x") == "/"
+
+
+def test_inventory_of_an_unavailable_mount_records_the_error(tmp_path, guard, hanging_fs):
+    make_tree(str(tmp_path / "data"))
+    (tmp_path / "hung").mkdir()
+    guard.threshold = 1
+    with pytest.raises(detailed.FilesystemTimeout):
+        guard.call(hanging_fs.scandir, str(tmp_path / "hung"))
+
+    export = detailed.InventoryExport(str(tmp_path / "data"), str(tmp_path / "inv"), fmt='csv')
+    export.run()
+    assert export.error is None
+    assert export.errors == 1 and export.rows_written == 0
@@ -0,0 +1,61 @@
+import csv
+import glob
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import detailed
+from conftest import make_tree
+
+
+def test_relative_and_empty_destinations_go_to_the_output_dir(tmp_path):
+    out = str(tmp_path / "out")
+    assert detailed.inventory_destination("/data/raw", "inv", out) == os.path.join(out, "inv")
+    assert detailed.inventory_destination("/data/raw", "", out) == os.path.join(out, "inventory-data_raw")
+    assert detailed.inventory_destination("/data/raw", "/abs/inv", out) == "/abs/inv"
+
+
+def test_destinations_inside_the_root_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        detailed.InventoryExport(str(tmp_path), str(tmp_path / "inv"), fmt='csv')
+
+
+def test_inventory_from_the_explorer_lands_outside_the_root(tmp_path):
+    root = tmp_path / "root"
+    count, _ = make_tree(str(root))
+    explorer = detailed.DatabricksFileExplorer(str(root), background_load=False, session_file=None)
+    explorer.inventory_dir = str(tmp_path / "inventories")
+    explorer.dest_input.value = "listing"
+    explorer._toggle_inventory(None)
+    export = explorer._inventory
+    deadline = time.time() + 10
+    while not export.finished and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert export.error is None
+    assert export.dest == str(tmp_path / "inventories" / "listing")
+    assert os.path.exists(os.path.join(export.dest, "_SUCCESS"))
+    parts = glob.glob(os.path.join(export.dest, "part-*"))
+    if export.fmt == 'csv':
+        is_dir = [row['is_dir'] for part in parts for row in csv.DictReader(open(part))]
+        assert is_dir.count('False') == count
+    else:
+        import pyarrow.parquet
+        is_dir = [value for part in parts for value in pyarrow.parquet.read_table(part).column('is_dir').to_pylist()]
+        assert is_dir.count(False) == count
+
+
+def test_csv_parts_write_modified_as_utc_iso_timestamps(tmp_path):
+    make_tree(str(tmp_path / "root"), folders=1, files=1)
+    export = detailed.InventoryExport(str(tmp_path / "root"), str(tmp_path / "inv"), fmt='csv')
+    export.run()
+    assert export.error is None
+    rows = [row for part in glob.glob(str(tmp_path / "inv" / "part-*")) for row in csv.DictReader(open(part))]
+    files = [row for row in rows if row['is_dir'] == 'False']
+    assert len(files) == 2
+    for row in files:
+        modified = datetime.fromisoformat(row['modified'])
+        assert modified.utcoffset() == timedelta(0)
+        assert modified.timestamp() == pytest.approx(os.stat(row['path']).st_mtime)
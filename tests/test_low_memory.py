@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import detailed
+from conftest import wait_for
+
+
+def paged(explorer):
+    with explorer._render_lock:
+        return explorer._spilled is not None and explorer._page_fetch is None
+
+
+def low_memory_explorer(path):
+    explorer = detailed.DatabricksFileExplorer(path, background_load=False, session_file=None)
+    explorer.low_memory_box.value = True
+    return explorer
+
+
+def test_low_memory_mode_lists_in_the_background_and_pages(tmp_path, slow_fs):
+    for i in range(detailed.SPILL_PAGE_ROWS + 10):
+        (tmp_path / f"f{i:04}.txt").write_text("x")
+    explorer = low_memory_explorer(str(tmp_path))
+    assert wait_for(lambda: paged(explorer))
+    assert [item['name'] for item in explorer._visible_items][:2] == ["f0000.txt", "f0001.txt"]
+    assert len(explorer._visible_items) == detailed.SPILL_PAGE_ROWS
+    assert explorer.page_label.value == "&nbsp;Page 1 of 2&nbsp;"
+
+    explorer._next_page(None)
+    assert wait_for(lambda: paged(explorer))
+    assert len(explorer._visible_items) == 10
+
+
+def test_a_hung_folder_can_be_cancelled(tmp_path, slow_fs):
+    (tmp_path / "a.txt").write_text("a")
+    release = threading.Event()
+    scandir = slow_fs.scandir
+
+    def hung_scandir(path):
+        release.wait(5)
+        return scandir(path)
+
+    slow_fs.scandir = hung_scandir
+    try:
+        started = time.monotonic()
+        explorer = low_memory_explorer(str(tmp_path))
+        # The kernel isn't held up by the listing
+        assert time.monotonic() - started < 1
+        assert explorer._spilling is not None
+        assert explorer.spill_cancel_btn.layout.display is None
+
+        explorer.spill_cancel_btn.click()
+        assert explorer._spilling is None
+        assert explorer.status_bar.value == "Listing cancelled"
+    finally:
+        release.set()
+    time.sleep(0.2)
+    assert explorer._spilled is None
+
+
+def test_unreadable_entries_are_reported(tmp_path, slow_fs):
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(name)
+    stat = slow_fs.stat
+
+    def failing_stat(path, **kwargs):
+        if os.path.basename(path) == "b.txt":
+            raise PermissionError(13, "Permission denied", path)
+        return stat(path, **kwargs)
+
+    slow_fs.stat = failing_stat
+    explorer = low_memory_explorer(str(tmp_path))
+    assert wait_for(lambda: paged(explorer))
+    assert [item['name'] for item in explorer._visible_items] == ["a.txt", "c.txt"]
+    assert "1 could not be read" in explorer.status_bar.value
+
+
+def test_page_label_only_counts_matches_for_name_searches(tmp_path, slow_fs):
+    (tmp_path / "a.txt").write_text("a")
+    explorer = low_memory_explorer(str(tmp_path))
+    assert wait_for(lambda: paged(explorer))
+    explorer.search_query, explorer.search_mode = "needle", "content"
+    explorer._update_page_bar()
+    assert "matches" not in explorer.page_label.value
+    explorer.search_mode = "substring"
+    explorer._update_page_bar()
+    assert "of the matches" in explorer.page_label.value
@@ -0,0 +1,40 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import detailed
+from conftest import make_tree
+
+
+def test_lane_limits_concurrency_and_skips_cancelled_tasks():
+    pool = ThreadPoolExecutor(max_workers=8)
+    lane = detailed._Lane(pool, 2)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def task(i):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return i
+
+    futures = [lane.submit(task, i) for i in range(10)]
+    assert futures[-1].cancel()
+    assert [f.result() for f in futures[:-1]] == list(range(9))
+    assert peak[0] == 2
+    pool.shutdown()
+
+
+def test_jobs_run_on_the_shared_scan_pool(tmp_path):
+    make_tree(str(tmp_path))
+    names = set()
+    search = detailed.ContentSearch(str(tmp_path), "x")
+    search_file = search._search_file
+    search._search_file = lambda *args: names.add(threading.current_thread().name) or search_file(*args)
+    search.run()
+
+    assert names and all(name.startswith("scan") for name in names)
+    assert detailed.fs_guard is detailed.scan_service.guard
+    assert detailed.fs_guard.pool is detailed.scan_service.pool
@@ -0,0 +1,51 @@
+import os
+
+import detailed
+from conftest import age_tree, make_tree
+
+
+def test_storage_report_finds_the_largest_files(tmp_path):
+    count, total = make_tree(str(tmp_path), files=3)
+    report = detailed.StorageReport(str(tmp_path), detailed.file_type, top_k=2)
+    report.run()
+    assert report.files_scanned == count and report.bytes_total == total
+    assert [size for size, _, _ in report.largest_files()] == [102, 102]
+
+
+def test_a_stopped_report_no_longer_replaces_the_listing(tmp_path):
+    make_tree(str(tmp_path))
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=None)
+    listing = list(explorer._items)
+    report = detailed.StorageReport(str(tmp_path), detailed.file_type)
+    report.run()
+
+    explorer._report = report
+    explorer._stop_report()
+    # A progress callback already in flight when the report was stopped
+    explorer._on_report_progress(report)
+    assert explorer._items == listing
+
+
+def test_a_second_report_sees_files_rewritten_in_place(tmp_path):
+    make_tree(str(tmp_path), files=3)
+    age_tree(str(tmp_path))
+    detailed.StorageReport(str(tmp_path), detailed.file_type).run()
+
+    past = os.stat(tmp_path / "dir0").st_mtime
+    (tmp_path / "dir0" / "part-0.bin").write_bytes(b"x" * 5000)
+    os.utime(tmp_path / "dir0", (past, past))
+    report = detailed.StorageReport(str(tmp_path), detailed.file_type, top_k=1)
+    report.run()
+    assert [size for size, _, _ in report.largest_files()] == [5000]
+
+
+def test_heaviest_folders_count_everything_below_them(tmp_path):
+    make_tree(str(tmp_path), folders=2, files=3)
+    (tmp_path / "dir1" / "sub" / "big.bin").write_bytes(b"x" * 1000)
+    report = detailed.StorageReport(str(tmp_path), detailed.file_type)
+    report.run()
+    heaviest = report.heaviest_dirs()
+    assert heaviest[0] == (1000 + 2 * 303, str(tmp_path / "dir1"), 7)
+    assert heaviest[1] == (1303, str(tmp_path / "dir1" / "sub"), 4)
+    assert len(heaviest) == 4
+    assert report._open == {}
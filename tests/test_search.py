@@ -0,0 +1,26 @@
+import detailed
+
+
+def names_matching(names, query, mode):
+    items = [{'name': n, 'name_lower': n.lower()} for n in names]
+    return [i['name'] for i in detailed.rank_items(items, query, mode)]
+
+
+def test_glob_without_wildcards_matches_anywhere_in_the_name():
+    names = ['app.log', 'log', 'catalog.json', 'data.csv']
+    assert names_matching(names, 'log', 'glob') == ['log', 'app.log', 'catalog.json']
+
+
+def test_glob_ranks_whole_name_matches_first():
+    names = ['a.csv.bak', 'a.csv', 'b.csv', 'notes.txt']
+    assert names_matching(names, '*.csv', 'glob') == ['a.csv', 'b.csv', 'a.csv.bak']
+
+
+def test_substring_ranks_exact_then_prefix_matches():
+    names = ['my_part', 'part', 'part-2']
+    assert names_matching(names, 'part', 'substring') == ['part', 'part-2', 'my_part']
+
+
+def test_fuzzy_prefers_tight_matches():
+    names = ['p_a_r_t', 'part']
+    assert names_matching(names, 'prt', 'fuzzy') == ['part', 'p_a_r_t']
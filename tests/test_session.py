@@ -0,0 +1,51 @@
+import gzip
+import json
+
+import detailed
+from conftest import wait_for
+
+
+def write_session(path, session):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(session, f)
+
+
+def test_session_round_trip_resumes_the_last_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(detailed, "SESSION_SAVE_DELAY", 0.01)
+    session_file = str(tmp_path / "session.json.gz")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "a.txt").write_text("a")
+
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=session_file)
+    explorer._navigate_to(str(tmp_path / "data"))
+    assert wait_for(lambda: (detailed.load_session(session_file) or {}).get('current_path') == str(tmp_path / "data"))
+
+    resumed = detailed.DatabricksFileExplorer(background_load=False, session_file=session_file)
+    assert resumed.current_path == str(tmp_path / "data")
+    assert resumed.history == [str(tmp_path), str(tmp_path / "data")]
+    assert [item['name'] for item in resumed._items] == ["a.txt"]
+
+
+def test_sessions_with_missing_or_mistyped_keys_are_ignored(tmp_path):
+    session_file = str(tmp_path / "session.json.gz")
+    write_session(session_file, {'version': detailed.SESSION_VERSION, 'current_path': str(tmp_path)})
+    assert detailed.load_session(session_file) is None
+    write_session(session_file, {
+        'version': detailed.SESSION_VERSION, 'current_path': str(tmp_path), 'history': [str(tmp_path)],
+        'history_index': 0, 'sort': ['name', '', False], 'exclude': [[], False, []],
+        'folders': [[str(tmp_path), 'yesterday', [], 0]],
+    })
+    assert detailed.load_session(session_file) is None
+
+    # Falls back to the defaults instead of failing in the constructor
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False, session_file=session_file)
+    assert explorer.current_path == str(tmp_path)
+
+
+def test_saving_never_raises_into_the_timer(tmp_path):
+    explorer = detailed.DatabricksFileExplorer(str(tmp_path), background_load=False,
+                                               session_file=str(tmp_path / "session.json.gz"))
+    explorer._save_session({'not serializable': object()})
+    explorer.session_file = str(tmp_path / "missing" / "\0bad")
+    explorer._save_session(explorer._session_snapshot())
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,42 @@
+import detailed
+
+
+def make_items(rows):
+    return [{'name': name, 'name_lower': name.lower(), 'is_dir': is_dir, 'size': size,
+             'modified': 0, 'type': detailed.file_type(name, is_dir)} for name, is_dir, size in rows]
+
+
+def ordered(items, keys, reverse):
+    order, dir_count, primary = detailed.sort_permutation(items, keys)
+    if reverse:
+        order = (detailed.reverse_primary(order[:dir_count], primary)
+                 + detailed.reverse_primary(order[dir_count:], primary))
+    return [items[j]['name'] for j in order]
+
+
+def test_natural_order_of_numbered_parts():
+    items = make_items([('part-10', False, 1), ('part-2', False, 1), ('part-1', False, 1)])
+    assert ordered(items, ('name',), False) == ['part-1', 'part-2', 'part-10']
+
+
+def test_descending_only_flips_the_primary_key():
+    items = make_items([('b.bin', False, 10), ('c.bin', False, 5), ('a.bin', False, 10), ('sub', True, 0)])
+    assert ordered(items, ('size', 'name'), True) == ['sub', 'a.bin', 'b.bin', 'c.bin']
+    assert ordered(items, ('size', 'name'), False) == ['sub', 'c.bin', 'a.bin', 'b.bin']
+
+
+def test_spilled_listing_descending_keeps_ties_ascending(tmp_path):
+    for name, size in [('b.bin', 10), ('c.bin', 5), ('a.bin', 10), ('d.bin', 5)]:
+        (tmp_path / name).write_bytes(b'x' * size)
+    (tmp_path / 'sub').mkdir()
+    spilled = detailed.SpilledListing(str(tmp_path))
+    try:
+        spilled.build()
+        for keys in (('size', 'name'), ('name',), ('type', 'name')):
+            rows = spilled.page(keys, True, 0, 10)
+            assert [row[0] for row in rows] == ordered(make_items(
+                [(row[0], row[1], row[2]) for row in sorted(rows)]), keys, True)
+        assert [row[0] for row in spilled.page(('size', 'name'), True, 0, 10)] == \
+            ['sub', 'a.bin', 'b.bin', 'c.bin', 'd.bin']
+    finally:
+        spilled.close()